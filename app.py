@@ -1,119 +1,289 @@
-import pandas as pd
 import streamlit as st
-from scipy.stats import (
-    wilcoxon, mannwhitneyu, kruskal, friedmanchisquare, spearmanr, kendalltau, ks_2samp
-)
-from statsmodels.sandbox.stats.runs import runstest_1samp
-from statsmodels.stats.proportion import binom_test
 import matplotlib.pyplot as plt
-import seaborn as sns
-from fpdf import FPDF
-from tempfile import NamedTemporaryFile
-import base64
-
-# Enhanced test suggestion function
-def suggest_tests(data, col1, col2=None):
-    suggestions = []
-    
-    if col2:
-        # Check if paired data (same number of observations)
-        is_paired = len(data[col1]) == len(data[col2])
-        
-        # Two-sample tests
-        suggestions.extend(["Mann-Whitney U Test", "Kolmogorov-Smirnov Test"])
-        
-        if is_paired:
-            suggestions.append("Wilcoxon Signed-Rank Test")
-        
-        # Correlation tests
-        if pd.api.types.is_numeric_dtype(data[col2]):
-            suggestions.extend(["Spearman's Rank Correlation", "Kendall's Tau"])
-        
-        # Multiple groups detection
-        if len(data[col2].unique()) > 2:
-            if pd.api.types.is_numeric_dtype(data[col2]):
-                suggestions.append("Kruskal-Wallis Test")
-            else:
-                suggestions.append("Friedman Test")
-    else:
-        # One-sample tests
-        suggestions.extend(["Sign Test", "Runs Test (Wald-Wolfowitz)"])
-    
-    return suggestions
+import uuid
+from nptests import run_test, suggest_tests
+from nptests.correction import CORRECTIONS
+from nptests.exact import EXACT_MAX_N
+from nptests.friedman import FRIEDMAN_POSTHOC, friedman_test
+from nptests.grouped import POSTHOC_METHODS, kruskal_dunn
+from nptests.instrument import Trace
+from nptests.jobs import DONE, FAILED, JobCancelled, default_runner
+from nptests.matrix import MATRIX_TESTS, pairwise_matrix
+from nptests.plots import PLOT_TYPES, generate_visualizations, matrix_heatmaps
+from nptests.ranks import RankCache
+from nptests.resample import RESAMPLING, resample_test
+from nptests.screening import SCREENING_TESTS, screen_one_sample
+from nptests.report import create_pdf_report, render_figures, report_sections
+from nptests.store import default_store
+from utils.column_profile import get_profile
+from utils.load_data import load_data
 
-# PDF Generation function
-def create_pdf_report(test_results, visualizations):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    
-    # Add test results
-    pdf.cell(200, 10, txt="Statistical Test Report", ln=1, align="C")
-    pdf.ln(10)
-    
-    for section, content in test_results.items():
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(200, 10, txt=section, ln=1)
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, txt=str(content))
-        pdf.ln(5)
-    
-    # Add visualizations
-    if visualizations:
-        pdf.add_page()
-        pdf.cell(200, 10, txt="Visualizations", ln=1, align="C")
-        for idx, img_path in enumerate(visualizations):
-            pdf.image(img_path, x=10, y=20 + (idx * 60), w=180)
-    
-    return pdf.output(dest="S").encode("latin1")
+# One rank cache per distinct upload, shared by every session and rerun
+@st.cache_resource(max_entries=16)
+def get_rank_cache(digest, lean, _data):
+    return RankCache(_data)
+
+
+# Rendered figures and the finished PDF, so a repeated run or download re-renders nothing.
+# The job is checked between plots and before rendering and the PDF
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_report(digest, lean, test, col1, col2, plots, _result, _data, null_hyp, alt_hyp, _trace, _job):
+    figs = []
+    try:
+        with _trace.stage("plots"):
+            for plot in [plot for plot in PLOT_TYPES if plot in plots]:
+                _job.report(_job.progress, f"Plotting {plot}")
+                figs.extend(generate_visualizations(_data, col1, col2, [plot]))
+        _job.report(0.9, "Rendering figures")
+    except JobCancelled:
+        for fig in figs:
+            plt.close(fig)
+        raise
+    with _trace.stage("render"):
+        images = render_figures(figs)
+    _job.report(0.95, "Writing the PDF")
+    with _trace.stage("pdf"):
+        pdf_bytes = create_pdf_report(report_sections(_result, null_hyp, alt_hyp), images)
+    return images, pdf_bytes
+
+
+# Test, optional resampling and report for one "Run Full Analysis" click, run as a job
+def full_analysis(job, trace, data, digest, lean, test, col1, col2, ranks, resampling, plots, null_hyp, alt_hyp):
+    status = "failed"
+    try:
+        with trace.profiling():
+            job.report(0.0, "Running test")
+            with trace.stage("test"):
+                result = run_test(
+                    data, test, col1, col2, ranks=ranks, digest=digest,
+                    progress=lambda fraction, message: job.report(0.1 * fraction, message),
+                )
+            resampled = None
+            if resampling:
+                job.report(0.1, "Resampling")
+                with trace.stage("resample"):
+                    resampled = resample_test(
+                        data, test, col1, col2, ranks=ranks,
+                        progress=lambda fraction, message: job.report(0.1 + 0.7 * fraction, message), **resampling,
+                    )
+            job.report(0.8, "Generating report")
+            # A cached report shows up as this stage alone
+            with trace.stage("report"):
+                images, pdf_bytes = build_report(
+                    digest, lean, test, col1, col2, plots, result, data, null_hyp, alt_hyp, trace, job,
+                )
+        status = "ok"
+    except JobCancelled:
+        status = "cancelled"
+        raise
+    finally:
+        trace.finish(status)
+    return result, resampled, images, pdf_bytes, trace
+
+
+def performance_panel(trace):
+    with st.expander("Performance"):
+        st.caption(f"Run {trace.id}: {trace.wall:.3f}s over {len(trace.stages)} stages")
+        st.dataframe(trace.table())
+        if trace.profile_text:
+            st.code(trace.profile_text)
+
+
+@st.fragment(run_every=1.0)
+def job_status(job_id):
+    runner = default_runner()
+    job = runner.get(job_id)
+    if job.done:
+        st.rerun()
+    st.progress(job.progress, text=f"{job.label}: {job.message or job.status} ({job.elapsed:.0f}s)")
+    if st.button("Cancel"):
+        runner.cancel(job_id)
 
-# Enhanced visualization section
-def generate_visualizations(data, col1, col2, selected_plots):
-    visualizations = []
-    
-    if "Boxplot" in selected_plots:
-        fig, ax = plt.subplots()
-        sns.boxplot(data=data, x=col2, y=col1, ax=ax)
-        visualizations.append(fig)
-    
-    if "Violin Plot" in selected_plots:
-        fig, ax = plt.subplots()
-        sns.violinplot(data=data, x=col2, y=col1, ax=ax)
-        visualizations.append(fig)
-    
-    if "Distribution Plot" in selected_plots:
-        fig, ax = plt.subplots()
-        sns.histplot(data[col1], kde=True, ax=ax)
-        if col2:
-            sns.histplot(data[col2], kde=True, ax=ax, color="orange")
-        visualizations.append(fig)
-    
-    if "Scatterplot" in selected_plots and col2:
-        fig, ax = plt.subplots()
-        sns.scatterplot(x=data[col1], y=data[col2], ax=ax)
-        visualizations.append(fig)
-    
-    return visualizations
 
 # Streamlit app
 st.title("Enhanced Non-Parametric Statistical Analysis App")
 
 # File upload and data handling
+lean_mode = st.sidebar.checkbox(
+    "Memory-lean loading",
+    help="Stream CSVs in chunks with narrowed numeric dtypes and categorical text columns.",
+)
 uploaded_file = st.file_uploader("Upload Dataset", type=["csv", "xlsx"])
+profile_run = st.sidebar.checkbox("Profile analysis runs (cProfile)")
+# Identifies this session to the shared job runner
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
 if uploaded_file:
-    if uploaded_file.name.endswith(".csv"):
-        data = pd.read_csv(uploaded_file)
-    else:
-        data = pd.read_excel(uploaded_file)
-    
-    numeric_cols = data.select_dtypes(include=["number"]).columns.tolist()
+    # Stages of this script run; it is finished and shown only when an analysis runs
+    trace = Trace("app", profile=profile_run)
+    with trace.stage("load"):
+        data, digest = load_data(uploaded_file, with_digest=True, lean=lean_mode)
+        ranks = get_rank_cache(digest, lean_mode, data)
+    report = data.attrs.get("memory_report")
+    if report:
+        st.caption(
+            f"Memory-lean loading: {report['before'] / 1024 ** 2:.1f} MB -> "
+            f"{report['after'] / 1024 ** 2:.1f} MB ({report['saved'] / 1024 ** 2:.1f} MB saved)"
+        )
     
+    with trace.stage("profile"):
+        profile = get_profile(data, (digest, lean_mode))
+    numeric_cols = profile.index[profile["numeric"]].tolist()
+    with st.expander("Column Profile"):
+        st.dataframe(profile)
+
+    analysis_mode = st.sidebar.radio(
+        "Analysis Mode",
+        [
+            "Single Test", "All-Pairs Matrix", "Grouped Kruskal-Wallis", "Friedman (Repeated Measures)",
+            "One-Sample Screening",
+        ],
+    )
+    trace.kind = analysis_mode
+    # Only the single test runs as a cancellable job; the other modes run in this script run
+    trace.labels["rows"] = len(data)
+    if analysis_mode == "All-Pairs Matrix":
+        matrix_cols = st.multiselect("Select Columns", numeric_cols, default=numeric_cols)
+        matrix_tests = st.multiselect("Select Tests", MATRIX_TESTS, default=MATRIX_TESTS)
+        correction = st.selectbox("Multiple-Comparison Correction", CORRECTIONS)
+
+        if st.button("Run Matrix Analysis"):
+            try:
+                with trace.profiling(), trace.stage("matrix"):
+                    matrix = pairwise_matrix(data, matrix_cols, matrix_tests, correction, ranks=ranks)
+            except Exception as e:
+                trace.finish("failed")
+                st.error(f"Error performing test: {str(e)}")
+                st.stop()
+
+            for test in matrix_tests:
+                st.subheader(test)
+                with trace.stage(f"heatmap: {test}"):
+                    fig = matrix_heatmaps(matrix, test)
+                    st.pyplot(fig)
+                    plt.close(fig)
+
+            st.subheader("All Pairs")
+            st.dataframe(matrix.long_table())
+            performance_panel(trace.finish())
+        st.stop()
+
+    if analysis_mode == "Grouped Kruskal-Wallis":
+        value_col = st.selectbox("Select Value Column", numeric_cols)
+        group_col = st.selectbox(
+            "Select Grouping Column",
+            [col for col in data.columns if col != value_col],
+            format_func=lambda col: f"{col} ({profile.at[col, 'cardinality']} groups)",
+        )
+        posthoc = st.selectbox("Post-hoc Test", POSTHOC_METHODS)
+        correction = st.selectbox("Multiple-Comparison Correction", CORRECTIONS)
+        min_group_size = st.number_input("Minimum group size for post-hoc", min_value=1, value=5)
+        exact_pairs = st.checkbox(
+            "Exact p-values for small pairs",
+            disabled=posthoc != "Pairwise Mann-Whitney",
+            help=f"Exact Mann-Whitney p-values for pairs of at most {EXACT_MAX_N} observations, ties included.",
+        )
+
+        if st.button("Run Grouped Analysis"):
+            try:
+                with trace.profiling(), trace.stage("kruskal_dunn"):
+                    grouped = kruskal_dunn(
+                        data, value_col, group_col, posthoc=posthoc, correction=correction,
+                        min_group_size=int(min_group_size), ranks=ranks, exact=exact_pairs,
+                    )
+            except Exception as e:
+                trace.finish("failed")
+                st.error(f"Error performing test: {str(e)}")
+                st.stop()
+
+            st.subheader("Kruskal-Wallis Test")
+            st.write(f"**Test Statistic:** {grouped.statistic}")
+            st.write(f"**p-value:** {grouped.p_value}")
+            st.write(f"**Conclusion:** {grouped.conclusion}")
+            st.write(f"**Groups:** {len(grouped.groups)}")
+            st.dataframe(grouped.groups)
+
+            st.subheader(f"{grouped.posthoc_method} Post-hoc")
+            st.write(
+                f"{len(grouped.posthoc)} of {grouped.n_pairs} pairs significant "
+                f"after {grouped.correction} correction"
+            )
+            st.dataframe(grouped.posthoc)
+            performance_panel(trace.finish())
+        st.stop()
+
+    if analysis_mode == "Friedman (Repeated Measures)":
+        treatment_cols = st.multiselect("Select Treatment Columns", numeric_cols, default=numeric_cols[:3])
+        block_col = st.selectbox(
+            "Block / ID Column (optional)",
+            ["None"] + [col for col in data.columns if col not in treatment_cols],
+        )
+        block_col = None if block_col == "None" else block_col
+        posthoc = st.selectbox("Post-hoc Test", FRIEDMAN_POSTHOC)
+        correction = st.selectbox("Multiple-Comparison Correction (Conover)", CORRECTIONS)
+
+        if st.button("Run Friedman Analysis"):
+            try:
+                with trace.profiling(), trace.stage("friedman"):
+                    friedman = friedman_test(
+                        data, treatment_cols, block=block_col, posthoc=posthoc, correction=correction,
+                    )
+            except Exception as e:
+                trace.finish("failed")
+                st.error(f"Error performing test: {str(e)}")
+                st.stop()
+
+            st.subheader("Friedman Test")
+            st.write(f"**Blocks:** {friedman.n_blocks}")
+            st.write(f"**Test Statistic:** {friedman.statistic}")
+            st.write(f"**p-value:** {friedman.p_value}")
+            st.write(f"**Conclusion:** {friedman.conclusion}")
+            st.bar_chart(friedman.mean_ranks)
+
+            st.subheader(f"{friedman.posthoc_method} Post-hoc")
+            st.write(f"{len(friedman.significant_pairs)} of {len(friedman.posthoc)} pairs significant")
+            st.dataframe(friedman.posthoc)
+            performance_panel(trace.finish())
+        st.stop()
+
+    if analysis_mode == "One-Sample Screening":
+        screen_cols = st.multiselect("Select Columns", numeric_cols, default=numeric_cols)
+        screen_tests = st.multiselect("Select Tests", SCREENING_TESTS, default=SCREENING_TESTS)
+        screen_by = st.selectbox("Per Group of (optional)", ["None"] + data.columns.tolist())
+        screen_by = None if screen_by == "None" else screen_by
+        correction = st.selectbox("Multiple-Comparison Correction", CORRECTIONS)
+        min_group_size = st.number_input("Minimum group size", min_value=2, value=5)
+
+        if st.button("Run Screening"):
+            try:
+                with trace.profiling(), trace.stage("screen_one_sample"):
+                    screening = screen_one_sample(
+                        data, screen_cols, by=screen_by, tests=screen_tests, correction=correction,
+                        min_size=int(min_group_size),
+                    )
+            except Exception as e:
+                trace.finish("failed")
+                st.error(f"Error performing test: {str(e)}")
+                st.stop()
+
+            significant = screening.significant()
+            st.subheader("One-Sample Screening")
+            st.write(
+                f"{len(significant)} of {len(screening.table)} tests significant "
+                f"after {screening.correction} correction"
+            )
+            st.dataframe(significant)
+            with st.expander("All Results"):
+                st.dataframe(screening.table)
+            performance_panel(trace.finish())
+        st.stop()
+
     col1 = st.selectbox("Select Primary Column", numeric_cols)
     col2 = st.selectbox("Select Secondary Column (optional)", ["None"] + numeric_cols)
     col2 = None if col2 == "None" else col2
     
     # Test suggestions
-    suggested_tests = suggest_tests(data, col1, col2)
+    with trace.stage("suggest_tests"):
+        suggested_tests = suggest_tests(data, col1, col2, profile=profile)
     selected_test = st.selectbox("Select Statistical Test", suggested_tests)
     
     # Hypothesis input
@@ -121,97 +291,102 @@ if uploaded_file:
         null_hyp = st.text_input("Null Hypothesis (H0)", "No significant difference exists")
         alt_hyp = st.text_input("Alternative Hypothesis (H1)", "A significant difference exists")
     
+    # Resampling options
+    with st.expander("Resampling Options"):
+        use_resampling = st.checkbox(
+            "Permutation p-value and bootstrap CI",
+            disabled=selected_test not in RESAMPLING,
+        )
+        n_resamples = st.number_input("Max resamples", min_value=100, max_value=1_000_000, value=10_000, step=1000)
+        n_bootstrap = st.number_input(
+            "Max bootstrap resamples", min_value=0, max_value=100_000, value=2_000, step=500,
+            help="0 skips the bootstrap confidence interval",
+        )
+        resample_seed = st.number_input("Random seed", min_value=0, value=0, step=1)
+        resample_workers = st.slider("Worker processes", 1, 8, 1)
+
     # Visualization options
     with st.expander("Visualization Options"):
-        plot_options = ["Boxplot", "Violin Plot", "Distribution Plot", "Scatterplot"]
-        selected_plots = st.multiselect("Select Visualizations", plot_options, default=plot_options[:2])
+        selected_plots = st.multiselect("Select Visualizations", PLOT_TYPES, default=PLOT_TYPES[:2])
     
-    # Run analysis
+    # Run analysis in the background; the page polls the job until it finishes
+    runner = default_runner()
     if st.button("Run Full Analysis"):
-        # Initialize variables
-        stat = None
-        p_value = None
-        
-        # Perform the selected test
+        resampling = None
+        if use_resampling:
+            resampling = {
+                "n_resamples": int(n_resamples), "n_bootstrap": int(n_bootstrap),
+                "seed": int(resample_seed), "workers": resample_workers,
+            }
+        trace.labels["test"] = selected_test
         try:
-            if selected_test == "Mann-Whitney U Test":
-                stat, p_value = mannwhitneyu(data[col1], data[col2])
-            
-            elif selected_test == "Wilcoxon Signed-Rank Test":
-                stat, p_value = wilcoxon(data[col1], data[col2])
-            
-            elif selected_test == "Kruskal-Wallis Test":
-                grouped_data = [group[col1].values for _, group in data.groupby(col2)]
-                stat, p_value = kruskal(*grouped_data)
-            
-            elif selected_test == "Sign Test":
-                mu0 = data[col1].median()
-                differences = data[col1] - mu0
-                positive_count = (differences > 0).sum()
-                negative_count = (differences < 0).sum()
-                total_count = positive_count + negative_count
-                stat = positive_count
-                p_value = binom_test(positive_count, total_count, p=0.5, alternative='two-sided')
-            
-            elif selected_test == "Runs Test (Wald-Wolfowitz)":
-                stat, p_value = runstest_1samp(data[col1], correction=True)
-            
-            elif selected_test == "Kolmogorov-Smirnov Test":
-                stat, p_value = ks_2samp(data[col1], data[col2])
-            
-            elif selected_test == "Spearman's Rank Correlation":
-                stat, p_value = spearmanr(data[col1], data[col2])
-            
-            elif selected_test == "Kendall's Tau":
-                stat, p_value = kendalltau(data[col1], data[col2])
-            
-            elif selected_test == "Friedman Test":
-                stat, p_value = friedmanchisquare(*[data[col].values for col in numeric_cols[:3]])
-            
-            else:
-                st.error("Selected test not implemented yet.")
-                st.stop()
-        
-        except Exception as e:
-            st.error(f"Error performing test: {str(e)}")
+            st.session_state["analysis_job"] = runner.submit(
+                full_analysis, trace, data, digest, lean_mode, selected_test, col1, col2, ranks, resampling,
+                tuple(selected_plots), null_hyp, alt_hyp,
+                owner=session_id, label=f"{selected_test} on {', '.join(c for c in (col1, col2) if c)}",
+            )
+        except RuntimeError as e:
+            st.error(str(e))
             st.stop()
 
-        # Display results
-        st.subheader("Test Results")
-        st.write(f"**Test Statistic:** {stat}")
-        st.write(f"**p-value:** {p_value}")
-        st.write(f"**Conclusion:** {'Reject H0' if p_value < 0.05 else 'Fail to reject H0'}")
+    job = runner.get(st.session_state.get("analysis_job"))
+    if job is None:
+        st.stop()
+    if not job.done:
+        job_status(job.id)
+        st.stop()
+    if job.status == FAILED:
+        st.error(f"Error performing test: {job.error}")
+        st.stop()
+    if job.status != DONE:
+        st.warning(f"{job.label}: {job.error}")
+        st.stop()
 
-        # Generate visualizations
-        figs = generate_visualizations(data, col1, col2, selected_plots)
-        for fig in figs:
-            st.pyplot(fig)
-
-        # Prepare PDF report
-        with st.spinner("Generating Report..."):
-            test_results = {
-                "Test Performed": selected_test,
-                "Null Hypothesis": null_hyp,
-                "Alternative Hypothesis": alt_hyp,
-                "Test Results": f"Statistic: {stat}\nP-value: {p_value}",
-                "Conclusion": "Reject H0" if p_value < 0.05 else "Fail to reject H0"
-            }
-            
-            # Save visualizations temporarily
-            img_paths = []
-            for idx, fig in enumerate(figs):
-                with NamedTemporaryFile(delete=False, suffix=".png") as tmpfile:
-                    fig.savefig(tmpfile.name, bbox_inches="tight")
-                    img_paths.append(tmpfile.name)
-                plt.close(fig)
-            
-            # Create PDF
-            pdf_bytes = create_pdf_report(test_results, img_paths)
-            
-            # Offer download
-            st.download_button(
-                label="Download Full Report",
-                data=pdf_bytes,
-                file_name="statistical_report.pdf",
-                mime="application/pdf"
-            )
\ No newline at end of file
+    result, resampled, images, pdf_bytes, trace = job.result
+    store = default_store()
+    st.sidebar.caption(
+        f"Result cache: {store.hits} of {store.hits + store.misses} lookups hit ({store.hit_rate:.0%})"
+    )
+
+    # Display results
+    st.subheader("Test Results")
+    st.caption(f"{job.label} ({job.elapsed:.1f}s)")
+    st.write(f"**Test Statistic:** {result.statistic}")
+    st.write(f"**p-value:** {result.p_value}")
+    st.write(f"**Conclusion:** {result.conclusion}")
+    if result.details.get("tau_a") is not None:
+        details = result.details
+        st.write(f"**tau-a:** {details['tau_a']:.4g}, **tau-c:** {details['tau_c']:.4g} ({details['method']} p-value)")
+        if details.get("ci") is not None:
+            low, high = details["ci"]
+            st.write(
+                f"**tau-b {details['confidence']:.0%} jackknife CI:** {low:.4g} to {high:.4g} "
+                f"(SE {details['jackknife_se']:.4g}); **weighted tau:** {details['weighted_tau']:.4g}"
+            )
+
+    if resampled is not None:
+        kind = "Exact" if resampled.exact else "Monte Carlo"
+        st.write(
+            f"**{kind} permutation p-value:** {resampled.p_value:.6g} "
+            f"({resampled.resamples} resamples"
+            f"{', stopped early' if resampled.stopped_early else ''})"
+        )
+        if resampled.effect_ci is not None:
+            st.write(
+                f"**{resampled.effect}:** {resampled.effect_value:.4g} "
+                f"({resampled.confidence:.0%} bootstrap CI {resampled.effect_ci[0]:.4g} to {resampled.effect_ci[1]:.4g}, "
+                f"{resampled.bootstrap_resamples} resamples)"
+            )
+
+    for image in images:
+        st.image(image)
+
+    # Offer download
+    st.download_button(
+        label="Download Full Report",
+        data=pdf_bytes,
+        file_name="statistical_report.pdf",
+        mime="application/pdf",
+        on_click="ignore",
+    )
+    performance_panel(trace)
@@ -1,13 +1,23 @@
 import streamlit as st
-import pandas as pd
-from utils.handle_missing import handle_missing_values
-from utils.remove_duplicates import remove_duplicates
-from utils.standardize_text import standardize_text
-from utils.correct_inconsistent import correct_inconsistent_data
-from utils.change_datatype import change_data_type
-from utils.handle_format import handle_data_format
-from utils.enforce_integrity import enforce_data_integrity
-from utils.handle_numeric import handle_numeric_data
+from functools import partial
+from utils.cleaning_plan import describe, dumps, loads, run_plan, step
+from utils.column_profile import get_profile
+from utils.export import EXCEL_MAX_ROWS, available_formats, export_bytes, export_name
+from utils.load_data import load_data
+
+PREVIEW_ROWS = 1000
+
+
+def add_step(entry):
+    # Validate the new step against the current plan before recording it
+    try:
+        run_plan(base_df, plan + [entry], base_key)
+    except Exception as e:
+        st.error(f"Error applying step: {str(e)}")
+        return
+    plan.append(entry)
+    st.rerun()
+
 
 # Title of the app
 st.title("Data Cleaning App")
@@ -16,22 +26,52 @@ st.title("Data Cleaning App")
 uploaded_file = st.file_uploader("Upload your CSV or Excel file", type=["csv", "xlsx"])
 
 if uploaded_file is not None:
-    # Read the file
-    if uploaded_file.name.endswith('.csv'):
-        df = pd.read_csv(uploaded_file)
-    else:
-        df = pd.read_excel(uploaded_file)
+    # Read the file (parsed once per distinct upload, then served from cache)
+    base_df, digest = load_data(uploaded_file, with_digest=True)
+    base_key = (digest, False)
+    profile = get_profile(base_df, base_key)
+
+    # Cleaning steps are recorded as a plan per upload and applied lazily;
+    # every stage is cached under the hash of its plan prefix
+    plan = st.session_state.setdefault("plans", {}).setdefault(digest, [])
+    st.sidebar.write("### Cleaning Plan")
+    plan_file = st.sidebar.file_uploader("Replay a saved plan", type=["json"])
+    if plan_file is not None and st.session_state.get("loaded_plan") != plan_file.file_id:
+        try:
+            plan[:] = loads(plan_file.getvalue())
+        except Exception as e:
+            st.sidebar.error(f"Invalid plan: {str(e)}")
+        st.session_state["loaded_plan"] = plan_file.file_id
+    for number, entry in enumerate(plan, start=1):
+        st.sidebar.write(f"{number}. `{describe(entry)}`")
+    undo_col, reset_col = st.sidebar.columns(2)
+    if undo_col.button("Undo", disabled=not plan):
+        plan.pop()
+        st.rerun()
+    if reset_col.button("Reset", disabled=not plan):
+        plan.clear()
+        st.rerun()
+    st.sidebar.download_button(
+        "Download Plan", dumps(plan), file_name="cleaning_plan.json", mime="application/json", on_click="ignore",
+    )
+
+    try:
+        df = run_plan(base_df, plan, base_key)
+    except Exception as e:
+        st.error(f"Error applying plan: {str(e)}")
+        st.stop()
 
     # Show the dataset
     st.write("### Dataset Preview")
-    st.write(df)
+    st.write(base_df.head(PREVIEW_ROWS))
 
-    # Show key features of the dataset
+    # Show key features of the dataset (profiled once per upload)
     st.write("### Key Features")
-    st.write(f"Number of Rows: {df.shape[0]}")
-    st.write(f"Number of Columns: {df.shape[1]}")
-    st.write("Columns and Data Types:")
-    st.write(df.dtypes)
+    st.write(f"Number of Rows: {base_df.shape[0]}")
+    st.write(f"Number of Columns: {base_df.shape[1]}")
+    st.write(f"Missing Values: {int(profile['nulls'].sum())}")
+    st.write("Column Profile:")
+    st.write(profile)
 
     # Handle Missing Values
     if st.checkbox("Handle Missing Values"):
@@ -52,26 +92,20 @@ if uploaded_file is not None:
         else:
             fill_value = None
         if st.button("Apply Missing Value Handling"):
-            df = handle_missing_values(df, option, fill_value)
-            st.write("Updated Dataset:")
-            st.write(df)
+            add_step(step("handle_missing", option=option, fill_value=fill_value))
 
     # Remove Duplicates
     if st.checkbox("Remove Duplicates"):
         st.write("### Remove Duplicates")
         if st.button("Remove Duplicates"):
-            df = remove_duplicates(df)
-            st.write("Updated Dataset:")
-            st.write(df)
+            add_step(step("remove_duplicates"))
 
     # Standardize Text
     if st.checkbox("Standardize Text"):
         st.write("### Standardize Text")
         text_column = st.selectbox("Select text column to standardize:", df.columns)
         if st.button("Standardize"):
-            df = standardize_text(df, text_column)
-            st.write("Updated Dataset:")
-            st.write(df)
+            add_step(step("standardize_text", col=text_column))
 
     # Correct Inconsistent Data
     if st.checkbox("Correct Inconsistent Data"):
@@ -80,9 +114,7 @@ if uploaded_file is not None:
         old_value = st.text_input("Enter the value to replace:")
         new_value = st.text_input("Enter the new value:")
         if st.button("Replace"):
-            df = correct_inconsistent_data(df, column, old_value, new_value)
-            st.write("Updated Dataset:")
-            st.write(df)
+            add_step(step("correct_inconsistent", col=column, old_value=old_value, new_value=new_value))
 
     # Change Data Type
     if st.checkbox("Change Data Type"):
@@ -93,9 +125,7 @@ if uploaded_file is not None:
             ["String", "Integer", "Float", "Datetime"]
         )
         if st.button("Change"):
-            df = change_data_type(df, column, new_type)
-            st.write("Updated Dataset:")
-            st.write(df)
+            add_step(step("change_datatype", col=column, new_type=new_type))
 
     # Handle Data Format Issues
     if st.checkbox("Handle Data Format Issues"):
@@ -108,9 +138,10 @@ if uploaded_file is not None:
         if format_type == "Date":
             date_format = st.text_input("Enter date format (e.g., YYYY-MM-DD):")
         if st.button("Fix Format"):
-            df = handle_data_format(df, column, format_type, date_format if format_type == "Date" else None)
-            st.write("Updated Dataset:")
-            st.write(df)
+            add_step(step(
+                "handle_format", col=column, format_type=format_type,
+                date_format=date_format if format_type == "Date" else None,
+            ))
 
     # Enforce Data Integrity
     if st.checkbox("Enforce Data Integrity"):
@@ -124,9 +155,11 @@ if uploaded_file is not None:
             min_value = st.number_input("Enter minimum value:")
             max_value = st.number_input("Enter maximum value:")
         if st.button("Apply Rule"):
-            df = enforce_data_integrity(df, column, rule, min_value if rule == "Numeric Range" else None, max_value if rule == "Numeric Range" else None)
-            st.write("Updated Dataset:")
-            st.write(df)
+            add_step(step(
+                "enforce_integrity", col=column, rule=rule,
+                min_value=min_value if rule == "Numeric Range" else None,
+                max_value=max_value if rule == "Numeric Range" else None,
+            ))
 
     # Handle Numeric Data
     if st.checkbox("Handle Numeric Data"):
@@ -141,27 +174,29 @@ if uploaded_file is not None:
         elif operation == "Round":
             decimals = st.number_input("Enter number of decimal places:", min_value=0, max_value=10, value=2)
         if st.button("Apply Operation"):
-            df = handle_numeric_data(df, column, operation, scale_factor if operation == "Scale" else None, decimals if operation == "Round" else None)
-            st.write("Updated Dataset:")
-            st.write(df)
-
-    # Download Cleaned Data
-    if st.button("Download Cleaned Data"):
-        st.write("### Download Cleaned Data")
-        file_format = st.selectbox("Choose file format:", ["CSV", "Excel"])
-        if file_format == "CSV":
-            df.to_csv("cleaned_data.csv", index=False)
-            st.download_button(
-                label="Download CSV",
-                data=open("cleaned_data.csv", "rb").read(),
-                file_name="cleaned_data.csv",
-                mime="text/csv"
-            )
-        else:
-            df.to_excel("cleaned_data.xlsx", index=False)
-            st.download_button(
-                label="Download Excel",
-                data=open("cleaned_data.xlsx", "rb").read(),
-                file_name="cleaned_data.xlsx",
-                mime="application/vnd.ms-excel"
-            )
\ No newline at end of file
+            add_step(step(
+                "handle_numeric", col=column, operation=operation,
+                scale_factor=scale_factor if operation == "Scale" else None,
+                decimals=decimals if operation == "Round" else None,
+            ))
+
+    # Cleaned result of the whole plan
+    if plan:
+        st.write("### Cleaned Dataset")
+        st.write(f"{len(plan)} steps; {df.shape[0]} rows x {df.shape[1]} columns")
+        st.write(df.head(PREVIEW_ROWS))
+
+    # Download Cleaned Data: serialized in memory, and only when the download is clicked
+    st.write("### Download Cleaned Data")
+    file_format = st.selectbox("Choose file format:", available_formats())
+    file_name, mime = export_name("cleaned_data", file_format)
+    if file_format == "Excel" and len(df) > EXCEL_MAX_ROWS:
+        st.error(f"Excel sheets hold at most {EXCEL_MAX_ROWS} rows; choose CSV or Parquet")
+    else:
+        st.download_button(
+            label=f"Download {file_format}",
+            data=partial(export_bytes, df, file_format),
+            file_name=file_name,
+            mime=mime,
+            on_click="ignore",
+        )
@@ -0,0 +1,5 @@
+"""Reproducible performance benchmarks for the engine, plots, reports, cleaning and loading.
+
+Run ``python -m benchmarks --help``; results are JSON and can be compared
+against a stored baseline.
+"""
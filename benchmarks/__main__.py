@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import sys
+
+from benchmarks.suite import GROUPS, compare, environment, run_suite
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time the tests, plots, reports, cleaning operations and file loading on synthetic data.",
+    )
+    parser.add_argument(
+        "--sizes", nargs="+", type=lambda value: int(float(value)), default=[1_000, 10_000, 100_000],
+        help="dataset row counts (e.g. 1e3 1e5 1e7)",
+    )
+    parser.add_argument("--group", action="append", choices=GROUPS, help="only run this group; repeatable")
+    parser.add_argument("--match", help="only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (the best is reported)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory run")
+    parser.add_argument("--columns", type=int, default=4, help="numeric columns in the synthetic data")
+    parser.add_argument("--ties", type=float, default=0.1, help="share of tied values per numeric column")
+    parser.add_argument("--skew", type=float, default=0.5, help="log-normal shape (0 = normal data)")
+    parser.add_argument("--groups", type=int, default=5, help="labels in the group column")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", default=BASELINE, help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on any regression")
+    return parser
+
+
+def _line(record):
+    if "error" in record:
+        return f"{record['case']:42s} {record['rows']:>10d}  error: {record['error']}"
+    peak = "" if record.get("peak_mb") is None else f"{record['peak_mb']:9.1f} MB"
+    line = f"{record['case']:42s} {record['rows']:>10d} {record['seconds']:10.4f}s {peak}"
+    if "ratio" in record:
+        line += f"  x{record['ratio']:.2f} vs baseline"
+    return line
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    dataset = {"columns": args.columns, "ties": args.ties, "skew": args.skew, "groups": args.groups, "seed": args.seed}
+
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+
+    def progress(record):
+        if baseline is not None:
+            compare([record], baseline, args.threshold)
+        print(_line(record), flush=True)
+
+    records = run_suite(
+        args.sizes, groups=args.group, match=args.match, repeat=args.repeat,
+        memory=not args.no_memory, dataset=dataset, progress=progress,
+    )
+    regressions = compare(records, baseline, args.threshold) if baseline is not None else []
+
+    with open(args.output, "w") as handle:
+        json.dump({"environment": environment(), "dataset": dataset, "results": records}, handle, indent=2)
+    print(f"\n{len(records)} results written to {args.output}")
+    if regressions:
+        print(f"{len(regressions)} regressions slower than x{args.threshold} the baseline:")
+        for record in regressions:
+            print("  " + _line(record))
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def _with_ties(values, ties):
+    # Snap values up to a quantile grid of about (1 - ties) * n points, so the
+    # share of tied values is the same whatever the skew
+    if ties <= 0:
+        return values
+    distinct = max(2, int(round(len(values) * (1.0 - ties))))
+    # np.quantile's linear interpolation from one sort (it selects each of the
+    # ~n quantiles separately, which is quadratic)
+    ordered = np.sort(values)
+    grid = np.interp(np.linspace(0.0, len(values) - 1, distinct), np.arange(len(values)), ordered)
+    return grid[np.minimum(np.searchsorted(grid, values), distinct - 1)]
+
+
+def make_dataset(rows, columns=4, ties=0.1, skew=0.5, groups=5, text=False, seed=0):
+    """Synthetic frame with controlled ties, skew, group count and column count.
+
+    Numeric columns ``v0..v{columns-1}`` are log-normal with shape ``skew``
+    (0 gives normal data), ``v1`` is correlated with ``v0`` and ``v2`` is
+    shifted, so tests have something to find. ``group`` holds ``groups``
+    string labels. With ``text`` the messy text, email, phone and date
+    columns used by the cleaning benchmarks are added.
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.standard_normal(rows)
+    data = {}
+    for i in range(columns):
+        noise = rng.standard_normal(rows)
+        values = 0.3 * base + np.sqrt(1 - 0.09) * noise if i == 1 else (base if i == 0 else noise)
+        if i == 2:
+            values = values + 0.1
+        if skew > 0:
+            values = np.exp(skew * values)
+        values = _with_ties(values, ties)
+        # A sprinkling of missing values in the later columns
+        if i >= 3:
+            values[rng.random(rows) < 0.01] = np.nan
+        data[f"v{i}"] = values
+    data["group"] = np.char.add("g", rng.integers(0, groups, rows).astype(str))
+
+    if text:
+        cities = np.array(["  New York ", "new  york", "Boston", "BOSTON ", "chicago", None], dtype=object)
+        data["city"] = cities[rng.integers(0, len(cities), rows)]
+        user = rng.integers(0, 10 ** 6, rows).astype(str)
+        data["email"] = np.where(rng.random(rows) < 0.9, np.char.add(user, "@example.com"), np.char.add(user, "@"))
+        digits = pd.Series(rng.integers(2 * 10 ** 9, 10 ** 10 - 1, rows).astype(str))
+        data["phone"] = (digits.str[:3] + "-" + digits.str[3:6] + "-" + digits.str[6:]).to_numpy()
+        dates = np.datetime64("2000-01-01") + rng.integers(0, 9000, rows).astype("timedelta64[D]")
+        data["date"] = pd.Series(dates).dt.strftime("%d/%m/%Y").to_numpy()
+    return pd.DataFrame(data)
@@ -0,0 +1,336 @@
+import gc
+import platform
+import time
+import tracemalloc
+from dataclasses import dataclass
+from functools import cached_property
+
+from benchmarks.datasets import make_dataset
+
+GROUPS = ["tests", "modes", "kernels", "plots", "report", "cleaning", "ingest", "export"]
+
+
+@dataclass
+class Case:
+    name: str
+    group: str
+    run: object  # run(context) -> None
+    max_rows: int = 10_000_000
+
+
+class Context:
+    """Inputs shared by all cases at one dataset size, each built on first use."""
+
+    def __init__(self, rows, columns=4, ties=0.1, skew=0.5, groups=5, seed=0):
+        self.rows = rows
+        self.options = {"columns": columns, "ties": ties, "skew": skew, "groups": groups, "seed": seed}
+
+    @cached_property
+    def data(self):
+        return make_dataset(self.rows, **self.options)
+
+    @cached_property
+    def text_data(self):
+        return make_dataset(self.rows, text=True, **self.options)
+
+    @cached_property
+    def csv_bytes(self):
+        from utils.export import export_bytes
+
+        return export_bytes(self.data, "CSV")
+
+    @cached_property
+    def excel_bytes(self):
+        from utils.export import export_bytes
+
+        return export_bytes(self.data, "Excel")
+
+    @cached_property
+    def images(self):
+        from nptests.plots import generate_visualizations
+        from nptests.report import render_figures
+
+        return render_figures(generate_visualizations(self.data, "v0", "group", ["Boxplot", "Violin Plot"]))
+
+    @cached_property
+    def ranks(self):
+        from nptests.ranks import RankCache
+
+        # Shared across kernel cases: the warm-up run sorts each column once
+        return RankCache(self.data)
+
+    @cached_property
+    def result(self):
+        from nptests import run_test
+
+        return run_test(self.data, "Mann-Whitney U Test", "v0", "v1")
+
+
+def _test_case(test):
+    def run(ctx):
+        from nptests import run_test
+        from nptests.ranks import RankCache
+
+        # A fresh rank cache each time: the cold path of one "Run Full Analysis"
+        col2 = "group" if test == "Kruskal-Wallis Test" else "v1"
+        run_test(ctx.data, test, "v0", col2, ranks=RankCache(ctx.data), columns=["v0", "v1", "v2"])
+    return run
+
+
+def _resample_case(test):
+    def run(ctx):
+        from nptests.resample import resample_test
+
+        resample_test(ctx.data, test, "v0", "v1", n_resamples=2_000, n_bootstrap=200, early_stop=False)
+    return run
+
+
+def _plot_case(plot):
+    def run(ctx):
+        from nptests.plots import generate_visualizations
+        from nptests.report import render_figures
+
+        col2 = "group" if plot in ("Boxplot", "Violin Plot") else "v1"
+        render_figures(generate_visualizations(ctx.data, "v0", col2, [plot]), workers=1)
+    return run
+
+
+def _cleaning_case(op, **params):
+    def run(ctx):
+        from utils.cleaning_plan import OPERATIONS
+
+        OPERATIONS[op](ctx.text_data, **params)
+    return run
+
+
+def _export_case(fmt):
+    def run(ctx):
+        from utils.export import export_bytes
+
+        export_bytes(ctx.data, fmt)
+    return run
+
+
+def _suggest(ctx):
+    from nptests import suggest_tests
+
+    suggest_tests(ctx.data, "v0", "v1")
+
+
+def _profile(ctx):
+    from utils.column_profile import profile_columns
+
+    profile_columns(ctx.data)
+
+
+def _matrix(ctx):
+    from nptests.matrix import pairwise_matrix
+
+    pairwise_matrix(ctx.data, [col for col in ctx.data.columns if col.startswith("v")])
+
+
+def _grouped(posthoc):
+    def run(ctx):
+        from nptests.grouped import kruskal_dunn
+
+        kruskal_dunn(ctx.data, "v0", "group", posthoc=posthoc)
+    return run
+
+
+def _friedman(ctx):
+    from nptests.friedman import friedman_test
+
+    friedman_test(ctx.data, ["v0", "v1", "v2"])
+
+
+def _kendall_kernel(jackknife):
+    def run(ctx):
+        from nptests.kernels import kendall_tau
+
+        kendall_tau(ctx.ranks.column("v0").codes, ctx.ranks.column("v1").codes, jackknife=jackknife)
+    return run
+
+
+def _ks_kernel(ctx):
+    from nptests.kernels import ks_statistic
+
+    ks_statistic(ctx.ranks.column("v0"), ctx.ranks.column("v1"))
+
+
+def _scipy_case(name):
+    def run(ctx):
+        from scipy import stats
+
+        getattr(stats, name)(ctx.data["v0"].to_numpy(), ctx.data["v1"].to_numpy())
+    return run
+
+
+def _render_report(ctx):
+    from nptests.report import render_figures
+    from nptests.plots import generate_visualizations
+
+    render_figures(generate_visualizations(ctx.data, "v0", "group", ["Boxplot", "Violin Plot"]))
+
+
+def _pdf(ctx):
+    from nptests.report import create_pdf_report, report_sections
+
+    create_pdf_report(report_sections(ctx.result, "H0", "H1"), ctx.images)
+
+
+def _parse(name, lean=False):
+    def run(ctx):
+        from utils.load_data import _parse as parse
+
+        raw = ctx.excel_bytes if name.endswith(".xlsx") else ctx.csv_bytes
+        parse(raw, name, lean=lean)
+    return run
+
+
+def _plan(ctx):
+    from utils.cleaning_plan import run_plan, step
+
+    run_plan(ctx.text_data, [
+        step("standardize_text", col="city"),
+        step("handle_missing", option="Fill missing values", fill_value="mean"),
+        step("remove_duplicates"),
+    ])
+
+
+def build_cases():
+    from nptests.engine import TESTS
+    from nptests.plots import PLOT_TYPES
+
+    cases = [Case(f"test/{test}", "tests", _test_case(test)) for test in TESTS]
+    cases += [
+        Case("suggest_tests", "tests", _suggest),
+        Case("profile_columns", "tests", _profile),
+        Case("matrix/all pairs", "modes", _matrix),
+        Case("grouped/Dunn", "modes", _grouped("Dunn")),
+        Case("grouped/Pairwise Mann-Whitney", "modes", _grouped("Pairwise Mann-Whitney")),
+        Case("friedman/Nemenyi", "modes", _friedman),
+        Case("resample/Mann-Whitney U Test", "modes", _resample_case("Mann-Whitney U Test"), 1_000_000),
+        Case("resample/Spearman's Rank Correlation", "modes", _resample_case("Spearman's Rank Correlation"), 1_000_000),
+    ]
+    cases += [
+        # The kernels on cached ranks next to scipy on the raw columns
+        Case("kernel/Kendall totals", "kernels", _kendall_kernel(False)),
+        Case("kernel/Kendall jackknife + weighted", "kernels", _kendall_kernel(True)),
+        Case("kernel/scipy kendalltau", "kernels", _scipy_case("kendalltau")),
+        Case("kernel/scipy weightedtau", "kernels", _scipy_case("weightedtau")),
+        Case("kernel/KS sorted merge", "kernels", _ks_kernel),
+        Case("kernel/scipy ks_2samp", "kernels", _scipy_case("ks_2samp")),
+    ]
+    cases += [Case(f"plot/{plot}", "plots", _plot_case(plot)) for plot in PLOT_TYPES]
+    cases += [
+        Case("report/render figures", "report", _render_report),
+        Case("report/create_pdf_report", "report", _pdf),
+        Case("clean/fill mean", "cleaning", _cleaning_case("handle_missing", option="Fill missing values", fill_value="mean")),
+        Case("clean/dropna", "cleaning", _cleaning_case("handle_missing", option="Remove rows with missing values")),
+        Case("clean/remove duplicates", "cleaning", _cleaning_case("remove_duplicates")),
+        Case("clean/standardize text", "cleaning", _cleaning_case("standardize_text", col="city")),
+        Case("clean/correct inconsistent", "cleaning", _cleaning_case("correct_inconsistent", col="city", old_value="Boston", new_value="boston")),
+        Case("clean/to integer", "cleaning", _cleaning_case("change_datatype", col="v0", new_type="Integer")),
+        Case("clean/date format", "cleaning", _cleaning_case("handle_format", col="date", format_type="Date", date_format="DD/MM/YYYY")),
+        Case("clean/phone format", "cleaning", _cleaning_case("handle_format", col="phone", format_type="Phone Number")),
+        Case("clean/email validation", "cleaning", _cleaning_case("enforce_integrity", col="email", rule="Email Validation")),
+        Case("clean/numeric range", "cleaning", _cleaning_case("enforce_integrity", col="v0", rule="Numeric Range", min_value=0.5, max_value=2.0)),
+        Case("clean/normalize", "cleaning", _cleaning_case("handle_numeric", col="v0", operation="Normalize")),
+        Case("clean/plan of 3 steps", "cleaning", _plan),
+        Case("ingest/CSV", "ingest", _parse("data.csv")),
+        Case("ingest/CSV lean", "ingest", _parse("data.csv", lean=True)),
+        # Excel files are slow to write and capped at ~1e6 rows
+        Case("ingest/Excel", "ingest", _parse("data.xlsx"), 100_000),
+    ]
+    cases += [
+        Case(f"export/{fmt}", "export", _export_case(fmt), 100_000 if fmt == "Excel" else 10_000_000)
+        for fmt in ("CSV", "CSV (gzip)", "CSV (zstd)", "Parquet", "Excel")
+    ]
+    return cases
+
+
+def measure(func, repeat=3, memory=True):
+    """Best and mean wall time over ``repeat`` runs, plus the peak traced memory of one more run.
+
+    Timed runs are untraced: tracemalloc slows Python-heavy code severalfold.
+    NumPy reports its buffers to tracemalloc, so the peak covers arrays too.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "seconds": min(times),
+        "mean_seconds": sum(times) / len(times),
+        "repeat": repeat,
+        "peak_mb": None if peak is None else peak / 1024 ** 2,
+    }
+
+
+def run_suite(sizes, groups=None, match=None, repeat=3, memory=True, dataset=None, progress=None):
+    """Time every selected case at every size; returns a list of result records."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    cases = [
+        case for case in build_cases()
+        if (not groups or case.group in groups) and (not match or match.lower() in case.name.lower())
+    ]
+    records = []
+    for rows in sizes:
+        ctx = Context(rows, **(dataset or {}))
+        for case in cases:
+            if rows > case.max_rows:
+                continue
+            try:
+                case.run(ctx)  # warm-up: imports, lazy inputs and caches
+                record = measure(lambda: case.run(ctx), repeat=repeat, memory=memory)
+            except Exception as e:
+                record = {"error": f"{type(e).__name__}: {e}"}
+            record = {"case": case.name, "group": case.group, "rows": rows, **record}
+            records.append(record)
+            if progress is not None:
+                progress(record)
+    return records
+
+
+def environment():
+    import numpy
+    import pandas
+    import scipy
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "scipy": scipy.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(records, baseline, threshold=1.25):
+    """Attach the baseline time and ratio to each record; returns the regressed records."""
+    previous = {(r["case"], r["rows"]): r for r in baseline.get("results", []) if "seconds" in r}
+    regressions = []
+    for record in records:
+        before = previous.get((record["case"], record["rows"]))
+        if before is None or "seconds" not in record:
+            continue
+        record["baseline_seconds"] = before["seconds"]
+        record["ratio"] = record["seconds"] / before["seconds"] if before["seconds"] > 0 else float("inf")
+        if record["ratio"] > threshold:
+            regressions.append(record)
+    return regressions
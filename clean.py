@@ -1,29 +1,86 @@
 import streamlit as st
-import pandas as pd
+from functools import partial
+from utils.cleaning_plan import describe, dumps, loads, run_plan, step
+from utils.column_profile import get_profile
+from utils.export import EXCEL_MAX_ROWS, available_formats, export_bytes, export_name
+from utils.load_data import load_data
+
+PREVIEW_ROWS = 1000
+
+
+def add_step(entry):
+    # Validate the new step against the current plan before recording it
+    try:
+        run_plan(base_df, plan + [entry], base_key)
+    except Exception as e:
+        st.error(f"Error applying step: {str(e)}")
+        return
+    plan.append(entry)
+    st.rerun()
 
 # Title of the app
 st.title("Data Cleaning App")
 
 # File uploader
+lean_mode = st.sidebar.checkbox(
+    "Memory-lean loading",
+    help="Stream CSVs in chunks with narrowed numeric dtypes and categorical text columns.",
+)
 uploaded_file = st.file_uploader("Upload your CSV or Excel file", type=["csv", "xlsx"])
 
 if uploaded_file is not None:
-    # Read the file
-    if uploaded_file.name.endswith('.csv'):
-        df = pd.read_csv(uploaded_file)
-    else:
-        df = pd.read_excel(uploaded_file)
+    # Read the file (parsed once per distinct upload, then served from cache)
+    base_df, digest = load_data(uploaded_file, with_digest=True, lean=lean_mode)
+    base_key = (digest, lean_mode)
+    profile = get_profile(base_df, base_key)
+    report = base_df.attrs.get("memory_report")
+    if report:
+        st.caption(
+            f"Memory-lean loading: {report['before'] / 1024 ** 2:.1f} MB -> "
+            f"{report['after'] / 1024 ** 2:.1f} MB ({report['saved'] / 1024 ** 2:.1f} MB saved)"
+        )
+
+    # Cleaning steps are recorded as a plan per upload and applied lazily;
+    # every stage is cached under the hash of its plan prefix
+    plan = st.session_state.setdefault("plans", {}).setdefault(base_key, [])
+    st.sidebar.write("### Cleaning Plan")
+    plan_file = st.sidebar.file_uploader("Replay a saved plan", type=["json"])
+    if plan_file is not None and st.session_state.get("loaded_plan") != plan_file.file_id:
+        try:
+            plan[:] = loads(plan_file.getvalue())
+        except Exception as e:
+            st.sidebar.error(f"Invalid plan: {str(e)}")
+        st.session_state["loaded_plan"] = plan_file.file_id
+    for number, entry in enumerate(plan, start=1):
+        st.sidebar.write(f"{number}. `{describe(entry)}`")
+    undo_col, reset_col = st.sidebar.columns(2)
+    if undo_col.button("Undo", disabled=not plan):
+        plan.pop()
+        st.rerun()
+    if reset_col.button("Reset", disabled=not plan):
+        plan.clear()
+        st.rerun()
+    st.sidebar.download_button(
+        "Download Plan", dumps(plan), file_name="cleaning_plan.json", mime="application/json", on_click="ignore",
+    )
+
+    try:
+        df = run_plan(base_df, plan, base_key)
+    except Exception as e:
+        st.error(f"Error applying plan: {str(e)}")
+        st.stop()
 
     # Show the dataset
     st.write("### Dataset Preview")
-    st.write(df)
+    st.write(base_df.head(PREVIEW_ROWS))
 
-    # Show key features of the dataset
+    # Show key features of the dataset (profiled once per upload)
     st.write("### Key Features")
-    st.write(f"Number of Rows: {df.shape[0]}")
-    st.write(f"Number of Columns: {df.shape[1]}")
-    st.write("Columns and Data Types:")
-    st.write(df.dtypes)
+    st.write(f"Number of Rows: {base_df.shape[0]}")
+    st.write(f"Number of Columns: {base_df.shape[1]}")
+    st.write(f"Missing Values: {int(profile['nulls'].sum())}")
+    st.write("Column Profile:")
+    st.write(profile)
 
     # Handle Missing Values
     if st.checkbox("Handle Missing Values"):
@@ -32,27 +89,17 @@ if uploaded_file is not None:
             "Choose an option:",
             ["Remove rows with missing values", "Fill missing values"]
         )
-
-        if option == "Remove rows with missing values":
-            df = df.dropna()
-        else:
+        fill_value = None
+        if option == "Fill missing values":
             fill_value = st.text_input("Enter value to fill missing data (e.g., 0, mean, median):")
-            if fill_value == "mean":
-                df = df.fillna(df.mean())
-            elif fill_value == "median":
-                df = df.fillna(df.median())
-            else:
-                df = df.fillna(fill_value)
-
-        st.write("Updated Dataset:")
-        st.write(df)
+        if st.button("Add Missing Value Step"):
+            add_step(step("handle_missing", option=option, fill_value=fill_value))
 
     # Remove Duplicates
     if st.checkbox("Remove Duplicates"):
         st.write("### Remove Duplicates")
-        df = df.drop_duplicates()
-        st.write("Updated Dataset:")
-        st.write(df)
+        if st.button("Add Duplicate Removal Step"):
+            add_step(step("remove_duplicates"))
 
     # Rename Columns
     if st.checkbox("Rename Columns"):
@@ -60,9 +107,7 @@ if uploaded_file is not None:
         old_name = st.selectbox("Select column to rename:", df.columns)
         new_name = st.text_input("Enter new column name:")
         if st.button("Rename"):
-            df = df.rename(columns={old_name: new_name})
-            st.write("Updated Dataset:")
-            st.write(df)
+            add_step(step("rename_column", old_name=old_name, new_name=new_name))
 
     # Filter Data
     if st.checkbox("Filter Data"):
@@ -70,27 +115,25 @@ if uploaded_file is not None:
         column = st.selectbox("Select column to filter:", df.columns)
         filter_value = st.text_input(f"Enter value to filter by in column '{column}':")
         if st.button("Apply Filter"):
-            df = df[df[column] == filter_value]
-            st.write("Updated Dataset:")
-            st.write(df)
-
-    # Download Cleaned Data
-    if st.button("Download Cleaned Data"):
-        st.write("### Download Cleaned Data")
-        file_format = st.selectbox("Choose file format:", ["CSV", "Excel"])
-        if file_format == "CSV":
-            df.to_csv("cleaned_data.csv", index=False)
-            st.download_button(
-                label="Download CSV",
-                data=open("cleaned_data.csv", "rb").read(),
-                file_name="cleaned_data.csv",
-                mime="text/csv"
-            )
-        else:
-            df.to_excel("cleaned_data.xlsx", index=False)
-            st.download_button(
-                label="Download Excel",
-                data=open("cleaned_data.xlsx", "rb").read(),
-                file_name="cleaned_data.xlsx",
-                mime="application/vnd.ms-excel"
-            )
\ No newline at end of file
+            add_step(step("filter_rows", column=column, value=filter_value))
+
+    # Cleaned result of the whole plan
+    if plan:
+        st.write("### Cleaned Dataset")
+        st.write(f"{len(plan)} steps; {df.shape[0]} rows x {df.shape[1]} columns")
+        st.write(df.head(PREVIEW_ROWS))
+
+    # Download Cleaned Data: serialized in memory, and only when the download is clicked
+    st.write("### Download Cleaned Data")
+    file_format = st.selectbox("Choose file format:", available_formats())
+    file_name, mime = export_name("cleaned_data", file_format)
+    if file_format == "Excel" and len(df) > EXCEL_MAX_ROWS:
+        st.error(f"Excel sheets hold at most {EXCEL_MAX_ROWS} rows; choose CSV or Parquet")
+    else:
+        st.download_button(
+            label=f"Download {file_format}",
+            data=partial(export_bytes, df, file_format),
+            file_name=file_name,
+            mime=mime,
+            on_click="ignore",
+        )
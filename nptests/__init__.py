@@ -0,0 +1,8 @@
+"""Headless non-parametric testing engine behind the Streamlit apps.
+
+Plotting and PDF helpers live in ``nptests.plots`` and ``nptests.report`` and
+load matplotlib/seaborn/fpdf only when called.
+"""
+from nptests.engine import TESTS, TestResult, run_test, suggest_tests
+
+__all__ = ["TESTS", "TestResult", "run_test", "suggest_tests"]
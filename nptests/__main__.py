@@ -0,0 +1,5 @@
+import sys
+
+from nptests.cli import main
+
+sys.exit(main())
@@ -0,0 +1,219 @@
+import argparse
+import json
+import sys
+
+from nptests.engine import TESTS, run_test, suggest_tests
+from nptests.ranks import RankCache
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="nptests",
+        description="Run non-parametric tests on a CSV/Excel file without the Streamlit UI.",
+    )
+    parser.add_argument("path", help="CSV or Excel file to analyse")
+    parser.add_argument("--col1", help="primary column (defaults to the first numeric column)")
+    parser.add_argument("--col2", help="secondary column for two-sample/correlation tests")
+    parser.add_argument(
+        "--test", action="append", choices=sorted(TESTS),
+        help="test to run; repeat for several (defaults to every suggested test)",
+    )
+    parser.add_argument("--columns", nargs="+", help="treatment columns for the Friedman test")
+    parser.add_argument("--block", help="block/ID column for the Friedman test")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--plots", nargs="*", default=[], help="plot types to include in --report")
+    parser.add_argument("--report", help="write a PDF report for the first test to this path")
+    parser.add_argument("--json", action="store_true", help="emit one JSON object per test")
+    parser.add_argument(
+        "--matrix", action="store_true",
+        help="run the all-pairs matrix tests over --columns (default: every numeric column)",
+    )
+    parser.add_argument(
+        "--correction", default="holm", help="multiple-comparison correction for --matrix, --posthoc and --screen",
+    )
+    parser.add_argument(
+        "--posthoc", choices=["Dunn", "Pairwise Mann-Whitney"],
+        help="grouped Kruskal-Wallis of --col1 by --col2 (any column) with this post-hoc test",
+    )
+    parser.add_argument(
+        "--min-group-size", type=int, default=5, metavar="N",
+        help="groups smaller than N are left out of the --posthoc pairs",
+    )
+    parser.add_argument(
+        "--exact", action="store_true",
+        help="exact p-values for small pairs of the pairwise Mann-Whitney post-hoc",
+    )
+    parser.add_argument(
+        "--screen", action="store_true",
+        help="Sign and Runs tests for every column in --columns (default: every numeric column)",
+    )
+    parser.add_argument("--by", help="with --screen, test each group of this column separately")
+    parser.add_argument(
+        "--resample", type=int, metavar="N",
+        help="add permutation p-values and bootstrap CIs from up to N resamples",
+    )
+    parser.add_argument(
+        "--bootstrap", type=int, default=2000, metavar="N",
+        help="bootstrap resamples for the --resample effect CI (0 skips it)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed for --resample")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for --resample")
+    parser.add_argument(
+        "--approximate", action="store_true",
+        help="stream the file in chunks and report sketch-based statistics with error bounds "
+             "(for files larger than memory; needs --col1)",
+    )
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="rows per chunk for --approximate")
+    parser.add_argument("--sketch-size", type=int, default=4096, help="quantile sketch size k for --approximate")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.approximate:
+        return _approximate(args)
+
+    from utils.load_data import load_path
+
+    data = load_path(args.path)
+    numeric_cols = data.select_dtypes(include=["number"]).columns.tolist()
+    ranks = RankCache(data)
+
+    if args.matrix:
+        from nptests.matrix import pairwise_matrix
+
+        try:
+            matrix = pairwise_matrix(data, args.columns, args.test, args.correction, ranks=ranks)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        table = matrix.long_table()
+        if args.json:
+            for record in table.to_dict(orient="records"):
+                print(json.dumps(record))
+        else:
+            print(table.to_string(index=False))
+        return 0
+
+    if args.screen:
+        from nptests.screening import screen_one_sample
+
+        screening = screen_one_sample(
+            data, args.columns, by=args.by, tests=args.test, correction=args.correction, alpha=args.alpha,
+        )
+        significant = screening.significant()
+        print(f"{len(significant)} of {len(screening.table)} tests significant ({screening.correction})")
+        if args.json:
+            for record in significant.to_dict(orient="records"):
+                print(json.dumps(record, default=str))
+        else:
+            print(significant.to_string(index=False))
+        return 0
+
+    if args.posthoc:
+        from nptests.grouped import kruskal_dunn
+
+        try:
+            grouped = kruskal_dunn(
+                data, args.col1, args.col2, posthoc=args.posthoc, correction=args.correction,
+                alpha=args.alpha, min_group_size=args.min_group_size, ranks=ranks, exact=args.exact,
+            )
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        print(f"Kruskal-Wallis: statistic={grouped.statistic:.6g} p-value={grouped.p_value:.6g} -> {grouped.conclusion}")
+        print(f"{len(grouped.posthoc)} of {grouped.n_pairs} pairs significant ({grouped.posthoc_method}, {grouped.correction})")
+        if args.json:
+            for record in grouped.posthoc.to_dict(orient="records"):
+                print(json.dumps(record, default=str))
+        else:
+            print(grouped.posthoc.to_string(index=False))
+        return 0
+
+    col1 = args.col1 or (numeric_cols[0] if numeric_cols else None)
+    if col1 is None:
+        print("error: no numeric column to analyse", file=sys.stderr)
+        return 2
+
+    tests = args.test or suggest_tests(data, col1, args.col2)
+    results = []
+    status = 0
+    for test in tests:
+        try:
+            result = run_test(
+                data, test, col1, args.col2, alpha=args.alpha, ranks=ranks,
+                columns=args.columns, block=args.block,
+            )
+        except Exception as e:
+            print(f"error: {test}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        if args.resample:
+            from dataclasses import asdict
+            from nptests.resample import resample_test
+
+            resampled = resample_test(
+                data, test, col1, args.col2, columns=args.columns, block=args.block, n_resamples=args.resample,
+                n_bootstrap=args.bootstrap, alpha=args.alpha, seed=args.seed, workers=args.workers, ranks=ranks,
+            )
+            result.details["resampling"] = asdict(resampled)
+        results.append(result)
+        if args.json:
+            print(json.dumps(result.to_dict(), default=float))
+        else:
+            print(f"{result.test}: statistic={result.statistic:.6g} p-value={result.p_value:.6g} -> {result.conclusion}")
+            if result.details.get("ci") is not None:
+                low, high = result.details["ci"]
+                print(f"  tau-b {result.details['confidence']:.0%} jackknife CI={low:.6g}..{high:.6g}")
+            if args.resample:
+                print(f"  permutation p-value={resampled.p_value:.6g} ({resampled.resamples} resamples)")
+
+    if args.report and results:
+        import matplotlib
+        matplotlib.use("Agg")
+        from nptests.plots import generate_visualizations
+        from nptests.report import create_pdf_report, render_figures, report_sections
+
+        figs = generate_visualizations(data, col1, args.col2, args.plots)
+        sections = report_sections(
+            results[0], "No significant difference exists", "A significant difference exists"
+        )
+        pdf_bytes = create_pdf_report(sections, render_figures(figs, workers=args.workers))
+        with open(args.report, "wb") as handle:
+            handle.write(pdf_bytes)
+
+    return status
+
+
+def _approximate(args):
+    from dataclasses import asdict
+    from nptests.streaming import APPROXIMATE_TESTS, approximate_test
+
+    if not args.col1:
+        print("error: --approximate needs --col1", file=sys.stderr)
+        return 2
+    tests = args.test or [
+        test for test in APPROXIMATE_TESTS if args.col2 or test in ("Sign Test", "Runs Test (Wald-Wolfowitz)")
+    ]
+    status = 0
+    for test in tests:
+        try:
+            result = approximate_test(
+                args.path, test, args.col1, args.col2, alpha=args.alpha,
+                chunksize=args.chunksize, k=args.sketch_size,
+            )
+        except Exception as e:
+            print(f"error: {test}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        if args.json:
+            print(json.dumps(dict(asdict(result), conclusion=result.conclusion), default=float))
+        else:
+            low, high = result.statistic_bounds
+            p_low, p_high = result.p_bounds
+            print(
+                f"{test}: statistic={result.statistic:.6g} [{low:.6g}, {high:.6g}] "
+                f"p-value={result.p_value:.6g} [{p_low:.6g}, {p_high:.6g}] n={result.n} -> {result.conclusion}"
+            )
+    return status
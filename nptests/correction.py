@@ -0,0 +1,38 @@
+import numpy as np
+
+CORRECTIONS = ["holm", "fdr_bh", "bonferroni", "none"]
+
+
+def adjust_pvalues(p_values, method="holm"):
+    """Multiple-comparison adjusted p-values, vectorized over a flat array.
+
+    ``method`` is one of ``CORRECTIONS``; the names follow
+    ``statsmodels.stats.multitest.multipletests``. NaNs are passed through
+    and do not count towards the number of comparisons.
+    """
+    p = np.asarray(p_values, dtype=float)
+    adjusted = np.full(p.shape, np.nan)
+    valid = ~np.isnan(p)
+    pv = p[valid]
+    m = pv.size
+    if m == 0 or method == "none":
+        adjusted[valid] = pv
+        return adjusted
+
+    if method == "bonferroni":
+        adjusted[valid] = np.minimum(pv * m, 1.0)
+        return adjusted
+
+    order = np.argsort(pv, kind="mergesort")
+    ranked = pv[order]
+    if method == "holm":
+        stepped = np.maximum.accumulate((m - np.arange(m)) * ranked)
+    elif method == "fdr_bh":
+        stepped = np.minimum.accumulate((m / np.arange(m, 0, -1) * ranked[::-1]))[::-1]
+    else:
+        raise ValueError(f"Unknown correction method: {method}")
+
+    out = np.empty(m)
+    out[order] = np.minimum(stepped, 1.0)
+    adjusted[valid] = out
+    return adjusted
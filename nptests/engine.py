@@ -0,0 +1,215 @@
+from dataclasses import dataclass, field, asdict
+
+from nptests.exact import BINOMIAL_MAX_N, sign_exact
+from nptests.friedman import block_matrix, friedman_statistic, friedman_sums
+from nptests.ranks import (
+    RankCache, kendall, kruskal_wallis, ks_2sample, mann_whitney_u, sign_counts,
+    spearman, wilcoxon_signed_rank,
+)
+from nptests.store import default_store, result_key
+from utils.column_profile import profile_columns
+
+# scipy.stats and statsmodels are imported inside the test functions so that
+# importing the engine (or running a single test) only pays for what it uses.
+
+
+@dataclass
+class TestResult:
+    test: str
+    statistic: float
+    p_value: float
+    columns: tuple
+    alpha: float = 0.05
+    details: dict = field(default_factory=dict)
+
+    @property
+    def reject_null(self) -> bool:
+        return bool(self.p_value < self.alpha)
+
+    @property
+    def conclusion(self) -> str:
+        return "Reject H0" if self.reject_null else "Fail to reject H0"
+
+    def to_dict(self) -> dict:
+        result = asdict(self)
+        result["columns"] = list(self.columns)
+        result["conclusion"] = self.conclusion
+        return result
+
+
+# Enhanced test suggestion function
+def suggest_tests(data, col1, col2=None, profile=None):
+    """Suggest tests for the selected columns from their column profile.
+
+    ``profile`` is the dataset's ``utils.column_profile`` table (cached per
+    upload by the apps); without it the two columns are profiled on the fly.
+    """
+    if profile is None:
+        profile = profile_columns(data[[col for col in (col1, col2) if col]])
+    suggestions = []
+
+    if col2:
+        # Check if paired data (same number of observations)
+        is_paired = profile.at[col1, "rows"] == profile.at[col2, "rows"]
+
+        # Two-sample tests
+        suggestions.extend(["Mann-Whitney U Test", "Kolmogorov-Smirnov Test"])
+
+        if is_paired:
+            suggestions.append("Wilcoxon Signed-Rank Test")
+
+        # Correlation tests
+        if profile.at[col2, "numeric"]:
+            suggestions.extend(["Spearman's Rank Correlation", "Kendall's Tau"])
+
+        # Multiple groups detection
+        if profile.at[col2, "cardinality"] > 2:
+            if profile.at[col2, "numeric"]:
+                suggestions.append("Kruskal-Wallis Test")
+            else:
+                suggestions.append("Friedman Test")
+    else:
+        # One-sample tests
+        suggestions.extend(["Sign Test", "Runs Test (Wald-Wolfowitz)"])
+
+    return suggestions
+
+
+def _mann_whitney(ranks, col1, col2, options):
+    return mann_whitney_u(ranks, col1, col2)
+
+
+def _wilcoxon(ranks, col1, col2, options):
+    return wilcoxon_signed_rank(ranks, col1, col2)
+
+
+def _kruskal(ranks, col1, col2, options):
+    return kruskal_wallis(ranks, col1, col2)
+
+
+def _sign(ranks, col1, col2, options):
+    positive_count, negative_count = sign_counts(ranks, col1, options.get("mu0"))
+    total_count = positive_count + negative_count
+    if 0 < total_count <= BINOMIAL_MAX_N:
+        return positive_count, sign_exact(positive_count, total_count)
+    from statsmodels.stats.proportion import binom_test
+    p_value = binom_test(positive_count, total_count, prop=0.5, alternative="two-sided")
+    return positive_count, p_value
+
+
+def _runs(ranks, col1, col2, options):
+    from statsmodels.sandbox.stats.runs import runstest_1samp
+    return runstest_1samp(ranks.data[col1], correction=True)
+
+
+def _kolmogorov_smirnov(ranks, col1, col2, options):
+    return ks_2sample(ranks, col1, col2)
+
+
+def _spearman(ranks, col1, col2, options):
+    return spearman(ranks, col1, col2)
+
+
+def _kendall(ranks, col1, col2, options):
+    return kendall(ranks, col1, col2, details=True)
+
+
+def _friedman(ranks, col1, col2, options):
+    data = ranks.data
+    columns = options.get("columns")
+    if columns is None:
+        columns = data.select_dtypes(include=["number"]).columns.tolist()[:3]
+        options["columns"] = columns
+    matrix = block_matrix(data, columns, options.get("block"))
+    rank_sums, _, ties = friedman_sums(matrix)
+    return friedman_statistic(len(matrix), len(columns), rank_sums, ties)
+
+
+# How many of (col1, col2) each test ranks through the RankCache; run_test
+# ranks them up front when asked for progress, so a job can stop in between
+RANKED_COLUMNS = {
+    "Mann-Whitney U Test": 2,
+    "Kolmogorov-Smirnov Test": 2,
+    "Spearman's Rank Correlation": 2,
+    "Kendall's Tau": 2,
+    "Kruskal-Wallis Test": 1,
+    "Sign Test": 1,
+}
+
+TESTS = {
+    "Mann-Whitney U Test": _mann_whitney,
+    "Wilcoxon Signed-Rank Test": _wilcoxon,
+    "Kruskal-Wallis Test": _kruskal,
+    "Sign Test": _sign,
+    "Runs Test (Wald-Wolfowitz)": _runs,
+    "Kolmogorov-Smirnov Test": _kolmogorov_smirnov,
+    "Spearman's Rank Correlation": _spearman,
+    "Kendall's Tau": _kendall,
+    "Friedman Test": _friedman,
+}
+
+
+def run_test(
+    data, test, col1, col2=None, alpha=0.05, ranks=None, digest=None, store=None, progress=None, **options,
+) -> TestResult:
+    """Run one of the tests in ``TESTS`` on ``data`` and wrap the outcome.
+
+    ``ranks`` is a ``RankCache`` for ``data``; pass the same one across calls
+    so columns are sorted and ranked once. With ``digest`` (the dataset's
+    content hash) the outcome is looked up in, and saved to, ``store``
+    (default: the shared ``nptests.store`` result store) before anything is
+    computed. Extra keyword options are passed to the test (``columns`` for
+    the Friedman test, ``mu0`` for the Sign test). ``progress`` is called as
+    ``progress(fraction, message)`` before each column is ranked and before
+    the statistic is computed. Raises ``ValueError`` for an unknown test name.
+    """
+    try:
+        func = TESTS[test]
+    except KeyError:
+        raise ValueError(f"Selected test not implemented yet: {test}") from None
+
+    key = None
+    if digest is not None:
+        if store is None:
+            store = default_store()
+        key = result_key(digest, test, (col1, col2), options)
+        cached = store.get(key)
+        if cached is not None:
+            return TestResult(
+                test=test,
+                statistic=cached["statistic"],
+                p_value=cached["p_value"],
+                columns=tuple(cached["columns"]),
+                alpha=alpha,
+                details=cached.get("details", {}),
+            )
+
+    if ranks is None:
+        ranks = RankCache(data)
+    if progress is not None:
+        for col in (col1, col2)[:RANKED_COLUMNS.get(test, 0)]:
+            if col is not None:
+                progress(0.0, f"Ranking {col}")
+                ranks.column(col)
+        progress(0.5, f"Computing the {test}")
+    outcome = func(ranks, col1, col2, options)
+    stat, p_value = outcome[:2]
+    # Tests may add a dict of further results (e.g. Kendall's tau variants)
+    details = outcome[2] if len(outcome) > 2 and isinstance(outcome[2], dict) else {}
+    columns = tuple(options["columns"]) if options.get("columns") is not None else tuple(
+        col for col in (col1, col2) if col is not None
+    )
+    result = TestResult(
+        test=test,
+        statistic=float(stat),
+        p_value=float(p_value),
+        columns=columns,
+        alpha=alpha,
+        details=dict(details),
+    )
+    if key is not None:
+        entry = {"statistic": result.statistic, "p_value": result.p_value, "columns": list(columns)}
+        if details:
+            entry["details"] = details
+        store.put(key, entry)
+    return result
@@ -0,0 +1,229 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from math import comb
+
+import numpy as np
+
+# Largest samples given exact null distributions: pooled n1 + n2 for Mann-Whitney,
+# non-zero differences for Wilcoxon, untied pairs for Kendall's tau, trials for
+# the binomial (Sign test)
+EXACT_MAX_N = int(os.environ.get("NPT_EXACT_MAX_N", 100))
+BINOMIAL_MAX_N = int(os.environ.get("NPT_BINOMIAL_MAX_N", 100_000))
+# Memory budget (bytes) for cached distributions. Set NPT_EXACT_DIR to also keep them
+# on disk for other processes and restarts; that directory is never pruned
+EXACT_CACHE_BYTES = int(os.environ.get("NPT_EXACT_CACHE_BYTES", 64 * 1024 ** 2))
+EXACT_DIR = os.environ.get("NPT_EXACT_DIR")
+
+
+class NullDistribution:
+    """Exact null distribution of an integer-valued statistic on 0..len(pmf)-1.
+
+    Both tails are accumulated from their own end, so small p-values keep
+    their precision.
+    """
+
+    def __init__(self, pmf):
+        self.pmf = pmf
+        self.cdf = np.cumsum(pmf)
+        self.sf = np.cumsum(pmf[::-1])[::-1]
+
+    @property
+    def nbytes(self):
+        return self.pmf.nbytes * 3
+
+    def p_value(self, x):
+        """Two-sided p-value: twice the smaller tail at ``x``, capped at 1."""
+        x = int(round(x))
+        lower = self.cdf[min(max(x, 0), len(self.cdf) - 1)] if x >= 0 else 0.0
+        upper = self.sf[max(x, 0)] if x < len(self.sf) else 0.0
+        return float(min(1.0, 2 * min(lower, upper)))
+
+
+def _doubled_midranks(counts):
+    # Twice the average rank of each tie group: an integer, so sums index arrays
+    counts = np.asarray(counts, dtype=np.int64)
+    starts = np.cumsum(counts) - counts
+    return 2 * starts + counts + 1
+
+
+def _rank_sum_pmf(n1, counts):
+    """Distribution of twice the rank sum of ``n1`` of the pooled observations.
+
+    ``counts`` are the tie-group sizes in ascending order of value (all ones
+    without ties). Dynamic programming over the tie groups: ``f[j, s]`` is
+    the number of ways to pick ``j`` observations from the groups so far
+    with doubled rank sum ``s``; taking ``k`` of a group of ``c`` adds
+    ``C(c, k)`` ways shifted by ``k`` times its doubled midrank.
+    """
+    doubled = _doubled_midranks(counts)
+    top = int(np.sort(np.repeat(doubled, counts))[::-1][:n1].sum())
+    f = np.zeros((n1 + 1, top + 1))
+    new = np.zeros_like(f)
+    f[0, 0] = 1.0
+    # Only sums up to ``reach`` are possible after the groups seen so far
+    reach = 0
+    for c, r in zip(counts, doubled):
+        c, r = int(c), int(r)
+        reach = min(top, reach + min(c, n1) * r)
+        new[:, :reach + 1] = f[:, :reach + 1]
+        for k in range(1, min(c, n1) + 1):
+            shift = k * r
+            if shift > reach:
+                break
+            new[k:, shift:reach + 1] += comb(c, k) * f[:n1 + 1 - k, :reach + 1 - shift]
+        f, new = new, f
+    return f[n1] / comb(int(np.sum(counts)), n1)
+
+
+def _signed_rank_pmf(counts):
+    """Distribution of twice the positive rank sum over the tie groups of |d|."""
+    doubled = _doubled_midranks(counts)
+    top = int(np.sum(doubled * np.asarray(counts)))
+    f = np.zeros(top + 1)
+    f[0] = 1.0
+    for c, r in zip(counts, doubled):
+        new = f.copy()
+        for k in range(1, c + 1):
+            shift = k * int(r)
+            new[shift:] += comb(c, k) * f[:top + 1 - shift]
+        f = new
+    return f / 2.0 ** int(np.sum(counts))
+
+
+def _inversions_pmf(n):
+    """Distribution of the number of inversions (discordant pairs) of a random permutation of ``n``.
+
+    The generating function is the product of ``1 + q + ... + q^(j-1)`` for
+    j = 1..n; each factor is a running sum minus its shifted copy, divided
+    by ``j`` to stay a probability.
+    """
+    f = np.ones(1)
+    for j in range(2, n + 1):
+        cumulative = np.cumsum(np.r_[f, np.zeros(j - 1)])
+        cumulative[j:] -= cumulative[:-j].copy()
+        f = cumulative / j
+    return f
+
+
+def _binomial_pmf(n):
+    from scipy.stats import binom
+
+    return binom.pmf(np.arange(n + 1), n, 0.5)
+
+
+class _DistributionCache:
+    """Process-wide LRU of null distributions, bounded by bytes, optionally backed by a directory.
+
+    Disk entries are ``.npy`` files of the probability masses named by a hash
+    of the key, written atomically, so server processes on one host share them.
+    """
+
+    def __init__(self, max_bytes=EXACT_CACHE_BYTES, directory=EXACT_DIR):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        pmf = None
+        if self.directory:
+            try:
+                pmf = np.load(self._path(key))
+            except (OSError, ValueError):
+                pmf = None
+        if pmf is None:
+            pmf = compute()
+            if self.directory:
+                self._save(key, pmf)
+        entry = NullDistribution(pmf)
+        with self._lock:
+            if entry.nbytes <= self.max_bytes:
+                if key in self._entries:
+                    self._size -= self._entries.pop(key).nbytes
+                self._entries[key] = entry
+                self._size += entry.nbytes
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= evicted.nbytes
+        return entry
+
+    def _save(self, key, pmf):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.save(handle, pmf)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_cache = _DistributionCache()
+
+
+def _tie_key(counts):
+    counts = tuple(int(c) for c in counts)
+    # Untied samples share one distribution per size
+    return len(counts) if all(c == 1 for c in counts) else counts
+
+
+def mann_whitney_exact(u1, n1, n2, counts):
+    """Exact two-sided p-value of the Mann-Whitney ``u1`` (U of the first sample).
+
+    ``counts`` are the pooled tie-group sizes in ascending order of value;
+    the null distribution is that of the rank sum over all ways to split
+    the pooled sample, so ties are handled exactly rather than by a
+    variance correction. Distributions are cached per (smaller size, ties).
+    """
+    if n1 > n2:
+        u1, n1, n2 = n1 * n2 - u1, n2, n1
+    dist = _cache.get_or_compute(("mwu", n1, _tie_key(counts)), lambda: _rank_sum_pmf(n1, counts))
+    return dist.p_value(2 * u1 + n1 * (n1 + 1))
+
+
+def signed_rank_exact(r_plus, counts):
+    """Exact two-sided p-value of the Wilcoxon positive rank sum ``r_plus``.
+
+    ``counts`` are the tie-group sizes of the non-zero absolute differences.
+    """
+    dist = _cache.get_or_compute(("wilcoxon", _tie_key(counts)), lambda: _signed_rank_pmf(counts))
+    return dist.p_value(2 * r_plus)
+
+
+def kendall_exact(discordant, n):
+    """Exact two-sided p-value of ``discordant`` pairs among ``n`` untied pairs (Kendall's tau)."""
+    dist = _cache.get_or_compute(("kendall", int(n)), lambda: _inversions_pmf(int(n)))
+    return dist.p_value(discordant)
+
+
+def sign_exact(positive, n):
+    """Exact two-sided binomial p-value of ``positive`` successes in ``n`` trials at p = 0.5."""
+    dist = _cache.get_or_compute(("binomial", int(n)), lambda: _binomial_pmf(int(n)))
+    return dist.p_value(positive)
+
+
+def cache_info():
+    return {"hits": _cache.hits, "misses": _cache.misses, "entries": len(_cache._entries), "bytes": _cache._size}
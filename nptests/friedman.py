@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from nptests.correction import adjust_pvalues
+
+FRIEDMAN_POSTHOC = ["Nemenyi", "Conover"]
+# Rows ranked per chunk; bounds the temporary (rows x k) index arrays
+CHUNK_ROWS = 200_000
+
+
+@dataclass
+class FriedmanResult:
+    columns: list
+    n_blocks: int
+    statistic: float
+    p_value: float
+    mean_ranks: pd.Series
+    posthoc: pd.DataFrame  # one row per treatment pair
+    posthoc_method: str
+    correction: str
+    alpha: float = 0.05
+
+    @property
+    def conclusion(self):
+        return "Reject H0" if self.p_value < self.alpha else "Fail to reject H0"
+
+    @property
+    def significant_pairs(self):
+        return self.posthoc[self.posthoc["Adjusted p-value"] < self.alpha]
+
+
+def row_ranks(matrix):
+    """Average ranks within each row of a 2-D array, plus each row's tie term sum(t^3 - t)."""
+    matrix = np.asarray(matrix, dtype=float)
+    n, k = matrix.shape
+    order = np.argsort(matrix, axis=1, kind="stable")
+    ordered = np.take_along_axis(matrix, order, axis=1)
+
+    # For each sorted position, the first and last position of its tie group
+    new_group = np.ones((n, k), dtype=bool)
+    new_group[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    positions = np.broadcast_to(np.arange(k), (n, k))
+    first = np.maximum.accumulate(np.where(new_group, positions, 0), axis=1)
+    group_end = np.ones((n, k), dtype=bool)
+    group_end[:, :-1] = new_group[:, 1:]
+    last = np.minimum.accumulate(np.where(group_end, positions, k - 1)[:, ::-1], axis=1)[:, ::-1]
+
+    ranks = np.empty((n, k))
+    np.put_along_axis(ranks, order, (first + last) / 2.0 + 1.0, axis=1)
+    # Every member of a tie group of size t adds t^2 - 1, so a group adds t^3 - t
+    sizes = (last - first + 1).astype(float)
+    ties = np.sum(sizes ** 2 - 1, axis=1)
+    return ranks, ties
+
+
+def block_matrix(data, columns, block=None):
+    """Complete rows of ``columns`` as a (blocks x treatments) float array."""
+    if block and block in columns:
+        raise ValueError(f"The block column '{block}' cannot also be a treatment column")
+    frame = data[list(columns) + ([block] if block else [])].dropna()
+    if block:
+        # Repeated rows for the same block are collapsed to their median
+        frame = frame.groupby(block, sort=False)[list(columns)].median()
+    return frame[list(columns)].to_numpy(dtype=float)
+
+
+def friedman_sums(matrix, chunk_rows=CHUNK_ROWS):
+    """Column rank sums, total squared rank and tie term, ranking rows chunk by chunk."""
+    k = matrix.shape[1]
+    rank_sums = np.zeros(k)
+    squared = 0.0
+    ties = 0.0
+    for start in range(0, len(matrix), chunk_rows):
+        ranks, chunk_ties = row_ranks(matrix[start:start + chunk_rows])
+        rank_sums += ranks.sum(axis=0)
+        squared += float(np.sum(ranks ** 2))
+        ties += float(chunk_ties.sum())
+    return rank_sums, squared, ties
+
+
+def friedman_statistic(n, k, rank_sums, ties):
+    from scipy.stats import chi2
+
+    stat = 12.0 / (n * k * (k + 1)) * np.sum(rank_sums ** 2) - 3.0 * n * (k + 1)
+    stat /= 1.0 - ties / (n * k * (k * k - 1))
+    return float(stat), float(chi2.sf(stat, k - 1))
+
+
+def _nemenyi(n, k, rank_sums, iu):
+    from scipy.stats import studentized_range
+
+    mean_ranks = rank_sums / n
+    i, j = iu
+    diff = mean_ranks[i] - mean_ranks[j]
+    q = np.abs(diff) / np.sqrt(k * (k + 1) / (6.0 * n)) * np.sqrt(2.0)
+    return diff, q, np.clip(studentized_range.sf(q, k, np.inf), 0.0, 1.0)
+
+
+def _conover(n, k, rank_sums, squared, iu):
+    from scipy.stats import t as t_dist
+
+    i, j = iu
+    diff = rank_sums[i] - rank_sums[j]
+    df = (n - 1) * (k - 1)
+    se = np.sqrt(2.0 * (n * squared - np.sum(rank_sums ** 2)) / df)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_stat = diff / se
+    return diff / n, t_stat, 2 * t_dist.sf(np.abs(t_stat), df)
+
+
+def friedman_test(data, columns, block=None, posthoc="Nemenyi", correction="holm", alpha=0.05):
+    """Friedman test over any number of treatment ``columns``, rows as blocks.
+
+    With ``block`` set, rows sharing a block ID are first collapsed to their
+    per-treatment median. Ranking happens row-wise over the whole block
+    matrix in chunks, so only column rank sums are kept in memory. Nemenyi
+    p-values come from the studentized range distribution and already
+    control the family-wise error, so ``correction`` applies to Conover only.
+    """
+    columns = list(columns)
+    if len(columns) < 3:
+        raise ValueError("The Friedman test needs at least three treatment columns")
+    if posthoc not in FRIEDMAN_POSTHOC:
+        raise ValueError(f"Unknown post-hoc method: {posthoc}")
+
+    matrix = block_matrix(data, columns, block)
+    n, k = matrix.shape
+    if n < 2:
+        raise ValueError("The Friedman test needs at least two complete blocks")
+    rank_sums, squared, ties = friedman_sums(matrix)
+    stat, p_value = friedman_statistic(n, k, rank_sums, ties)
+
+    iu = np.triu_indices(k, 1)
+    if posthoc == "Nemenyi":
+        diff, score, p = _nemenyi(n, k, rank_sums, iu)
+        adjusted = p
+        applied = "none"
+    else:
+        diff, score, p = _conover(n, k, rank_sums, squared, iu)
+        adjusted = adjust_pvalues(p, correction)
+        applied = correction
+
+    names = np.array(columns, dtype=object)
+    table = pd.DataFrame({
+        "Column 1": names[iu[0]],
+        "Column 2": names[iu[1]],
+        "Mean Rank Difference": diff,
+        "q" if posthoc == "Nemenyi" else "t": score,
+        "p-value": p,
+        "Adjusted p-value": adjusted,
+    }).sort_values("Adjusted p-value", kind="stable", ignore_index=True)
+
+    return FriedmanResult(
+        columns=columns,
+        n_blocks=n,
+        statistic=stat,
+        p_value=p_value,
+        mean_ranks=pd.Series(rank_sums / n, index=columns, name="Mean Rank"),
+        posthoc=table,
+        posthoc_method=posthoc,
+        correction=applied,
+        alpha=alpha,
+    )
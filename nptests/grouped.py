@@ -0,0 +1,220 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from nptests.correction import adjust_pvalues
+from nptests.exact import EXACT_MAX_N, mann_whitney_exact
+from nptests.ranks import RankCache, rank_column
+
+POSTHOC_METHODS = ["Dunn", "Pairwise Mann-Whitney"]
+# The pairwise Mann-Whitney post-hoc builds k x k matrices; beyond this many
+# groups only Dunn's test is offered
+MAX_MWU_GROUPS = 2000
+# Dunn's test holds every pair of eligible groups at once (z, p and the
+# correction, which needs all of them); beyond this many groups of at least
+# ``min_group_size`` it is refused rather than exhausting memory
+MAX_DUNN_GROUPS = 2000
+# ... and walks the tie groups in blocks of at most this many group x tie-group cells
+MWU_BLOCK_CELLS = 4_000_000
+
+
+@dataclass
+class GroupedResult:
+    value_column: str
+    group_column: str
+    statistic: float
+    p_value: float
+    groups: pd.DataFrame  # one row per group: size, rank sum, mean rank, median
+    posthoc: pd.DataFrame  # significant pairs only
+    posthoc_method: str
+    correction: str
+    n_pairs: int
+    alpha: float = 0.05
+
+    @property
+    def conclusion(self):
+        return "Reject H0" if self.p_value < self.alpha else "Fail to reject H0"
+
+
+def _group_ranks(data, col, by, ranks):
+    """Global ranking of ``col`` plus group codes, restricted to labelled, non-null rows."""
+    codes, labels = ranks.groups(by)
+    ranked = ranks.column(col)
+    keep = (codes >= 0) & ranked.valid
+    if keep.all():
+        return ranked, codes, labels
+    ranked = rank_column(data[col].to_numpy(dtype=float, na_value=np.nan)[keep])
+    return ranked, codes[keep], labels
+
+
+def _kruskal_h(n_g, rank_sums, n, tie_term):
+    from scipy.stats import chi2
+
+    present = n_g > 0
+    if present.sum() < 2:
+        raise ValueError("Need at least two groups in Kruskal-Wallis test.")
+    h = 12.0 / (n * (n + 1)) * np.sum(rank_sums[present] ** 2 / n_g[present]) - 3 * (n + 1)
+    ties = 1 - tie_term / (n ** 3 - n)
+    if ties == 0:
+        return np.nan, np.nan
+    h /= ties
+    return float(h), float(chi2.sf(h, int(present.sum()) - 1))
+
+
+def _dunn(n_g, mean_rank, n, tie_term, iu):
+    from scipy.stats import norm
+
+    variance = n * (n + 1) / 12.0 - tie_term / (12.0 * (n - 1))
+    i, j = iu
+    se = np.sqrt(variance * (1.0 / n_g[i] + 1.0 / n_g[j]))
+    z = (mean_rank[i] - mean_rank[j]) / se
+    return z, 2 * norm.sf(np.abs(z))
+
+
+def _pairwise_mann_whitney(ranked, codes, k, iu, exact=False):
+    from scipy.sparse import csr_matrix
+    from scipy.stats import norm
+
+    # counts[g, v]: members of group g in tie group v of the global ordering,
+    # kept sparse (one entry per occupied cell). The tie groups are taken in
+    # blocks of columns; within a block, U for every pair is the product of
+    # the counts with the dense cumulative counts below, and the pooled tie
+    # term expands into products of the same counts, so memory is bounded by
+    # MWU_BLOCK_CELLS whatever the number of distinct values.
+    u = len(ranked.counts)
+    tie_codes = np.empty(len(codes), dtype=np.intp)
+    tie_codes[ranked.valid] = ranked.codes
+    cells, occupied = np.unique(tie_codes.astype(np.int64) * k + codes, return_counts=True)
+    tie, group, occupied = cells // k, cells % k, occupied.astype(float)
+
+    width = max(1, MWU_BLOCK_CELLS // k)
+    U = np.zeros((k, k))
+    cross = np.zeros((k, k))
+    running = np.zeros(k)
+    bounds = np.searchsorted(tie, np.arange(0, u + width, width))
+    for block, start in enumerate(range(0, u, width)):
+        cols = min(width, u - start)
+        cell = slice(bounds[block], bounds[block + 1])
+        where = (group[cell], tie[cell] - start)
+        counts = csr_matrix((occupied[cell], where), shape=(k, cols))
+        dense = counts.toarray()
+        below = running[:, None] + np.cumsum(dense, axis=1) - dense
+        U += counts @ (below + 0.5 * dense).T
+        cross += csr_matrix((occupied[cell] ** 2, where), shape=(k, cols)) @ dense.T
+        running += dense.sum(axis=1)
+
+    n_g = running
+    own = np.bincount(group, weights=occupied ** 3, minlength=k) - n_g
+    cross = 3 * (cross + cross.T)
+
+    i, j = iu
+    n1, n2 = n_g[i], n_g[j]
+    n = n1 + n2
+    tie_term = own[i] + own[j] + cross[i, j]
+    sigma = np.sqrt(n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1))))
+    u_ij = U[i, j]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (u_ij - n1 * n2 / 2.0) / sigma
+        p = np.minimum(2 * norm.sf((np.abs(u_ij - n1 * n2 / 2.0) - 0.5) / sigma), 1.0)
+    if not exact:
+        return z, p
+    # Small pairs get exact p-values. Null distributions are cached per size
+    # and tie pattern: untied groups of repeated sizes cost a lookup, but
+    # every new tie pattern is a fresh computation
+    by_group = np.argsort(group, kind="stable")
+    starts = np.searchsorted(group[by_group], np.arange(k + 1))
+    for index in np.flatnonzero((n <= EXACT_MAX_N) & (n1 > 0) & (n2 > 0)):
+        members = np.r_[
+            by_group[starts[i[index]]:starts[i[index] + 1]], by_group[starts[j[index]]:starts[j[index] + 1]]
+        ]
+        _, pooled_codes = np.unique(tie[members], return_inverse=True)
+        pooled = np.bincount(pooled_codes, weights=occupied[members]).astype(np.int64)
+        p[index] = mann_whitney_exact(u_ij[index], int(n1[index]), int(n2[index]), pooled)
+    return z, p
+
+
+def kruskal_dunn(
+    data, col, by, posthoc="Dunn", correction="holm", alpha=0.05, min_group_size=1, ranks=None,
+    exact=False,
+):
+    """Kruskal-Wallis across the groups of ``by`` followed by an all-pairs post-hoc.
+
+    ``by`` may be any column (text labels included). The groups come from a
+    single factorization and ``col`` is ranked once; the post-hoc statistics
+    for all k(k-1)/2 pairs are computed as array operations and corrected
+    together. Only pairs significant after correction are returned. With
+    ``exact`` the pairwise Mann-Whitney p-values of small pairs come from
+    exact null distributions (``nptests.exact``) instead of the normal
+    approximation.
+    """
+    if ranks is None:
+        ranks = RankCache(data)
+    if posthoc not in POSTHOC_METHODS:
+        raise ValueError(f"Unknown post-hoc method: {posthoc}")
+
+    ranked, codes, labels = _group_ranks(data, col, by, ranks)
+
+    k = len(labels)
+    n_g = np.bincount(codes, minlength=k).astype(float)
+    rank_sums = np.bincount(codes, weights=ranked.ranks[ranked.valid], minlength=k)
+    # The omnibus test uses the same labelled, non-null rows as the post-hoc
+    stat, p_value = _kruskal_h(n_g, rank_sums, float(ranked.n), ranked.tie_term)
+    values = data[col].to_numpy(dtype=float, na_value=np.nan)
+    keep = (ranks.groups(by)[0] >= 0) & ~np.isnan(values)
+    medians = pd.Series(values[keep]).groupby(codes).median().reindex(range(k))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_rank = rank_sums / n_g
+    groups = pd.DataFrame({
+        "Group": labels,
+        "n": n_g.astype(int),
+        "Rank Sum": rank_sums,
+        "Mean Rank": mean_rank,
+        "Median": medians.to_numpy(),
+    })
+
+    eligible = np.flatnonzero(n_g >= max(min_group_size, 1))
+    if posthoc == "Dunn" and len(eligible) > MAX_DUNN_GROUPS:
+        raise ValueError(
+            f"Dunn's test supports at most {MAX_DUNN_GROUPS} groups of the minimum size; "
+            f"{len(eligible)} groups have at least {max(min_group_size, 1)} members. "
+            "Raise the minimum group size"
+        )
+    if posthoc != "Dunn" and k > MAX_MWU_GROUPS:
+        raise ValueError(
+            f"Pairwise Mann-Whitney supports at most {MAX_MWU_GROUPS} groups; use Dunn's test"
+        )
+    iu_local = np.triu_indices(len(eligible), 1)
+    iu = (eligible[iu_local[0]], eligible[iu_local[1]])
+
+    if posthoc == "Dunn":
+        z, p = _dunn(n_g, mean_rank, ranked.n, ranked.tie_term, iu)
+    else:
+        z, p = _pairwise_mann_whitney(ranked, codes, k, iu, exact=exact)
+
+    adjusted = adjust_pvalues(p, correction)
+    significant = np.flatnonzero(adjusted < alpha)
+    significant = significant[np.argsort(adjusted[significant], kind="stable")]
+    a, b = iu[0][significant], iu[1][significant]
+    posthoc_table = pd.DataFrame({
+        "Group 1": labels[a],
+        "Group 2": labels[b],
+        "Mean Rank 1": mean_rank[a],
+        "Mean Rank 2": mean_rank[b],
+        "z": z[significant],
+        "p-value": p[significant],
+        "Adjusted p-value": adjusted[significant],
+    })
+
+    return GroupedResult(
+        value_column=col,
+        group_column=by,
+        statistic=stat,
+        p_value=p_value,
+        groups=groups,
+        posthoc=posthoc_table,
+        posthoc_method=posthoc,
+        correction=correction,
+        n_pairs=len(p),
+        alpha=alpha,
+    )
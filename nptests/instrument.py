@@ -0,0 +1,236 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory is not reported
+    resource = None
+
+# Where finished runs go; the app server can set them through the environment.
+# METRICS_LOG receives one JSON line per run, METRICS_FILE is rewritten with
+# OpenMetrics totals after every run (e.g. for a node_exporter textfile collector)
+METRICS_LOG = os.environ.get("NPT_METRICS_LOG")
+METRICS_FILE = os.environ.get("NPT_METRICS_FILE")
+# Finished runs kept in memory for ``recent_runs``
+RECENT_RUNS = 100
+# Functions listed in a profile summary
+PROFILE_LINES = 30
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def peak_rss_mb():
+    """High-water mark of the process's resident memory, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT / 1024 ** 2
+
+
+@dataclass
+class Stage:
+    name: str
+    depth: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    peak_mb: float = None
+    grew_mb: float = None
+
+
+@dataclass
+class Trace:
+    """Wall time, CPU time and memory of each stage of one analysis run.
+
+    Stages are timed with ``perf_counter`` and ``process_time``; CPU time is
+    process-wide, so it includes figure-rendering threads and any other
+    session working at the same moment. Memory is the process's peak RSS
+    after the stage and how much the stage raised it: a stage that stays
+    under an earlier high-water mark shows no growth. All of it costs a few
+    system calls per stage, so traces are always on; a cProfile capture is
+    only taken when ``profile`` is set. Stages may nest; they are listed in
+    the order they started and only top-level ones count toward ``wall``.
+    """
+
+    kind: str
+    labels: dict = field(default_factory=dict)
+    profile: bool = False
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started: float = field(default_factory=time.time)
+    stages: list = field(default_factory=list)
+    status: str = None
+    profile_text: str = None
+    _depth: int = field(default=0, repr=False)
+
+    @contextmanager
+    def stage(self, name):
+        stage = Stage(name, self._depth)
+        self.stages.append(stage)
+        self._depth += 1
+        peak = peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stage
+        finally:
+            stage.wall, stage.cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._depth -= 1
+            stage.peak_mb = peak_rss_mb()
+            if peak is not None:
+                stage.grew_mb = stage.peak_mb - peak
+
+    def profiling(self):
+        """Context capturing a cProfile summary into ``profile_text`` when ``profile`` is set.
+
+        cProfile only sees the thread it runs in; enter this in the thread
+        doing the work (e.g. inside a job). One capture runs at a time per
+        process, others proceed unprofiled.
+        """
+        if not self.profile:
+            return nullcontext()
+        return _capture(self)
+
+    @property
+    def wall(self):
+        return sum(stage.wall for stage in self.stages if stage.depth == 0)
+
+    def record(self):
+        return {
+            "run": self.id,
+            "kind": self.kind,
+            "labels": self.labels,
+            "started": self.started,
+            "status": self.status,
+            "wall": self.wall,
+            "stages": [asdict(stage) for stage in self.stages],
+        }
+
+    def table(self):
+        import pandas as pd
+
+        table = pd.DataFrame([asdict(stage) for stage in self.stages], columns=["name", "depth", "wall", "cpu", "peak_mb", "grew_mb"])
+        # Nested stages are indented under the stage containing them
+        table["name"] = [" " * 4 * depth + name for depth, name in zip(table.pop("depth"), table["name"])]
+        return table.rename(columns={
+            "name": "Stage", "wall": "Wall (s)", "cpu": "CPU (s)", "peak_mb": "Peak RSS (MB)", "grew_mb": "Growth (MB)",
+        }).set_index("Stage")
+
+    def finish(self, status="ok"):
+        """Close the run: append its record to the log and update the totals."""
+        self.status = status
+        _collector.add(self)
+        return self
+
+
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def _capture(trace):
+    import cProfile
+    import pstats
+
+    if not _profile_lock.acquire(blocking=False):
+        trace.profile_text = "Another run was being profiled; this run was not."
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+            trace.profile_text = out.getvalue()
+    finally:
+        _profile_lock.release()
+
+
+class _Collector:
+    """Per-process totals by (kind, stage) and the latest runs, written out after each run."""
+
+    def __init__(self, log=METRICS_LOG, metrics_file=METRICS_FILE):
+        self.log = log
+        self.metrics_file = metrics_file
+        self.totals = {}
+        self.runs = {}
+        self.recent = deque(maxlen=RECENT_RUNS)
+        self._lock = threading.Lock()
+
+    def add(self, trace):
+        record = trace.record()
+        with self._lock:
+            key = (trace.kind, trace.status)
+            self.runs[key] = self.runs.get(key, 0) + 1
+            for stage in trace.stages:
+                count, wall, cpu = self.totals.get((trace.kind, stage.name), (0, 0.0, 0.0))
+                self.totals[(trace.kind, stage.name)] = (count + 1, wall + stage.wall, cpu + stage.cpu)
+            self.recent.append(record)
+            if self.log:
+                with open(self.log, "a") as handle:
+                    handle.write(json.dumps(record, default=str) + "\n")
+            if self.metrics_file:
+                _write_atomic(self.metrics_file, self.openmetrics())
+
+    def openmetrics(self):
+        lines = [
+            "# TYPE npt_runs counter",
+            "# HELP npt_runs Finished analysis runs.",
+        ]
+        for (kind, status), count in sorted(self.runs.items()):
+            lines.append(f'npt_runs_total{{kind="{_escape(kind)}",status="{_escape(status)}"}} {count}')
+        for metric, index, help_text in (
+            ("npt_stage_runs", 0, "Times each stage ran."),
+            ("npt_stage_wall_seconds", 1, "Wall time spent in each stage."),
+            ("npt_stage_cpu_seconds", 2, "Process CPU time spent in each stage."),
+        ):
+            lines += [f"# TYPE {metric} counter", f"# HELP {metric} {help_text}"]
+            for (kind, name), values in sorted(self.totals.items()):
+                lines.append(f'{metric}_total{{kind="{_escape(kind)}",stage="{_escape(name)}"}} {values[index]:.6g}')
+        peak = peak_rss_mb()
+        if peak is not None:
+            lines += [
+                "# TYPE npt_peak_rss_bytes gauge",
+                "# HELP npt_peak_rss_bytes High-water mark of the process's resident memory.",
+                f"npt_peak_rss_bytes {peak * 1024 ** 2:.0f}",
+            ]
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomic(path, text):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as handle:
+            handle.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+_collector = _Collector()
+
+
+def openmetrics():
+    """OpenMetrics exposition of this process's run and stage totals."""
+    return _collector.openmetrics()
+
+
+def recent_runs():
+    """Records of the latest finished runs, oldest first."""
+    with _collector._lock:
+        return list(_collector.recent)
@@ -0,0 +1,195 @@
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+# Pool limits; the app server can override them through the environment
+JOB_WORKERS = int(os.environ.get("NPT_JOB_WORKERS", min(4, os.cpu_count() or 1)))
+JOB_TIMEOUT = float(os.environ.get("NPT_JOB_TIMEOUT", 600))
+# Queued or running jobs one owner (session) may have at a time
+MAX_JOBS_PER_OWNER = 4
+# Finished jobs are kept this long (seconds) so a returning session can collect them
+FINISHED_TTL = 3600
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED, TIMED_OUT = (
+    "queued", "running", "done", "failed", "cancelled", "timed out",
+)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job at its next progress checkpoint after cancel or timeout."""
+
+
+@dataclass
+class Job:
+    id: str
+    owner: str
+    label: str
+    timeout: float
+    status: str = QUEUED
+    progress: float = 0.0
+    message: str = ""
+    result: object = None
+    error: str = None
+    submitted: float = field(default_factory=time.time)
+    started: float = None
+    finished: float = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def done(self):
+        return self.status not in (QUEUED, RUNNING)
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def report(self, fraction, message=""):
+        """Record progress; raises ``JobCancelled`` once the job is cancelled or out of time.
+
+        Job functions call this between units of work, which is where
+        cancellation and timeouts take effect.
+        """
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message:
+            self.message = message
+        if self._cancel.is_set():
+            raise JobCancelled("Job cancelled")
+        if self.timeout and self.elapsed > self.timeout:
+            raise JobCancelled(f"Job exceeded its {self.timeout:g}s time limit")
+
+
+class JobRunner:
+    """Bounded pool of worker threads running analysis jobs submitted by sessions.
+
+    Each owner (a Streamlit session) has its own queue and idle workers
+    take jobs from the owners in turn, so one session submitting many jobs
+    cannot starve the others. Jobs run in threads of the server process and
+    share its dataset and rank caches; NumPy and SciPy release the GIL in
+    their heavy loops. A job is a callable taking the ``Job`` as its first
+    argument and reporting progress through ``job.report``.
+
+    Threads cannot be stopped from outside, so cancellation and timeouts are
+    cooperative: a running job stops at its next ``report`` call, and the
+    work between two calls (ranking one column, one test statistic, one
+    round of resampling batches, one plot, the PDF) always completes. In
+    ``app.py`` only "Run Full Analysis" runs as a job; the matrix, grouped
+    Kruskal-Wallis, Friedman and screening modes run synchronously in the
+    script run and can be neither cancelled nor timed out.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, timeout=JOB_TIMEOUT, max_per_owner=MAX_JOBS_PER_OWNER):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_per_owner = max_per_owner
+        self._jobs = {}
+        self._queues = OrderedDict()  # owner -> deque of (job, func, args, kwargs)
+        self._ids = itertools.count(1)
+        self._threads = []
+        self._ready = threading.Condition()
+
+    def submit(self, func, *args, owner="default", label="", timeout=None, **kwargs):
+        """Queue ``func(job, *args, **kwargs)`` and return the new job's ID."""
+        with self._ready:
+            self._prune()
+            active = sum(1 for job in self._jobs.values() if job.owner == owner and not job.done)
+            if active >= self.max_per_owner:
+                raise RuntimeError(f"At most {self.max_per_owner} jobs may run at once per session")
+            job = Job(
+                id=f"job-{next(self._ids)}",
+                owner=owner,
+                label=label,
+                timeout=self.timeout if timeout is None else timeout,
+            )
+            self._jobs[job.id] = job
+            self._queues.setdefault(owner, deque()).append((job, func, args, kwargs))
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"nptests-{job.id}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._ready.notify()
+        return job.id
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self, owner=None):
+        return [job for job in self._jobs.values() if owner is None or job.owner == owner]
+
+    def cancel(self, job_id):
+        """Cancel a job; queued jobs never start, running ones stop at their next checkpoint."""
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job._cancel.set()
+        with self._ready:
+            if job.status == QUEUED:
+                job.finished = time.time()
+                job.error = "Job cancelled before it started"
+                job.status = CANCELLED
+        return True
+
+    def _next(self):
+        # Round-robin over owners: take the first owner's oldest job, then
+        # move that owner to the back of the line
+        while self._queues:
+            owner, queue = next(iter(self._queues.items()))
+            entry = queue.popleft()
+            if queue:
+                self._queues.move_to_end(owner)
+            else:
+                del self._queues[owner]
+            if entry[0].status == QUEUED:
+                return entry
+        return None
+
+    def _work(self):
+        while True:
+            with self._ready:
+                entry = self._next()
+                while entry is None:
+                    self._ready.wait()
+                    entry = self._next()
+                job, func, args, kwargs = entry
+                job.status = RUNNING
+                job.started = time.time()
+            try:
+                result = func(job, *args, **kwargs)
+            except JobCancelled as e:
+                status, job.error = CANCELLED if job._cancel.is_set() else TIMED_OUT, str(e)
+            except Exception as e:
+                status, job.error = FAILED, str(e)
+            else:
+                job.result = result
+                job.progress = 1.0
+                status = DONE
+            # ``finished`` is set before the status makes the job done, under
+            # the lock ``_prune`` runs with
+            with self._ready:
+                job.finished = time.time()
+                job.status = status
+
+    def _prune(self):
+        now = time.time()
+        for job_id in [
+            job.id for job in self._jobs.values()
+            if job.done and job.finished is not None and now - job.finished > FINISHED_TTL
+        ]:
+            del self._jobs[job_id]
+
+
+_default_runner = None
+_runner_lock = threading.Lock()
+
+
+def default_runner():
+    """The process-wide ``JobRunner`` configured from the environment."""
+    global _default_runner
+    with _runner_lock:
+        if _default_runner is None:
+            _default_runner = JobRunner()
+    return _default_runner
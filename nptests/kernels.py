@@ -0,0 +1,225 @@
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from nptests.exact import EXACT_MAX_N, kendall_exact
+
+# Largest samples given per-observation Kendall counts (jackknife CI, weighted
+# tau). Beyond it only the pair totals are counted, which is several times
+# cheaper; set NPT_KENDALL_JACKKNIFE_MAX_N to trade time for the interval
+KENDALL_JACKKNIFE_MAX_N = int(os.environ.get("NPT_KENDALL_JACKKNIFE_MAX_N", 2_000_000))
+
+
+def earlier_greater(seq):
+    """For each position of ``seq``, how many earlier elements are strictly greater.
+
+    A bottom-up merge sort in which every level merges all runs of the
+    previous level at once: runs are the rows of a 2-D view, a stable
+    argsort merges each pair of sorted halves (equal values keep the left
+    one first), and each element taken from a right half gains the number
+    of left-half elements still to come. O(n log n) in ``log2(n)`` vectorized
+    passes; the counts for the whole sequence total its inversions.
+    """
+    n = len(seq)
+    values = np.asarray(seq, dtype=np.int64)
+    ids = np.arange(n, dtype=np.int64)
+    greater = np.zeros(n, dtype=np.int64)
+    top = int(values.max()) + 1 if n else 0
+    width = 1
+    while width < len(values):
+        if len(values) % (2 * width):
+            # An odd run out: pair it with a run of values above all others,
+            # which, coming last, add to no real element's count
+            values = np.concatenate([values, np.full(width, top, dtype=np.int64)])
+            ids = np.concatenate([ids, np.arange(len(ids), len(ids) + width, dtype=np.int64)])
+            greater = np.concatenate([greater, np.zeros(width, dtype=np.int64)])
+        runs = values.reshape(-1, 2 * width)
+        order = np.argsort(runs, axis=1, kind="stable")
+        right = order >= width
+        left_taken = np.cumsum(~right, axis=1)
+        greater = np.take_along_axis(greater.reshape(-1, 2 * width), order, axis=1)
+        greater += np.where(right, width - left_taken, 0)
+        greater = greater.ravel()
+        values = np.take_along_axis(runs, order, axis=1).ravel()
+        ids = np.take_along_axis(ids.reshape(-1, 2 * width), order, axis=1).ravel()
+        width *= 2
+    counts = np.empty(n, dtype=np.int64)
+    real = ids < n
+    counts[ids[real]] = greater[real]
+    return counts
+
+
+def _below(codes):
+    # Size of each code's tie group, and how many observations have a smaller code
+    sizes = np.bincount(codes)
+    return sizes[codes], (np.cumsum(sizes) - sizes)[codes]
+
+
+def _tie_pairs(codes):
+    sizes = np.bincount(codes).astype(np.int64)
+    sizes = sizes[sizes > 1]
+    # Python ints: the pair counts overflow float precision well before int64
+    return (
+        int((sizes * (sizes - 1) // 2).sum()),
+        int((sizes * (sizes - 1) * (sizes - 2)).sum()),
+        int((sizes * (sizes - 1) * (2 * sizes + 5)).sum()),
+    )
+
+
+def _joint_order(first, second):
+    """Stable order by (first, second), with each observation's joint tie-group size and rank."""
+    keys = first * (int(second.max()) + 1) + second
+    order = np.argsort(keys, kind="stable")
+    ordered = keys[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    sizes = np.diff(np.r_[starts, len(keys)])
+    size, below = np.empty(len(keys), dtype=np.int64), np.empty(len(keys), dtype=np.int64)
+    size[order] = np.repeat(sizes, sizes)
+    below[order] = np.repeat(starts, sizes)
+    return order, size, below
+
+
+def _concordance(x, y):
+    n = len(x)
+    tx, x_below = _below(x)
+    ty, y_below = _below(y)
+    order_xy, _, joint_below = _joint_order(x, y)
+    same_x_below = joint_below - x_below
+    order_yx, joint_size, joint_below = _joint_order(y, x)
+    same_y_below = joint_below - y_below
+
+    below_above = np.empty(n, dtype=np.int64)
+    below_above[order_xy] = earlier_greater(y[order_xy])
+    below_below = x_below - below_above - same_y_below
+    above_below = y_below - below_below - same_x_below
+    above_above = (n - x_below - tx) - above_below - (ty - joint_size - same_y_below)
+    s = below_below + above_above - below_above - above_below
+    return s, tx, ty, order_xy, order_yx
+
+
+def concordance(x, y):
+    """Per-observation concordance ``s_i = sum_j sign(x_i - x_j) * sign(y_i - y_j)``.
+
+    ``x`` and ``y`` are dense integer codes (0 for the smallest value, ties
+    sharing a code), e.g. ``ColumnRanks.codes``. One ``earlier_greater``
+    pass over the observations ordered by (x, y) counts the pairs below in
+    x and above in y; every other quadrant follows from the tie-group sizes
+    and the numbers of smaller x, smaller y and of joint ties, so tied pairs
+    count as neither concordant nor discordant. Also returns the x and y
+    tie-group size of each observation.
+    """
+    x = np.asarray(x, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+    if not len(x):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    return _concordance(x, y)[:3]
+
+
+@dataclass
+class KendallTau:
+    """Kendall's tau variants, its p-value and jackknife interval from one count of the pairs."""
+
+    n: int
+    score: int  # concordant minus discordant pairs
+    tau_a: float
+    tau_b: float
+    tau_c: float
+    p_value: float
+    method: str  # "exact" or "asymptotic"
+    jackknife_se: float = None  # of tau-b
+    ci: tuple = None  # tau-b interval at ``confidence``
+    confidence: float = 0.95
+    weighted_tau: float = None  # hyperbolic weights, as scipy.stats.weightedtau
+
+
+def _hyperbolic_tau(s, tx, ty, order):
+    # Pairs weighted by the sum of 1 / (rank + 1) of their members, ranking
+    # by ``order`` reversed; weighted sums of s_i count every pair twice
+    n = len(s)
+    rank = np.empty(n, dtype=np.int64)
+    rank[order[::-1]] = np.arange(n)
+    weights = 1.0 / (rank + 1)
+    return float(np.dot(weights, s) / np.sqrt(np.dot(weights, n - tx) * np.dot(weights, n - ty)))
+
+
+def kendall_tau(x, y, confidence=0.95, jackknife=None):
+    """Kendall's tau-a, tau-b and tau-c of two dense code arrays, with the tau-b p-value.
+
+    The p-value is scipy's: exact for untied samples of up to
+    ``EXACT_MAX_N`` pairs, otherwise the normal approximation with its tie
+    corrections. With ``jackknife`` (default: up to
+    ``KENDALL_JACKKNIFE_MAX_N`` pairs) the same pass yields each
+    observation's concordance, and from those the leave-one-out tau-b values
+    for a jackknife standard error and normal interval, and the
+    hyperbolically weighted tau. Without it, scipy's compiled counter
+    supplies the pair totals. Returns a ``KendallTau``; the tau values are
+    NaN when either sample is constant.
+    """
+    from scipy.stats import norm
+
+    x = np.asarray(x, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+    n = len(x)
+    if jackknife is None:
+        jackknife = n <= KENDALL_JACKKNIFE_MAX_N
+    total = n * (n - 1) // 2
+    x_ties, x0, x1 = _tie_pairs(x)
+    y_ties, y0, y1 = _tie_pairs(y)
+    if n < 2 or x_ties == total or y_ties == total:
+        return KendallTau(n, 0, np.nan, np.nan, np.nan, np.nan, "asymptotic", confidence=confidence)
+
+    s = None
+    if jackknife:
+        s, tx, ty, order_xy, order_yx = _concordance(x, y)
+        score = int(s.sum()) // 2
+    else:
+        from scipy.stats import kendalltau
+
+        # tau-b is the score over an exact integer denominator; undo it
+        tau = kendalltau(x, y).statistic
+        score = int(round(tau * np.sqrt(total - x_ties) * np.sqrt(total - y_ties)))
+
+    tau_b = float(np.clip(score / np.sqrt(total - x_ties) / np.sqrt(total - y_ties), -1.0, 1.0))
+    classes = min(int(x.max()) + 1, int(y.max()) + 1)
+    tau_c = float(np.clip(2 * score / (n ** 2 * (classes - 1) / classes), -1.0, 1.0))
+    result = KendallTau(n, score, score / total, tau_b, tau_c, np.nan, "asymptotic", confidence=confidence)
+
+    if x_ties == 0 and y_ties == 0 and n <= EXACT_MAX_N:
+        result.method = "exact"
+        result.p_value = kendall_exact((total - score) // 2, n)
+    else:
+        m = n * (n - 1.0)
+        var = (m * (2 * n + 5) - x1 - y1) / 18 + 2 * x_ties * y_ties / m + x0 * y0 / (9 * m * (n - 2))
+        result.p_value = float(2 * norm.sf(abs(score) / np.sqrt(var)))
+
+    if s is not None and n > 2:
+        # Leaving observation i out removes its s_i pairs and its share of the ties
+        left_out = (n - 1) * (n - 2) // 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            taus = (score - s) / np.sqrt((left_out - (x_ties - (tx - 1))) * (left_out - (y_ties - (ty - 1.0))))
+        taus = taus[np.isfinite(taus)]
+        if len(taus) > 1:
+            se = float(np.sqrt((len(taus) - 1) / len(taus) * np.sum((taus - taus.mean()) ** 2)))
+            half = norm.isf((1 - confidence) / 2) * se
+            result.jackknife_se = se
+            result.ci = (float(max(-1.0, tau_b - half)), float(min(1.0, tau_b + half)))
+        result.weighted_tau = (_hyperbolic_tau(s, tx, ty, order_xy) + _hyperbolic_tau(s, tx, ty, order_yx)) / 2
+    return result
+
+
+def ks_statistic(a, b):
+    """Two-sample Kolmogorov-Smirnov D from the cached sorted samples.
+
+    ``a`` and ``b`` are ``ColumnRanks``. The ECDF difference only changes at
+    observed values, so it is evaluated at each sample's own distinct
+    values: there the sample's ECDF is the running sum of its tie counts,
+    and the other's one binary search into its sorted values. No pooled
+    re-sort.
+    """
+    cdf_a = np.cumsum(a.counts) / a.n
+    cdf_b = np.cumsum(b.counts) / b.n
+    at_a = np.abs(cdf_a - np.searchsorted(b.sorted, a.uniques, side="right") / b.n)
+    at_b = np.abs(np.searchsorted(a.sorted, b.uniques, side="right") / a.n - cdf_b)
+    return float(max(at_a.max(), at_b.max()))
@@ -0,0 +1,163 @@
+from dataclasses import dataclass, field, replace
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from nptests.correction import adjust_pvalues
+from nptests.kernels import kendall_tau
+from nptests.ranks import RankCache, kendall, ks_2sample, mann_whitney_u, rank_column
+
+MATRIX_TESTS = [
+    "Spearman's Rank Correlation",
+    "Kendall's Tau",
+    "Mann-Whitney U Test",
+    "Kolmogorov-Smirnov Test",
+]
+
+
+@dataclass
+class MatrixResult:
+    columns: list
+    correction: str
+    statistics: dict = field(default_factory=dict)
+    p_values: dict = field(default_factory=dict)
+    adjusted: dict = field(default_factory=dict)
+
+    def long_table(self):
+        """One row per (test, column pair) with raw and adjusted p-values."""
+        rows = []
+        for test, stats in self.statistics.items():
+            for a, b in combinations(self.columns, 2):
+                rows.append({
+                    "Test": test,
+                    "Column 1": a,
+                    "Column 2": b,
+                    "Statistic": stats.at[a, b],
+                    "p-value": self.p_values[test].at[a, b],
+                    "Adjusted p-value": self.adjusted[test].at[a, b],
+                })
+        return pd.DataFrame(rows)
+
+
+def _frame(values, columns):
+    return pd.DataFrame(values, index=columns, columns=columns)
+
+
+def _rank_matrix(data, columns, ranks):
+    cached = [ranks.column(col) for col in columns]
+    if not any(col.has_nan for col in cached):
+        return np.column_stack([col.ranks for col in cached])
+    # Listwise deletion changes the ranks, so rank the complete rows afresh
+    return data[columns].dropna().rank(method="average").to_numpy(dtype=float)
+
+
+def _spearman_matrix(ranks):
+    from scipy.stats import t as t_dist
+
+    n = ranks.shape[0]
+    rho = np.corrcoef(ranks, rowvar=False)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_stat = rho * np.sqrt((n - 2) / ((1.0 - rho) * (1.0 + rho)))
+    p = 2 * t_dist.sf(np.abs(t_stat), n - 2)
+    # A column against itself is not a comparison
+    np.fill_diagonal(rho, np.nan)
+    np.fill_diagonal(p, np.nan)
+    return rho, p
+
+
+class _NonNull:
+    """View of a ``RankCache`` in which each column drops its own missing values.
+
+    The two-sample tests compare the columns as separate samples, so a gap
+    in one column does not remove values from the other. Sorted values and
+    tie groups never include missing values, so nothing is re-sorted.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def column(self, col):
+        ranked = self.cache.column(col)
+        if not ranked.has_nan:
+            return ranked
+        return replace(ranked, ranks=ranked.ranks[ranked.valid], valid=np.ones(ranked.n, dtype=bool))
+
+
+def _kendall_complete(cache, col1, col2):
+    # Kendall pairs observations, so it uses the rows complete in both columns
+    a, b = cache.column(col1), cache.column(col2)
+    if not (a.has_nan or b.has_nan):
+        return kendall(cache, col1, col2)
+    keep = a.valid & b.valid
+    x = rank_column(cache.data[col1].to_numpy(dtype=float, na_value=np.nan)[keep])
+    y = rank_column(cache.data[col2].to_numpy(dtype=float, na_value=np.nan)[keep])
+    result = kendall_tau(x.codes, y.codes, jackknife=False)
+    return result.tau_b, result.p_value
+
+
+def _pairwise(cache, columns, func, complement=False):
+    # With ``complement`` the mirrored statistic is n_i * n_j - stat (Mann-Whitney U)
+    # The diagonal (a column against itself) stays NaN
+    k = len(columns)
+    stat = np.full((k, k), np.nan)
+    p = np.full((k, k), np.nan)
+    for i, j in combinations(range(k), 2):
+        stat[i, j], p[i, j] = func(cache, columns[i], columns[j])
+        p[j, i] = p[i, j]
+        if complement:
+            stat[j, i] = cache.column(columns[i]).n * cache.column(columns[j]).n - stat[i, j]
+        else:
+            stat[j, i] = stat[i, j]
+    return stat, p
+
+
+def _adjust_matrix(p, method):
+    k = p.shape[0]
+    iu = np.triu_indices(k, 1)
+    adjusted = np.full_like(p, np.nan)
+    adjusted[iu] = adjust_pvalues(p[iu], method)
+    adjusted[iu[1], iu[0]] = adjusted[iu]
+    return adjusted
+
+
+def pairwise_matrix(data, columns=None, tests=None, correction="holm", ranks=None):
+    """Run the pairwise tests in ``MATRIX_TESTS`` over every pair of ``columns``.
+
+    Columns are ranked once through ``ranks`` (a ``RankCache``, shared with
+    ``run_test``). Spearman is one correlation over the rank matrix, using
+    the rows complete in all selected columns; the other tests follow
+    ``run_test`` pair by pair on the cached ranks: Kendall on the rows
+    complete in both columns, Mann-Whitney and KS on each column's
+    non-missing values. Adjusted p-values are
+    corrected within each test over the k(k-1)/2 pairs.
+    """
+    if columns is None:
+        columns = data.select_dtypes(include=["number"]).columns.tolist()
+    columns = list(columns)
+    if len(columns) < 2:
+        raise ValueError("Matrix mode needs at least two numeric columns")
+    tests = list(tests or MATRIX_TESTS)
+
+    if ranks is None:
+        ranks = RankCache(data)
+    result = MatrixResult(columns=columns, correction=correction)
+
+    for test in tests:
+        if test == "Spearman's Rank Correlation":
+            stat, p = _spearman_matrix(_rank_matrix(data, columns, ranks))
+        elif test == "Kendall's Tau":
+            # Tau has no closed-form matrix formulation; pairs go through the
+            # cached dense ranks instead
+            stat, p = _pairwise(ranks, columns, _kendall_complete)
+        elif test == "Mann-Whitney U Test":
+            stat, p = _pairwise(_NonNull(ranks), columns, mann_whitney_u, complement=True)
+        elif test == "Kolmogorov-Smirnov Test":
+            stat, p = _pairwise(_NonNull(ranks), columns, ks_2sample)
+        else:
+            raise ValueError(f"Test not available in matrix mode: {test}")
+        result.statistics[test] = _frame(stat, columns)
+        result.p_values[test] = _frame(p, columns)
+        result.adjusted[test] = _frame(_adjust_matrix(p, correction), columns)
+
+    return result
@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+# matplotlib and seaborn are imported on first use; a stats-only run never loads them
+
+PLOT_TYPES = ["Boxplot", "Violin Plot", "Distribution Plot", "Scatterplot"]
+# Above this many rows plots are drawn from NumPy pre-aggregates instead of raw points
+LARGE_N = 50_000
+# Grid points for binned KDEs and the most boxes/violins drawn along x
+KDE_GRID = 512
+MAX_GROUPS = 40
+
+
+# Enhanced visualization section
+def generate_visualizations(data, col1, col2, selected_plots, large_n=LARGE_N):
+    if len(data) > large_n:
+        return generate_large_visualizations(data, col1, col2, selected_plots)
+
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    visualizations = []
+
+    if "Boxplot" in selected_plots:
+        fig, ax = plt.subplots()
+        sns.boxplot(data=data, x=col2, y=col1, ax=ax)
+        visualizations.append(fig)
+
+    if "Violin Plot" in selected_plots:
+        fig, ax = plt.subplots()
+        sns.violinplot(data=data, x=col2, y=col1, ax=ax)
+        visualizations.append(fig)
+
+    if "Distribution Plot" in selected_plots:
+        fig, ax = plt.subplots()
+        sns.histplot(data[col1], kde=True, ax=ax)
+        if col2:
+            sns.histplot(data[col2], kde=True, ax=ax, color="orange")
+        visualizations.append(fig)
+
+    if "Scatterplot" in selected_plots and col2 and pd.api.types.is_numeric_dtype(data[col2]):
+        fig, ax = plt.subplots()
+        sns.scatterplot(x=data[col1], y=data[col2], ax=ax)
+        visualizations.append(fig)
+
+    return visualizations
+
+
+def matrix_heatmaps(matrix_result, test):
+    """Side-by-side heatmaps of the statistic and adjusted p-value for one matrix test."""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import seaborn as sns
+
+    stats = matrix_result.statistics[test]
+    adjusted = matrix_result.adjusted[test]
+    mask = np.eye(len(stats), dtype=bool)
+    size = max(6, 0.6 * len(stats))
+
+    fig, (ax_stat, ax_p) = plt.subplots(1, 2, figsize=(2 * size, size))
+    sns.heatmap(stats, mask=mask, annot=True, fmt=".3g", cmap="vlag", ax=ax_stat)
+    ax_stat.set_title(f"{test}: statistic")
+    sns.heatmap(adjusted, mask=mask, annot=True, fmt=".2g", cmap="viridis_r", vmin=0, vmax=1, ax=ax_p)
+    ax_p.set_title(f"{test}: {matrix_result.correction} adjusted p-value")
+    fig.tight_layout()
+    return fig
+
+
+def _group_values(data, col1, col2):
+    """``(labels, sorted value arrays)`` for col1 split by col2, from one lexsort.
+
+    Numeric grouping columns with more than ``MAX_GROUPS`` distinct values
+    are cut into quantile bins so the number of boxes stays bounded.
+    """
+    frame = data[[col1] + ([col2] if col2 else [])].dropna()
+    values = frame[col1].to_numpy(dtype=float)
+    if not col2:
+        return [col1], [np.sort(values)]
+
+    groups = frame[col2]
+    if groups.nunique() > MAX_GROUPS:
+        if pd.api.types.is_numeric_dtype(groups):
+            groups = pd.qcut(groups, MAX_GROUPS, duplicates="drop")
+        else:
+            top = groups.value_counts().index[:MAX_GROUPS]
+            keep = groups.isin(top).to_numpy()
+            groups, values = groups[keep], values[keep]
+    codes, labels = pd.factorize(groups, sort=True)
+    order = np.lexsort((values, codes))
+    bounds = np.cumsum(np.bincount(codes, minlength=len(labels)))
+    return [str(label) for label in labels], np.split(values[order], bounds[:-1])
+
+
+def _box_stats(label, ordered):
+    q1, median, q3 = np.quantile(ordered, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    low = ordered[np.searchsorted(ordered, q1 - 1.5 * iqr, side="left")]
+    high = ordered[np.searchsorted(ordered, q3 + 1.5 * iqr, side="right") - 1]
+    return {"label": label, "q1": q1, "med": median, "q3": q3, "whislo": low, "whishi": high, "fliers": []}
+
+
+def binned_kde(values, grid_size=KDE_GRID):
+    """Gaussian KDE evaluated on a grid via linear binning and one convolution.
+
+    Uses Scott's bandwidth like seaborn; cost is O(n + grid_size^2)
+    regardless of how many points there are.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    std = values.std(ddof=1) if n > 1 else 0.0
+    if n < 2 or std == 0:
+        return np.array([values.mean()] * 2), np.zeros(2)
+    bandwidth = std * n ** (-1.0 / 5)
+    lo, hi = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    grid = np.linspace(lo, hi, grid_size)
+    step = grid[1] - grid[0]
+
+    # Linear binning: split every point's weight between its two grid neighbours
+    position = (values - lo) / step
+    left = np.clip(np.floor(position).astype(np.intp), 0, grid_size - 2)
+    frac = position - left
+    counts = np.bincount(left, weights=1 - frac, minlength=grid_size)
+    counts += np.bincount(left + 1, weights=frac, minlength=grid_size)
+
+    offsets = np.arange(-grid_size + 1, grid_size) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    density = np.convolve(counts, kernel)[grid_size - 1: 2 * grid_size - 1] / n
+    return grid, density
+
+
+def generate_large_visualizations(data, col1, col2, selected_plots):
+    """Constant-cost versions of the standard plots for large datasets.
+
+    Boxes come from quantiles of one sorted pass, violins and distribution
+    curves from binned KDEs, histograms from ``np.histogram`` and the
+    scatterplot becomes a hexbin density.
+    """
+    import matplotlib.pyplot as plt
+
+    visualizations = []
+    needs_groups = "Boxplot" in selected_plots or "Violin Plot" in selected_plots
+    if needs_groups:
+        labels, groups = _group_values(data, col1, col2)
+        positions = np.arange(1, len(labels) + 1)
+
+    if "Boxplot" in selected_plots:
+        fig, ax = plt.subplots()
+        ax.bxp([_box_stats(label, g) for label, g in zip(labels, groups) if len(g)], showfliers=False)
+        ax.set_xlabel(col2 or "")
+        ax.set_ylabel(col1)
+        ax.tick_params(axis="x", labelrotation=90 if len(labels) > 8 else 0)
+        visualizations.append(fig)
+
+    if "Violin Plot" in selected_plots:
+        fig, ax = plt.subplots()
+        for pos, g in zip(positions, groups):
+            if len(g) < 2:
+                continue
+            grid, density = binned_kde(g, grid_size=256)
+            inside = (grid >= g[0]) & (grid <= g[-1])
+            half = 0.4 * density / density.max() if density.max() > 0 else density
+            ax.fill_betweenx(grid[inside], pos - half[inside], pos + half[inside], alpha=0.7)
+            q1, median, q3 = np.quantile(g, [0.25, 0.5, 0.75])
+            ax.vlines(pos, q1, q3, color="black", linewidth=3)
+            ax.scatter([pos], [median], color="white", zorder=3, s=10)
+        ax.set_xticks(positions, labels, rotation=90 if len(labels) > 8 else 0)
+        ax.set_xlabel(col2 or "")
+        ax.set_ylabel(col1)
+        visualizations.append(fig)
+
+    if "Distribution Plot" in selected_plots:
+        fig, ax = plt.subplots()
+        for col, color in ((col1, "C0"), (col2, "orange")):
+            if not col or not pd.api.types.is_numeric_dtype(data[col]):
+                continue
+            values = data[col].dropna().to_numpy(dtype=float)
+            edges = np.histogram_bin_edges(values, bins="auto")
+            counts, edges = np.histogram(values, bins=edges if len(edges) <= 201 else 200)
+            ax.stairs(counts, edges, fill=True, alpha=0.5, color=color, label=col)
+            grid, density = binned_kde(values)
+            ax.plot(grid, density * len(values) * np.diff(edges).mean(), color=color)
+        ax.set_ylabel("Count")
+        ax.legend()
+        visualizations.append(fig)
+
+    if "Scatterplot" in selected_plots and col2 and pd.api.types.is_numeric_dtype(data[col2]):
+        fig, ax = plt.subplots()
+        both = data[[col1, col2]].dropna()
+        hb = ax.hexbin(both[col1], both[col2], gridsize=60, bins="log", mincnt=1, cmap="viridis")
+        fig.colorbar(hb, ax=ax, label="log10(count)")
+        ax.set_xlabel(col1)
+        ax.set_ylabel(col2)
+        visualizations.append(fig)
+
+    return visualizations
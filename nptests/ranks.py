@@ -0,0 +1,268 @@
+import threading
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from nptests.exact import EXACT_MAX_N, mann_whitney_exact, signed_rank_exact
+from nptests.kernels import kendall_tau, ks_statistic
+
+# Below these sizes scipy switches to exact null distributions. Small
+# Mann-Whitney and Wilcoxon samples (up to ``EXACT_MAX_N``) get exact,
+# tie-aware p-values from ``nptests.exact``; the remaining small cases the
+# cached kernels do not cover hand over to scipy.
+MWU_EXACT_MAX = 8
+KS_EXACT_MAX = 10000
+
+
+@dataclass
+class ColumnRanks:
+    """Everything the rank-based tests need from one column, computed from one sort."""
+
+    sorted: np.ndarray  # non-null values in ascending order
+    order: np.ndarray  # stable argsort of the non-null values (positions into ``valid``)
+    ranks: np.ndarray  # average ranks in original row order (NaN for missing rows)
+    codes: np.ndarray  # dense rank (0-based tie group) per non-null row, original order
+    uniques: np.ndarray  # distinct values
+    counts: np.ndarray  # size of each tie group
+    valid: np.ndarray  # boolean mask of non-null rows
+
+    @property
+    def n(self):
+        return len(self.sorted)
+
+    @property
+    def has_nan(self):
+        return not self.valid.all()
+
+    @property
+    def tie_term(self):
+        counts = self.counts.astype(float)
+        return float(np.sum(counts ** 3 - counts))
+
+    @property
+    def median(self):
+        return float(np.median(self.sorted)) if self.n else np.nan
+
+
+def rank_column(values):
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    present = values[valid]
+    order = np.argsort(present, kind="stable")
+    sorted_values = present[order]
+
+    if len(sorted_values):
+        starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    else:
+        starts = np.array([], dtype=np.intp)
+    counts = np.diff(np.r_[starts, len(sorted_values)])
+    # Tie group starting at 0-based position i with c members has average rank i + (c + 1) / 2
+    group_ranks = starts + (counts + 1) / 2.0
+
+    codes = np.empty(len(present), dtype=np.intp)
+    codes[order] = np.repeat(np.arange(len(starts)), counts)
+    ranks = np.full(len(values), np.nan)
+    ranks[valid] = group_ranks[codes]
+
+    return ColumnRanks(
+        sorted=sorted_values,
+        order=order,
+        ranks=ranks,
+        codes=codes,
+        uniques=sorted_values[starts],
+        counts=counts,
+        valid=valid,
+    )
+
+
+class RankCache:
+    """Per-dataset memo of column rankings and group factorizations.
+
+    Build one per loaded dataset (the apps key it by content hash) and pass
+    it to ``run_test``; each column is sorted and ranked the first time a
+    test asks for it and reused by every later test.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._columns = {}
+        self._groups = {}
+        self._pairs = {}
+        self._lock = threading.Lock()
+
+    def column(self, col):
+        entry = self._columns.get(col)
+        if entry is None:
+            entry = rank_column(self.data[col].to_numpy(dtype=float, na_value=np.nan))
+            with self._lock:
+                entry = self._columns.setdefault(col, entry)
+        return entry
+
+    def groups(self, col):
+        """``(codes, labels)`` from factorizing ``col``; missing values get code -1."""
+        entry = self._groups.get(col)
+        if entry is None:
+            entry = pd.factorize(self.data[col], sort=True)
+            with self._lock:
+                entry = self._groups.setdefault(col, entry)
+        return entry
+
+    def paired_differences(self, col1, col2):
+        """Ranks of the non-zero absolute paired differences (Wilcoxon signed-rank)."""
+        key = (col1, col2)
+        entry = self._pairs.get(key)
+        if entry is None:
+            d = self.data[col1].to_numpy(dtype=float) - self.data[col2].to_numpy(dtype=float)
+            d = d[d != 0]
+            entry = (d, rank_column(np.abs(d)))
+            with self._lock:
+                entry = self._pairs.setdefault(key, entry)
+        return entry
+
+
+def _pooled_counts(a, b):
+    """Tie-group sizes of the two columns pooled, in ascending order of value."""
+    values = np.union1d(a.uniques, b.uniques)
+    counts = np.zeros(len(values), dtype=np.int64)
+    counts[np.searchsorted(values, a.uniques)] += a.counts
+    counts[np.searchsorted(values, b.uniques)] += b.counts
+    return counts
+
+
+def mann_whitney_u(cache, col1, col2):
+    from scipy.stats import mannwhitneyu, norm
+
+    a, b = cache.column(col1), cache.column(col2)
+    if a.has_nan or b.has_nan:
+        return np.nan, np.nan
+    n1, n2 = a.n, b.n
+    exact = min(n1, n2) > 0 and n1 + n2 <= EXACT_MAX_N
+    if not exact and min(n1, n2) <= MWU_EXACT_MAX:
+        return tuple(mannwhitneyu(a.sorted, b.sorted))
+
+    # U1 counts, for every value of col1, the col2 values below it plus half
+    # the ties: no pooled re-ranking needed, only lookups into the sorted col2
+    below = np.searchsorted(b.sorted, a.uniques, side="left")
+    ties = np.searchsorted(b.sorted, a.uniques, side="right") - below
+    u1 = float(np.sum(a.counts * (below + 0.5 * ties)))
+    counts = _pooled_counts(a, b)
+    if exact:
+        return u1, mann_whitney_exact(u1, n1, n2, counts)
+
+    n = n1 + n2
+    mu = n1 * n2 / 2.0
+    tie_term = float(np.sum(counts.astype(float) ** 3 - counts))
+    sigma = np.sqrt(n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1))))
+    if sigma == 0:
+        return u1, np.nan
+    z = (max(u1, n1 * n2 - u1) - mu - 0.5) / sigma
+    return u1, float(min(1.0, 2 * norm.sf(z)))
+
+
+def wilcoxon_signed_rank(cache, col1, col2):
+    from scipy.stats import norm
+
+    if cache.column(col1).has_nan or cache.column(col2).has_nan:
+        return np.nan, np.nan
+
+    d, abs_ranks = cache.paired_differences(col1, col2)
+    n = len(d)
+    if n == 0:
+        return np.nan, np.nan
+    r_plus = float(np.sum(abs_ranks.ranks[d > 0]))
+    r_minus = float(np.sum(abs_ranks.ranks[d < 0]))
+    stat = min(r_plus, r_minus)
+    if n <= EXACT_MAX_N:
+        return stat, signed_rank_exact(r_plus, abs_ranks.counts)
+    mn = n * (n + 1) / 4.0
+    se = np.sqrt(n * (n + 1) * (2 * n + 1) / 24.0 - abs_ranks.tie_term / 48.0)
+    if se == 0:
+        return stat, np.nan
+    z = (stat - mn) / se
+    return stat, float(2 * norm.sf(abs(z)))
+
+
+def kruskal_wallis(cache, col, by):
+    from scipy.stats import chi2
+
+    ranked = cache.column(col)
+    if ranked.has_nan:
+        return np.nan, np.nan
+    codes, labels = cache.groups(by)
+    if (codes < 0).any():
+        # Rows without a group label are dropped, so rank the remainder afresh
+        keep = codes >= 0
+        ranked = rank_column(cache.data[col].to_numpy(dtype=float)[keep])
+        codes = codes[keep]
+
+    # One global ranking; group rank sums are a single bincount over the codes
+    k = len(labels)
+    n_g = np.bincount(codes, minlength=k).astype(float)
+    r_g = np.bincount(codes, weights=ranked.ranks, minlength=k)
+    present = n_g > 0
+    if present.sum() < 2:
+        raise ValueError("Need at least two groups in Kruskal-Wallis test.")
+    n = n_g.sum()
+    h = 12.0 / (n * (n + 1)) * np.sum(r_g[present] ** 2 / n_g[present]) - 3 * (n + 1)
+    ties = 1 - ranked.tie_term / (n ** 3 - n)
+    if ties == 0:
+        return np.nan, np.nan
+    h /= ties
+    return float(h), float(chi2.sf(h, int(present.sum()) - 1))
+
+
+def spearman(cache, col1, col2):
+    from scipy.stats import t as t_dist
+
+    a, b = cache.column(col1), cache.column(col2)
+    if a.has_nan or b.has_nan:
+        return np.nan, np.nan
+    n = a.n
+    rho = float(np.corrcoef(a.ranks, b.ranks)[0, 1])
+    if abs(rho) >= 1.0:
+        return rho, 0.0
+    t_stat = rho * np.sqrt((n - 2) / ((1.0 - rho) * (1.0 + rho)))
+    return rho, float(2 * t_dist.sf(abs(t_stat), n - 2))
+
+
+def kendall(cache, col1, col2, details=False):
+    """Kendall's tau-b and its p-value from the cached dense ranks.
+
+    With ``details`` a third element holds every field of
+    ``nptests.kernels.KendallTau`` (tau-a, tau-c, the jackknife interval and
+    the weighted tau), which costs a per-observation pass; without it only
+    the pair totals are counted, as for the matrix of all pairs.
+    """
+    a, b = cache.column(col1), cache.column(col2)
+    if a.has_nan or b.has_nan:
+        return (np.nan, np.nan, {}) if details else (np.nan, np.nan)
+    # Dense integer ranks carry the same ordering and ties as the raw values
+    result = kendall_tau(a.codes, b.codes, jackknife=None if details else False)
+    if details:
+        return result.tau_b, result.p_value, asdict(result)
+    return result.tau_b, result.p_value
+
+
+def ks_2sample(cache, col1, col2):
+    from scipy.stats import ks_2samp, kstwo
+
+    a, b = cache.column(col1), cache.column(col2)
+    if a.has_nan or b.has_nan:
+        return np.nan, np.nan
+    if max(a.n, b.n) <= KS_EXACT_MAX:
+        return tuple(ks_2samp(a.sorted, b.sorted))[:2]
+
+    d = ks_statistic(a, b)
+    en = a.n * b.n / (a.n + b.n)
+    return d, float(np.clip(kstwo.sf(d, np.round(en)), 0.0, 1.0))
+
+
+def sign_counts(cache, col, mu0=None):
+    """``(positive, negative)`` counts around ``mu0`` (default: the median) from the sorted column."""
+    ranked = cache.column(col)
+    if mu0 is None:
+        mu0 = ranked.median
+    negative = int(np.searchsorted(ranked.sorted, mu0, side="left"))
+    positive = ranked.n - int(np.searchsorted(ranked.sorted, mu0, side="right"))
+    return positive, negative
@@ -0,0 +1,123 @@
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+# fpdf and matplotlib are imported on first use so the engine stays cheap to import
+
+# Rendered figures are placed 180 mm wide and flow onto new pages as they fill up
+IMAGE_WIDTH = 180
+RENDER_DPI = 100
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _render_png(fig, dpi):
+    import numpy as np
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from PIL import Image
+
+    # Draw on a private Agg canvas so workers never touch pyplot state; the
+    # alpha channel is dropped so the PDF can embed the PNG data as-is
+    fig.set_dpi(dpi)
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    rgb = np.asarray(canvas.buffer_rgba())[:, :, :3]
+    buffer = BytesIO()
+    Image.fromarray(rgb).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_figures(figs, workers=4, dpi=RENDER_DPI):
+    """Render matplotlib figures to in-memory RGB PNG bytes on a thread pool.
+
+    Each figure gets its own Agg canvas, so figures render concurrently and
+    nothing is written to disk. The figures are closed afterwards.
+    """
+    import matplotlib.pyplot as plt
+
+    figs = list(figs)
+    if workers > 1 and len(figs) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(figs))) as pool:
+            images = list(pool.map(lambda fig: _render_png(fig, dpi), figs))
+    else:
+        images = [_render_png(fig, dpi) for fig in figs]
+    for fig in figs:
+        plt.close(fig)
+    return images
+
+
+def _png_info(png):
+    # Image dictionary in the layout fpdf builds when it parses a PNG file,
+    # for 8-bit RGB PNGs held in memory
+    if png[:8] != PNG_SIGNATURE:
+        raise ValueError("Not a PNG image")
+    width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", png[16:29])
+    if depth != 8 or color != 2 or interlace:
+        raise ValueError("Only 8-bit, non-interlaced RGB PNG images are supported")
+    data = []
+    pos = 8
+    while pos < len(png):
+        length, = struct.unpack(">I", png[pos:pos + 4])
+        kind = png[pos + 4:pos + 8]
+        if kind == b"IDAT":
+            data.append(png[pos + 8:pos + 8 + length])
+        elif kind == b"IEND":
+            break
+        pos += length + 12
+    return {
+        "w": width, "h": height, "cs": "DeviceRGB", "bpc": 8, "f": "FlateDecode",
+        "dp": f"/Predictor 15 /Colors 3 /BitsPerComponent 8 /Columns {width}",
+        "pal": "", "trns": "", "data": b"".join(data),
+    }
+
+
+# PDF Generation function
+def create_pdf_report(test_results, visualizations):
+    """Build the PDF report; ``visualizations`` holds PNG bytes or image paths.
+
+    Figures flow down the page at a fixed width and start a new page when
+    the next one would not fit.
+    """
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    # Add test results
+    pdf.cell(200, 10, txt="Statistical Test Report", ln=1, align="C")
+    pdf.ln(10)
+
+    for section, content in test_results.items():
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(200, 10, txt=section, ln=1)
+        pdf.set_font("Arial", size=12)
+        pdf.multi_cell(0, 10, txt=str(content))
+        pdf.ln(5)
+
+    # Add visualizations
+    if visualizations:
+        pdf.add_page()
+        pdf.cell(200, 10, txt="Visualizations", ln=1, align="C")
+        for idx, image in enumerate(visualizations):
+            if isinstance(image, bytes):
+                # Registered under a synthetic name; fpdf reuses cached image info
+                name = f"figure-{idx}.png"
+                pdf.images[name] = dict(_png_info(image), i=len(pdf.images) + 1)
+            else:
+                name = image
+            pdf.image(name, x=(210 - IMAGE_WIDTH) / 2, w=IMAGE_WIDTH)
+            pdf.ln(5)
+
+    return pdf.output(dest="S").encode("latin1")
+
+
+def report_sections(result, null_hyp, alt_hyp):
+    """Build the section dict ``create_pdf_report`` expects from a ``TestResult``."""
+    return {
+        "Test Performed": result.test,
+        "Null Hypothesis": null_hyp,
+        "Alternative Hypothesis": alt_hyp,
+        "Test Results": f"Statistic: {result.statistic}\nP-value: {result.p_value}",
+        "Conclusion": result.conclusion,
+    }
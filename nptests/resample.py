@@ -0,0 +1,582 @@
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import combinations, permutations, product
+
+import numpy as np
+import pandas as pd
+
+from nptests.engine import run_test
+from nptests.friedman import block_matrix, row_ranks
+from nptests.ranks import ColumnRanks, RankCache, rank_column
+
+# Resamples are drawn in batches of at most this many array elements
+BATCH_ELEMENTS = 4_000_000
+# Batches evaluated between early-stopping checks; fixed so the stopping point
+# (and therefore the result) does not depend on the number of workers
+ROUND_BATCHES = 8
+MIN_RESAMPLES = 1000
+STOP_CONFIDENCE = 0.99
+# The bootstrap stops early once the Monte Carlo uncertainty of both interval
+# ends (at STOP_CONFIDENCE) is within this fraction of the interval's width
+MIN_BOOTSTRAP = 400
+BOOTSTRAP_TOLERANCE = 0.1
+# Enumerate the full permutation distribution when it has at most this many members
+EXACT_LIMIT = 100_000
+# Two-sample permutations draw how many of each tie group fall in the first
+# sample (multivariate hypergeometric, O(distinct values)) rather than
+# shuffling all n labels when at most this share of the values are distinct
+HYPERGEOMETRIC_MAX_SHARE = 0.125
+
+
+@dataclass
+class ResamplingResult:
+    test: str
+    statistic: float
+    asymptotic_p: float
+    p_value: float
+    p_interval: tuple
+    resamples: int
+    exact: bool
+    stopped_early: bool
+    effect: str = None
+    effect_value: float = None
+    effect_ci: tuple = None
+    bootstrap_resamples: int = 0
+    confidence: float = 0.95
+    seed: int = 0
+
+
+def _rng(seed, stream, index):
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(stream, index)))
+
+
+def _shuffled(values, rng, size):
+    return rng.permuted(np.tile(values, (size, 1)), axis=1)
+
+
+# Permutation draws, one row per resample
+
+
+def _draw_tie_counts(state, rng, size):
+    # Members of each pooled tie group that fall in the resample's first group
+    counts, n, n1 = state["pooled"].counts, state["n"], state["n1"]
+    if len(counts) <= HYPERGEOMETRIC_MAX_SHARE * n:
+        return rng.multivariate_hypergeometric(counts, n1, size=size, method="marginals")
+    # Otherwise shuffle first-group membership over the sorted positions
+    first = np.zeros(n, dtype=np.int8)
+    first[:n1] = 1
+    member = _shuffled(first, rng, size)
+    if len(counts) == n:
+        return member
+    return np.add.reduceat(member, np.cumsum(counts) - counts, axis=1, dtype=np.int64)
+
+
+def _draw_signs(state, rng, size):
+    return rng.random((size, len(state["values"]))) < 0.5
+
+
+def _draw_order(state, rng, size):
+    return _shuffled(np.arange(state["n"]), rng, size)
+
+
+def _draw_within_rows(state, rng, size):
+    return rng.permuted(np.broadcast_to(state["R"], (size,) + state["R"].shape), axis=2)
+
+
+def _exact_labels(state):
+    n, n1 = state["n"], state["n1"]
+    if math.comb(n, n1) > EXACT_LIMIT:
+        return None
+    return np.array(list(combinations(range(n), n1)), dtype=np.intp).reshape(-1, n1)
+
+
+def _exact_tie_counts(state):
+    labels = _exact_labels(state)
+    if labels is None:
+        return None
+    return _tie_counts(state["pooled"].codes, len(state["pooled"].counts), labels)
+
+
+def _exact_signs(state):
+    n = len(state["values"])
+    if 2 ** n > EXACT_LIMIT:
+        return None
+    return np.array(list(product([False, True], repeat=n)), dtype=bool).reshape(-1, n)
+
+
+def _exact_order(state):
+    n = state["n"]
+    if math.factorial(n) > EXACT_LIMIT:
+        return None
+    return np.array(list(permutations(range(n))), dtype=np.intp)
+
+
+# Null statistics: each maps a batch of draws to a "larger is more extreme" value
+
+
+def _mwu_null(state, counts):
+    rank_sum = counts @ state["group_ranks"]
+    return np.abs(rank_sum - state["n1"] * (state["n"] + 1) / 2.0)
+
+
+def _ks_null(state, counts):
+    # The CDFs only need comparing at the end of each pooled tie group
+    n, n1 = state["n"], state["n1"]
+    cum_first = np.cumsum(counts, axis=1)
+    cum_second = state["cum_counts"] - cum_first
+    return np.max(np.abs(cum_first / n1 - cum_second / (n - n1)), axis=1)
+
+
+def _signed_rank_null(state, signs):
+    values = state["values"]
+    return np.abs(signs @ values - values.sum() / 2.0)
+
+
+def _spearman_null(state, order):
+    return np.abs(state["y"][order] @ state["x"])
+
+
+def _kendall_null(state, order):
+    from scipy.stats import kendalltau
+
+    x, y = state["x"], state["y"]
+    return np.array([abs(kendalltau(x, y[row]).statistic) for row in order])
+
+
+def _kruskal_null(state, order):
+    size, k = len(order), state["k"]
+    codes = state["codes"][order] + k * np.arange(size)[:, None]
+    weights = np.broadcast_to(state["ranks"], codes.shape)
+    rank_sums = np.bincount(codes.ravel(), weights=weights.ravel(), minlength=size * k)
+    rank_sums = rank_sums.reshape(size, k)[:, state["present"]]
+    return np.sum(rank_sums ** 2 / state["n_g"], axis=1)
+
+
+def _runs_null(state, order):
+    indicator = state["indicator"][order]
+    runs = 1 + np.count_nonzero(np.diff(indicator, axis=1), axis=1)
+    return np.abs(runs - state["expected_runs"])
+
+
+def _friedman_null(state, shuffled):
+    return np.sum(shuffled.sum(axis=1) ** 2, axis=1)
+
+
+# Bootstrap effect sizes: each resamples the raw data and returns one effect per row
+
+
+def _boot_rows(rng, n, size):
+    return rng.integers(0, n, size=(size, n))
+
+
+def _tie_counts(codes, u, rows):
+    # Draws from each of the ``u`` tie groups, one row per resample
+    flat = codes[rows] + u * np.arange(len(rows))[:, None]
+    return np.bincount(flat.ravel(), minlength=len(rows) * u).reshape(len(rows), u)
+
+
+def _tie_ranks(counts):
+    """Average rank of each tie group within each resample.
+
+    Resampling keeps the order of the tie groups, so a resample is ranked
+    from its draws per group, without a sort: the draws from the groups
+    below plus half the group's own.
+    """
+    return np.cumsum(counts, axis=1) - counts + (counts + 1) / 2.0
+
+
+def _draw_ranks(ranked, rows):
+    # Ranks of the drawn observations within each resample
+    counts = _tie_counts(ranked.codes, len(ranked.counts), rows)
+    return np.take_along_axis(_tie_ranks(counts), ranked.codes[rows], axis=1)
+
+
+def _mwu_effect(state, rng, size):
+    n1, n = state["n1"], state["n"]
+    codes, u = state["pooled"].codes, len(state["pooled"].counts)
+    first = _tie_counts(codes[:n1], u, _boot_rows(rng, n1, size))
+    second = _tie_counts(codes[n1:], u, _boot_rows(rng, n - n1, size))
+    u1 = np.sum(first * _tie_ranks(first + second), axis=1) - n1 * (n1 + 1) / 2.0
+    return u1 / (n1 * (n - n1))
+
+
+def _ks_effect(state, rng, size):
+    # The CDFs only need comparing at the end of each pooled tie group
+    n1, n = state["n1"], state["n"]
+    codes, u = state["pooled"].codes, len(state["pooled"].counts)
+    cum_first = np.cumsum(_tie_counts(codes[:n1], u, _boot_rows(rng, n1, size)), axis=1)
+    cum_second = np.cumsum(_tie_counts(codes[n1:], u, _boot_rows(rng, n - n1, size)), axis=1)
+    return np.max(np.abs(cum_first / n1 - cum_second / (n - n1)), axis=1)
+
+
+def _median_effect(state, rng, size):
+    d = state["raw"]
+    return np.median(d[_boot_rows(rng, len(d), size)], axis=1)
+
+
+def _spearman_effect(state, rng, size):
+    rows = _boot_rows(rng, state["n"], size)
+    rx = _draw_ranks(state["ranked_x"], rows)
+    ry = _draw_ranks(state["ranked_y"], rows)
+    rx -= rx.mean(axis=1, keepdims=True)
+    ry -= ry.mean(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.sum(rx * ry, axis=1) / np.sqrt(np.sum(rx ** 2, axis=1) * np.sum(ry ** 2, axis=1))
+
+
+def _kendall_effect(state, rng, size):
+    from scipy.stats import kendalltau
+
+    x, y = state["x"], state["y"]
+    idx = _boot_rows(rng, len(x), size)
+    return np.array([kendalltau(x[row], y[row]).statistic for row in idx])
+
+
+def _kruskal_effect(state, rng, size):
+    # Epsilon-squared, H / (n - 1), from the untied form of H
+    n, codes, k = state["n"], state["codes"], state["k"]
+    rows = _boot_rows(rng, n, size)
+    ranks = _draw_ranks(state["ranked"], rows)
+    flat = (codes[rows] + k * np.arange(size)[:, None]).ravel()
+    rank_sums = np.bincount(flat, weights=ranks.ravel(), minlength=size * k).reshape(size, k)
+    n_g = np.bincount(flat, minlength=size * k).reshape(size, k)
+    terms = np.divide(rank_sums ** 2, n_g, out=np.zeros_like(rank_sums), where=n_g > 0)
+    h = 12.0 / (n * (n + 1)) * terms.sum(axis=1) - 3 * (n + 1)
+    return h / (n - 1)
+
+
+def _friedman_effect(state, rng, size):
+    # Kendall's W from resampled blocks; row ranks are unchanged by row resampling
+    R = state["R"]
+    n, k = R.shape
+    col_sums = R[_boot_rows(rng, n, size)].sum(axis=1)
+    deviations = np.sum((col_sums - n * (k + 1) / 2.0) ** 2, axis=1)
+    return 12.0 * deviations / (n ** 2 * (k ** 3 - k))
+
+
+# test -> (draw, exact enumeration, null statistic, effect name, bootstrap effect)
+RESAMPLING = {
+    "Mann-Whitney U Test": (_draw_tie_counts, _exact_tie_counts, _mwu_null, "P(X > Y)", _mwu_effect),
+    "Kolmogorov-Smirnov Test": (_draw_tie_counts, _exact_tie_counts, _ks_null, "KS distance", _ks_effect),
+    "Wilcoxon Signed-Rank Test": (_draw_signs, _exact_signs, _signed_rank_null, "Median difference", _median_effect),
+    "Sign Test": (_draw_signs, _exact_signs, _signed_rank_null, "Median", _median_effect),
+    "Spearman's Rank Correlation": (_draw_order, _exact_order, _spearman_null, "Spearman's rho", _spearman_effect),
+    "Kendall's Tau": (_draw_order, _exact_order, _kendall_null, "Kendall's tau", _kendall_effect),
+    "Kruskal-Wallis Test": (_draw_order, None, _kruskal_null, "Epsilon-squared", _kruskal_effect),
+    "Runs Test (Wald-Wolfowitz)": (_draw_order, None, _runs_null, None, None),
+    "Friedman Test": (_draw_within_rows, None, _friedman_null, "Kendall's W", _friedman_effect),
+}
+
+
+def _paired(data, col1, col2):
+    both = data[[col1, col2]].dropna()
+    return both[col1].to_numpy(dtype=float), both[col2].to_numpy(dtype=float)
+
+
+def _prepare(test, data, col1, col2, columns, ranks, block=None):
+    """Precompute everything the draws need; returns (state, observed draw)."""
+    if test in ("Mann-Whitney U Test", "Kolmogorov-Smirnov Test"):
+        x = data[col1].dropna().to_numpy(dtype=float)
+        y = data[col2].dropna().to_numpy(dtype=float)
+        pooled = rank_column(np.concatenate([x, y]))
+        state = {
+            "n": len(x) + len(y),
+            "n1": len(x),
+            "group_ranks": _tie_ranks(pooled.counts[None, :])[0],
+            "cum_counts": np.cumsum(pooled.counts),
+            "pooled": pooled,
+        }
+        return state, _tie_counts(pooled.codes, len(pooled.counts), np.arange(len(x))[None, :])
+
+    if test in ("Wilcoxon Signed-Rank Test", "Sign Test"):
+        if test == "Sign Test":
+            raw = data[col1].dropna().to_numpy(dtype=float)
+            d = raw - ranks.column(col1).median
+        else:
+            x, y = _paired(data, col1, col2)
+            raw = d = x - y
+        d = d[d != 0]
+        if test == "Sign Test":
+            values = np.ones(len(d))
+        else:
+            values = rank_column(np.abs(d)).ranks
+        return {"values": values, "raw": raw}, (d > 0)[None, :]
+
+    if test in ("Spearman's Rank Correlation", "Kendall's Tau"):
+        x, y = _paired(data, col1, col2)
+        if test == "Spearman's Rank Correlation":
+            ranked_x, ranked_y = rank_column(x), rank_column(y)
+            rx, ry = ranked_x.ranks, ranked_y.ranks
+            rx = (rx - rx.mean()) / np.linalg.norm(rx - rx.mean())
+            ry = (ry - ry.mean()) / np.linalg.norm(ry - ry.mean())
+            state = {"n": len(x), "x": rx, "y": ry, "ranked_x": ranked_x, "ranked_y": ranked_y}
+        else:
+            state = {"n": len(x), "x": rank_column(x).codes, "y": rank_column(y).codes}
+        return state, np.arange(len(x))[None, :]
+
+    if test == "Kruskal-Wallis Test":
+        codes, labels = ranks.groups(col2)
+        values = data[col1].to_numpy(dtype=float, na_value=np.nan)
+        keep = (codes >= 0) & ~np.isnan(values)
+        values, codes = values[keep], codes[keep]
+        k = len(labels)
+        n_g = np.bincount(codes, minlength=k)
+        ranked = rank_column(values)
+        state = {
+            "n": len(values),
+            "k": k,
+            "codes": codes,
+            "ranks": ranked.ranks,
+            "present": n_g > 0,
+            "n_g": n_g[n_g > 0].astype(float),
+            "ranked": ranked,
+        }
+        return state, np.arange(len(values))[None, :]
+
+    if test == "Runs Test (Wald-Wolfowitz)":
+        x = data[col1].dropna().to_numpy(dtype=float)
+        indicator = (x >= x.mean()).astype(np.int8)
+        n_pos = int(indicator.sum())
+        n_neg = len(x) - n_pos
+        state = {
+            "n": len(x),
+            "indicator": indicator,
+            "expected_runs": 2.0 * n_pos * n_neg / len(x) + 1,
+        }
+        return state, np.arange(len(x))[None, :]
+
+    if test == "Friedman Test":
+        if columns is None:
+            columns = data.select_dtypes(include=["number"]).columns.tolist()[:3]
+        R, _ = row_ranks(block_matrix(data, columns, block))
+        return {"R": R}, R[None, :, :]
+
+    raise ValueError(f"Resampling is not available for: {test}")
+
+
+def _null_batch(test, state, seed, index, size):
+    rng = _rng(seed, 0, index)
+    draw, _, null, _, _ = RESAMPLING[test]
+    return null(state, draw(state, rng, size))
+
+
+def _count_batch(test, state, seed, index, size, observed):
+    stats = _null_batch(test, state, seed, index, size)
+    return int(np.count_nonzero(stats >= observed)), size
+
+
+def _effect_batch(test, state, seed, index, size):
+    return RESAMPLING[test][4](state, _rng(seed, 1, index), size)
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    """Process pool shared by all resampling calls in this server process."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # forkserver/spawn: forking a multi-threaded Streamlit server is unsafe
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _pool_workers = workers
+        return _pool
+
+
+def _map(func, args_list, workers):
+    if workers <= 1 or len(args_list) <= 1:
+        return [func(*args) for args in args_list]
+    pool = _get_pool(workers)
+    return list(pool.map(func, *zip(*args_list)))
+
+
+def _wilson_interval(hits, total, confidence):
+    from scipy.stats import norm
+
+    z = norm.isf((1 - confidence) / 2)
+    p = hits / total
+    denom = 1 + z ** 2 / total
+    center = (p + z ** 2 / (2 * total)) / denom
+    half = z * math.sqrt(p * (1 - p) / total + z ** 2 / (4 * total ** 2)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _interval_settled(effects, confidence):
+    # Order-statistic bands around both percentiles, against the interval's width
+    from scipy.stats import norm
+
+    effects = np.sort(effects[~np.isnan(effects)])
+    b = len(effects)
+    if b < MIN_BOOTSTRAP:
+        return False
+    z = norm.isf((1 - STOP_CONFIDENCE) / 2)
+    tail = (1 - confidence) / 2
+    low, high = np.percentile(effects, [tail * 100, 100 - tail * 100])
+    for q in (tail, 1 - tail):
+        spread = z * math.sqrt(b * q * (1 - q))
+        band = effects[min(b - 1, math.ceil(b * q + spread))] - effects[max(0, math.floor(b * q - spread))]
+        if band > BOOTSTRAP_TOLERANCE * (high - low):
+            return False
+    return True
+
+
+def _bootstrap(test, state, n_bootstrap, confidence, seed, workers, early_stop, progress):
+    """Bootstrap effects in rounds of batches, like the permutation draws."""
+    boot_state = {key: value for key, value in state.items() if key not in ("ranks", "group_ranks", "cum_counts")}
+    size = _batch_size(boot_state, n_bootstrap)
+    n_batches = math.ceil(n_bootstrap / size)
+    effects = []
+    for start in range(0, n_batches, ROUND_BATCHES):
+        indices = range(start, min(start + ROUND_BATCHES, n_batches))
+        args = [(test, boot_state, seed, i, min(size, n_bootstrap - i * size)) for i in indices]
+        effects.extend(_map(_effect_batch, args, workers))
+        total = sum(len(batch) for batch in effects)
+        if progress is not None:
+            progress(total / n_bootstrap, f"{total} of {n_bootstrap} bootstrap resamples")
+        if early_stop and total < n_bootstrap and _interval_settled(np.concatenate(effects), confidence):
+            break
+    return np.concatenate(effects)
+
+
+def _batch_size(state, requested):
+    # Bounded by the widest per-draw array; a ranked column spans its length
+    per_draw = max(
+        (
+            value.n if isinstance(value, ColumnRanks) else np.size(value)
+            for value in state.values() if isinstance(value, (np.ndarray, ColumnRanks))
+        ),
+        default=1,
+    )
+    return max(1, min(requested, BATCH_ELEMENTS // max(per_draw, 1)))
+
+
+def resample_test(
+    data, test, col1, col2=None, columns=None, n_resamples=10_000, n_bootstrap=2_000,
+    alpha=0.05, confidence=0.95, seed=0, workers=1, early_stop=True, ranks=None, block=None,
+    progress=None,
+):
+    """Permutation p-value and bootstrap confidence interval for one test.
+
+    The permutation distribution is enumerated exactly when it has at most
+    ``EXACT_LIMIT`` members; otherwise up to ``n_resamples`` Monte Carlo
+    draws are made in NumPy batches. Batch ``i`` is always seeded from
+    ``(seed, i)``, so results do not depend on ``workers``. With
+    ``early_stop`` the draws stop once a Wilson interval on the p-value
+    lies entirely on one side of ``alpha``, and the bootstrap once both ends
+    of its percentile interval are known to ``BOOTSTRAP_TOLERANCE`` of its
+    width; ``n_bootstrap=0`` skips it. ``progress`` is called as
+    ``progress(fraction, message)`` after every round of batches of either.
+    """
+    if test not in RESAMPLING:
+        raise ValueError(f"Resampling is not available for: {test}")
+    if ranks is None:
+        ranks = RankCache(data)
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+
+    asymptotic = run_test(data, test, col1, col2, alpha=alpha, ranks=ranks, columns=columns, block=block)
+    state, observed_draw = _prepare(test, data, col1, col2, columns, ranks, block)
+    draw, exact, null, effect_name, effect = RESAMPLING[test]
+    observed = float(null(state, observed_draw)[0])
+    # Ties between the observed and permuted statistics count as extreme
+    threshold = observed - 1e-9 * max(1.0, abs(observed))
+    # With a bootstrap to follow, the permutations report the first half of the progress
+    share = 0.5 if effect is not None and n_bootstrap else 1.0
+
+    enumerated = exact(state) if exact is not None else None
+    if enumerated is not None:
+        stats = np.concatenate([
+            null(state, enumerated[start:start + 10_000])
+            for start in range(0, len(enumerated), 10_000)
+        ])
+        total = len(stats)
+        hits = int(np.count_nonzero(stats >= threshold))
+        p_value = hits / total
+        p_interval = (p_value, p_value)
+        stopped_early = False
+    else:
+        size = _batch_size(state, n_resamples)
+        n_batches = math.ceil(n_resamples / size)
+        hits = total = 0
+        stopped_early = False
+        for start in range(0, n_batches, ROUND_BATCHES):
+            indices = range(start, min(start + ROUND_BATCHES, n_batches))
+            args = [(test, state, seed, i, min(size, n_resamples - i * size), threshold) for i in indices]
+            for batch_hits, batch_total in _map(_count_batch, args, workers):
+                hits += batch_hits
+                total += batch_total
+            p_interval = _wilson_interval(hits + 1, total + 1, STOP_CONFIDENCE)
+            if progress is not None:
+                progress(share * total / n_resamples, f"{total} of {n_resamples} resamples")
+            if early_stop and total >= MIN_RESAMPLES and (p_interval[1] < alpha or p_interval[0] > alpha):
+                stopped_early = total < n_resamples
+                break
+        p_value = (hits + 1) / (total + 1)
+        p_interval = _wilson_interval(hits + 1, total + 1, STOP_CONFIDENCE)
+
+    result = ResamplingResult(
+        test=test,
+        statistic=asymptotic.statistic,
+        asymptotic_p=asymptotic.p_value,
+        p_value=p_value,
+        p_interval=p_interval,
+        resamples=total,
+        exact=enumerated is not None,
+        stopped_early=stopped_early,
+        effect=effect_name,
+        confidence=confidence,
+        seed=seed,
+    )
+
+    if effect is not None and n_bootstrap:
+        boot_progress = None
+        if progress is not None:
+            def boot_progress(fraction, message):
+                progress(share + (1 - share) * fraction, message)
+        effects = _bootstrap(test, state, n_bootstrap, confidence, seed, workers, early_stop, boot_progress)
+        tail = (1 - confidence) / 2 * 100
+        low, high = np.nanpercentile(effects, [tail, 100 - tail])
+        result.effect_value = _observed_effect(test, state)
+        result.effect_ci = (float(low), float(high))
+        result.bootstrap_resamples = len(effects)
+
+    return result
+
+
+def _observed_effect(test, state):
+    if test in ("Mann-Whitney U Test", "Kolmogorov-Smirnov Test"):
+        n1, n = state["n1"], state["n"]
+        counts = _tie_counts(state["pooled"].codes, len(state["pooled"].counts), np.arange(n1)[None, :])
+        if test == "Kolmogorov-Smirnov Test":
+            return float(_ks_null(state, counts)[0])
+        u1 = float(counts[0] @ state["group_ranks"]) - n1 * (n1 + 1) / 2.0
+        return u1 / (n1 * (n - n1))
+    if test in ("Wilcoxon Signed-Rank Test", "Sign Test"):
+        return float(np.median(state["raw"]))
+    if test == "Spearman's Rank Correlation":
+        return float(state["y"] @ state["x"])
+    if test == "Kendall's Tau":
+        from scipy.stats import kendalltau
+
+        return float(kendalltau(state["x"], state["y"]).statistic)
+    if test == "Kruskal-Wallis Test":
+        n = state["n"]
+        rank_sums = np.bincount(state["codes"], weights=state["ranks"], minlength=state["k"])[state["present"]]
+        h = 12.0 / (n * (n + 1)) * np.sum(rank_sums ** 2 / state["n_g"]) - 3 * (n + 1)
+        return float(h / (n - 1))
+    if test == "Friedman Test":
+        R = state["R"]
+        n, k = R.shape
+        deviations = np.sum((R.sum(axis=0) - n * (k + 1) / 2.0) ** 2)
+        return float(12.0 * deviations / (n ** 2 * (k ** 3 - k)))
+    return None
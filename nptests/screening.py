@@ -0,0 +1,170 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from nptests.correction import adjust_pvalues
+
+SCREENING_TESTS = ["Sign Test", "Runs Test (Wald-Wolfowitz)"]
+
+
+@dataclass
+class ScreeningResult:
+    table: pd.DataFrame  # one row per (group, column, test)
+    correction: str
+    group_column: str = None
+    alpha: float = 0.05
+
+    def significant(self):
+        """Rows significant after correction, most significant first."""
+        table = self.table[self.table["Adjusted p-value"] < self.alpha]
+        return table.sort_values("Adjusted p-value", kind="stable")
+
+
+def _segments(data, by):
+    """Row order grouping equal labels (original order within groups), group starts, and labels."""
+    if by is None:
+        return np.arange(len(data)), np.array([0]), np.array(["All rows"], dtype=object)
+    codes, labels = pd.factorize(data[by], sort=True)
+    keep = np.flatnonzero(codes >= 0)
+    order = keep[np.argsort(codes[keep], kind="stable")]
+    sizes = np.bincount(codes[keep], minlength=len(labels))
+    present = sizes > 0
+    starts = np.r_[0, np.cumsum(sizes[present])[:-1]]
+    return order, starts, np.asarray(labels)[present]
+
+
+def _segment_medians(values, valid, starts, counts):
+    # Sort every column within its groups at once: sort by value, then stably
+    # by group index (a radix sort for small integer types). NaNs sort last,
+    # so they end each group
+    n = len(values)
+    group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+    order = np.argsort(values, axis=0)
+    if len(starts) > 1:
+        small = group.astype(np.int16 if len(starts) <= np.iinfo(np.int16).max else np.int32)
+        order = np.take_along_axis(order, np.argsort(small[order], axis=0, kind="stable"), axis=0)
+    ordered = np.take_along_axis(values, order, axis=0)
+    lo = np.clip(starts[:, None] + (counts - 1) // 2, 0, max(n - 1, 0))
+    hi = np.clip(starts[:, None] + counts // 2, 0, max(n - 1, 0))
+    with np.errstate(invalid="ignore"):
+        medians = (np.take_along_axis(ordered, lo, axis=0) + np.take_along_axis(ordered, hi, axis=0)) / 2
+    return np.where(counts > 0, medians, np.nan), group
+
+
+def _sign_p_values(positive, negative):
+    from scipy.stats import binom
+
+    # Two-sided binomial test at p = 0.5: twice the smaller tail, as binom_test
+    total = positive + negative
+    with np.errstate(invalid="ignore"):
+        p = np.minimum(1.0, 2 * binom.cdf(np.minimum(positive, negative), total, 0.5))
+    return np.where(total > 0, p, np.nan)
+
+
+def _runs_z(runs, above, count):
+    from scipy.stats import norm
+
+    # Same statistic as statsmodels' runstest_1samp, element-wise
+    count = count.astype(float)
+    below = count - above
+    product = above * below
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = 2.0 * product / count + 1
+        std = np.sqrt(2.0 * product * (2.0 * product - count) / count ** 2 / (count - 1.0))
+        deviation = runs - mean
+        corrected = np.where(deviation > 0.5, deviation - 0.5, np.where(deviation < 0.5, deviation + 0.5, 0.0))
+        deviation = np.where(count < 50, corrected, deviation)
+        z = deviation / std
+        p = 2 * norm.sf(np.abs(z))
+        # A single run: the probability of that arrangement
+        single = 1 / 2.0 ** (np.minimum(count, 1024) - 1)
+        z = np.where(runs == 1, -norm.isf(single), z)
+        p = np.where(runs == 1, 2 * single, p)
+    # Two observations on either side of the mean have no variance to test against
+    empty = (count < 2) | ((std == 0) & (runs != 1))
+    return np.where(empty, np.nan, z), np.where(empty, np.nan, p)
+
+
+def screen_one_sample(
+    data, columns=None, by=None, tests=None, mu0=None, correction="holm", alpha=0.05, min_size=5,
+):
+    """Sign and Wald-Wolfowitz Runs tests for every numeric column, optionally per group of ``by``.
+
+    Rows are reordered once so each group is contiguous (keeping their order
+    within the group, which the Runs test depends on); every statistic is
+    then a segment reduction over the whole (rows x columns) matrix. The
+    Sign test compares against ``mu0`` (default: each group's median, with
+    values equal to it dropped); the Runs test dichotomizes at each group's
+    mean. Missing values are skipped. Groups smaller than ``min_size`` are
+    left out, and p-values are corrected together across all rows.
+    """
+    if columns is None:
+        columns = data.select_dtypes(include=["number"]).columns.tolist()
+        columns = [col for col in columns if col != by]
+    tests = SCREENING_TESTS if tests is None else list(tests)
+    unknown = set(tests) - set(SCREENING_TESTS)
+    if unknown:
+        raise ValueError(f"Not a one-sample screening test: {', '.join(sorted(unknown))}")
+    if not columns:
+        raise ValueError("Select at least one numeric column to screen.")
+
+    order, starts, labels = _segments(data, by)
+    if not len(order):
+        raise ValueError("No rows to screen.")
+    values = data[columns].to_numpy(dtype=float, na_value=np.nan)[order]
+    valid = ~np.isnan(values)
+    counts = np.add.reduceat(valid, starts, axis=0)
+
+    results = {}
+    if "Sign Test" in tests:
+        if mu0 is None:
+            center, group = _segment_medians(values, valid, starts, counts)
+        else:
+            center = np.full(counts.shape, float(mu0))
+            group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(values)]))
+        row_center = center[group]
+        positive = np.add.reduceat(values > row_center, starts, axis=0)
+        negative = np.add.reduceat(values < row_center, starts, axis=0)
+        results["Sign Test"] = (positive.astype(float), _sign_p_values(positive, negative), center)
+
+    if "Runs Test (Wald-Wolfowitz)" in tests:
+        group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(values)]))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cutoff = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0) / counts
+        indicator = values >= cutoff[group]
+        above = np.add.reduceat(indicator & valid, starts, axis=0)
+        # Runs skip missing values: compare each valid row with the last valid
+        # row before it, counting a change only inside the same group
+        rows = np.arange(len(values))[:, None]
+        last = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+        previous = np.vstack([np.full((1, len(columns)), -1), last[:-1]])
+        safe = np.maximum(previous, 0)
+        changed = (
+            valid
+            & (previous >= starts[group][:, None])
+            & (indicator != np.take_along_axis(indicator, safe, axis=0))
+        )
+        runs = np.where(counts > 0, 1 + np.add.reduceat(changed, starts, axis=0), 0).astype(float)
+        z, p = _runs_z(runs, above.astype(float), counts)
+        results["Runs Test (Wald-Wolfowitz)"] = (z, p, cutoff)
+
+    keep = counts >= max(min_size, 1)
+    frames = []
+    for test in tests:
+        statistic, p_value, center = results[test]
+        g, c = np.nonzero(keep)
+        frames.append(pd.DataFrame({
+            "Group": labels[g],
+            "Column": np.asarray(columns, dtype=object)[c],
+            "Test": test,
+            "n": counts[g, c],
+            "Center": center[g, c],
+            "Statistic": statistic[g, c],
+            "p-value": p_value[g, c],
+        }))
+    table = pd.concat(frames, ignore_index=True)
+    table["Adjusted p-value"] = adjust_pvalues(table["p-value"].to_numpy(), correction)
+    if by is None:
+        table = table.drop(columns="Group")
+    return ScreeningResult(table=table, correction=correction, group_column=by, alpha=alpha)
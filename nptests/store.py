@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Limits (bytes / seconds); the app server can override them through the environment
+RESULT_CACHE_BYTES = int(os.environ.get("NPT_RESULT_CACHE_BYTES", 64 * 1024 ** 2))
+RESULT_MAX_AGE = float(os.environ.get("NPT_RESULT_MAX_AGE", 7 * 24 * 3600))
+RESULT_DIR = os.environ.get("NPT_RESULT_DIR", os.path.join(tempfile.gettempdir(), "nptests-results"))
+# Temporary files older than this (seconds) are left over from interrupted writes
+TMP_MAX_AGE = 600
+# Bumped whenever the key or entry layout changes
+STORE_VERSION = 2
+# Implementation version of each test, bumped whenever its statistic or
+# p-value computation changes so only that test's stored outcomes go stale
+TEST_VERSIONS = {
+    "Mann-Whitney U Test": 2,  # exact p-values for small samples
+    "Wilcoxon Signed-Rank Test": 2,  # exact p-values with ties
+    "Sign Test": 2,  # cached exact binomial
+    "Kendall's Tau": 2,  # tau variants, jackknife CI and weighted tau in details
+}
+
+
+def result_key(digest, test, columns, options):
+    """Stable key for one test outcome: dataset content hash, test, columns and options.
+
+    The key also covers the test's implementation version and the sample
+    sizes below which exact p-values are used, since both change results.
+    """
+    from nptests.exact import BINOMIAL_MAX_N, EXACT_MAX_N
+
+    payload = json.dumps(
+        [STORE_VERSION, TEST_VERSIONS.get(test, 1), EXACT_MAX_N, BINOMIAL_MAX_N, digest, test, list(columns), options],
+        sort_keys=True, default=str,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class ResultStore:
+    """Disk-backed store of test outcomes shared by every process on the host.
+
+    Each entry is a small JSON file written atomically (temporary file plus
+    ``os.replace``), so concurrent server processes never see a partial
+    entry and need no lock. Reads refresh the file's mtime; writes evict
+    entries older than ``max_age`` and then the least recently used ones
+    until the directory fits in ``max_bytes``. Hit and miss counters are
+    per process.
+    """
+
+    def __init__(self, directory=RESULT_DIR, max_bytes=RESULT_CACHE_BYTES, max_age=RESULT_MAX_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as handle:
+                entry = json.load(handle)
+            if time.time() - os.stat(path).st_mtime > self.max_age:
+                raise OSError("expired")
+            os.utime(path)  # mark as recently used for eviction
+        except (OSError, ValueError):
+            self._count(False)
+            return None
+        self._count(True)
+        return entry
+
+    def put(self, key, entry):
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as handle:
+                json.dump(entry, handle)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError, ValueError):
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return
+        self.evict()
+
+    def evict(self):
+        now = time.time()
+        try:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                elif entry.name.endswith(".tmp") and now - entry.stat().st_mtime > TMP_MAX_AGE:
+                    # Another process may still be writing a recent one
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes and now - mtime <= self.max_age:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith((".json", ".tmp")):
+                    os.remove(entry.path)
+        except OSError:
+            pass
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
+_default_store = None
+
+
+def default_store():
+    """The process-wide ``ResultStore`` configured from the environment."""
+    global _default_store
+    if _default_store is None:
+        _default_store = ResultStore()
+    return _default_store
@@ -0,0 +1,447 @@
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+APPROXIMATE_TESTS = [
+    "Mann-Whitney U Test",
+    "Kolmogorov-Smirnov Test",
+    "Spearman's Rank Correlation",
+    "Sign Test",
+    "Runs Test (Wald-Wolfowitz)",
+]
+CHUNK_ROWS = 1_000_000
+# KLL accuracy parameter; a sketch holds O(SKETCH_K) values whatever the row count
+SKETCH_K = 4096
+
+
+class QuantileSketch:
+    """Mergeable KLL quantile sketch (Karnin, Lang & Liberty) over a numeric stream.
+
+    Values are buffered in levels; a full level is sorted and every other
+    value (random offset) is promoted to the next level with twice the
+    weight. Memory stays at O(``k``) values and every rank estimate is
+    within ``rank_error * n`` of the truth with ~99% confidence. Sketches of
+    disjoint parts of a stream merge into a sketch of the whole.
+    """
+
+    def __init__(self, k=SKETCH_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+        self._sorted = None
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2.0 / 3.0) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                odd = len(items) % 2
+                promoted = items[odd + self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = items[:odd]
+            level += 1
+        self._sorted = None
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    @property
+    def exact(self):
+        return len(self.levels) == 1
+
+    @property
+    def rank_error(self):
+        """Normalized rank error (fraction of n) at ~99% confidence; 0 while nothing was compacted."""
+        if self.exact:
+            return 0.0
+        # Empirical two-sided bound published with the Apache DataSketches KLL sketch
+        return min(2.446 / self.k ** 0.9433, 1.0)
+
+    @property
+    def size(self):
+        return sum(len(items) for items in self.levels)
+
+    def _weighted(self):
+        # Retained values in order with cumulative weights, rebuilt after each update
+        if self._sorted is None:
+            values = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+            order = np.argsort(values, kind="stable")
+            self._sorted = values[order], np.cumsum(weights[order])
+        return self._sorted
+
+    def cdf(self, x, mid=False):
+        """Estimated fraction of values <= ``x``; with ``mid``, ties count half (mid-ranks)."""
+        values, cumulative = self._weighted()
+        x = np.asarray(x, dtype=float)
+        total = np.concatenate([[0.0], cumulative])
+        at_most = total[np.searchsorted(values, x, side="right")]
+        if not mid:
+            return at_most / self.n
+        below = total[np.searchsorted(values, x, side="left")]
+        return (below + at_most) / (2.0 * self.n)
+
+    def quantile(self, q):
+        values, cumulative = self._weighted()
+        target = np.clip(np.asarray(q, dtype=float), 0.0, 1.0) * self.n
+        index = np.minimum(np.searchsorted(cumulative, target, side="left"), len(values) - 1)
+        return values[index]
+
+    def median_bounds(self):
+        """Median estimate with the values at the ranks ``0.5 -/+ rank_error``."""
+        low, median, high = self.quantile([0.5 - self.rank_error, 0.5, 0.5 + self.rank_error])
+        return float(median), float(low), float(high)
+
+
+@dataclass
+class ApproxResult:
+    test: str
+    statistic: float
+    p_value: float
+    statistic_bounds: tuple
+    p_bounds: tuple
+    n: int
+    rank_error: float
+    alpha: float = 0.05
+    details: dict = field(default_factory=dict)
+
+    @property
+    def conclusion(self):
+        if self.p_bounds[1] < self.alpha:
+            return "Reject H0"
+        if self.p_bounds[0] >= self.alpha:
+            return "Fail to reject H0"
+        return "Inconclusive at this sketch size"
+
+
+def iter_chunks(source, columns, chunksize=CHUNK_ROWS):
+    """Yield DataFrame chunks of ``columns`` from one or more CSV/Parquet files.
+
+    Parquet files are memory-mapped and read batch by batch, so only the
+    requested columns of one batch are ever materialized.
+    """
+    paths = [source] if isinstance(source, (str, os.PathLike)) else list(source)
+    for path in paths:
+        if str(path).endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            parquet = pq.ParquetFile(path, memory_map=True)
+            for batch in parquet.iter_batches(batch_size=chunksize, columns=list(columns)):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(path, usecols=list(columns), chunksize=chunksize)
+
+
+def write_columnar(source, target, chunksize=CHUNK_ROWS):
+    """Stream a CSV into a Parquet copy that later passes can memory-map."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in pd.read_csv(source, chunksize=chunksize):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return target
+
+
+def _values(chunk, columns, paired):
+    arrays = [chunk[col].to_numpy(dtype=float, na_value=np.nan) for col in columns]
+    if paired:
+        keep = np.all([~np.isnan(values) for values in arrays], axis=0)
+        arrays = [values[keep] for values in arrays]
+    return arrays
+
+
+def sketch_columns(source, columns, paired=False, chunksize=CHUNK_ROWS, k=SKETCH_K):
+    """One pass over ``source``: a quantile sketch of every column in ``columns``.
+
+    Each file is sketched on its own and the per-file sketches are merged.
+    With ``paired`` only rows complete in every column are used.
+    """
+    paths = [source] if isinstance(source, (str, os.PathLike)) else list(source)
+    sketches = {col: QuantileSketch(k) for col in columns}
+    for path in paths:
+        part = {col: QuantileSketch(k) for col in columns}
+        for chunk in iter_chunks(path, columns, chunksize):
+            for col, values in zip(columns, _values(chunk, columns, paired)):
+                part[col].update(values)
+        for col in columns:
+            sketches[col].merge(part[col])
+    return sketches
+
+
+def _normal_p(z):
+    from scipy.stats import norm
+
+    return 2 * norm.sf(np.abs(z))
+
+
+def approximate_test(source, test, col1, col2=None, alpha=0.05, mu0=None, chunksize=CHUNK_ROWS, k=SKETCH_K):
+    """Run ``test`` over files too large for memory, from sketches and running counters.
+
+    ``source`` is a CSV/Parquet path or a list of shards with the same
+    columns. Mann-Whitney U, Kolmogorov-Smirnov and Spearman are computed
+    from quantile sketches and report deterministic bounds on the statistic
+    (given the sketches' rank error) and the p-values at those bounds. The
+    Sign and Runs tests keep exact counters; only the Sign test's default
+    ``mu0`` (the median) is approximate. Memory is bounded by ``chunksize``
+    rows plus ``O(k)`` per column.
+    """
+    if test not in APPROXIMATE_TESTS:
+        raise ValueError(f"Streaming mode is not available for: {test}")
+    if test in ("Mann-Whitney U Test", "Kolmogorov-Smirnov Test", "Spearman's Rank Correlation") and not col2:
+        raise ValueError(f"{test} needs two columns")
+
+    if test == "Mann-Whitney U Test":
+        return _stream_mann_whitney(source, col1, col2, alpha, chunksize, k)
+    if test == "Kolmogorov-Smirnov Test":
+        return _stream_ks(source, col1, col2, alpha, chunksize, k)
+    if test == "Spearman's Rank Correlation":
+        return _stream_spearman(source, col1, col2, alpha, chunksize, k)
+    if test == "Sign Test":
+        return _stream_sign(source, col1, mu0, alpha, chunksize, k)
+    return _stream_runs(source, col1, alpha, chunksize, k)
+
+
+def _medians(sketches):
+    return {col: sketch.median_bounds() for col, sketch in sketches.items()}
+
+
+def _stream_mann_whitney(source, col1, col2, alpha, chunksize, k):
+    sketches = sketch_columns(source, [col1, col2], chunksize=chunksize, k=k)
+    s1, s2 = sketches[col1], sketches[col2]
+    n1, n2 = s1.n, s2.n
+    # U / (n1 n2) = P(X > Y) + P(X = Y) / 2: the mid-rank CDF of column 2
+    # integrated against the weighted values retained for column 1
+    values, cumulative = s1._weighted()
+    weights = np.diff(np.concatenate([[0.0], cumulative]))
+    auc = float(np.sum(weights * s2.cdf(values, mid=True)) / n1)
+    error = s1.rank_error + s2.rank_error
+    u = auc * n1 * n2
+    bounds = (max(auc - error, 0.0) * n1 * n2, min(auc + error, 1.0) * n1 * n2)
+
+    # Normal approximation without the tie correction, which the sketches cannot recover
+    mean = n1 * n2 / 2.0
+    sigma = np.sqrt(n1 * n2 * (n1 + n2 + 1) / 12.0)
+    p_value = float(_normal_p((u - mean) / sigma))
+    far, near = sorted(bounds, key=lambda value: abs(value - mean), reverse=True)
+    near_p = 1.0 if bounds[0] <= mean <= bounds[1] else float(_normal_p((near - mean) / sigma))
+    return ApproxResult(
+        test="Mann-Whitney U Test",
+        statistic=u,
+        p_value=p_value,
+        statistic_bounds=bounds,
+        p_bounds=(float(_normal_p((far - mean) / sigma)), near_p),
+        n=n1 + n2,
+        rank_error=error,
+        alpha=alpha,
+        details={"medians": _medians(sketches), "sketch_items": s1.size + s2.size},
+    )
+
+
+def _stream_ks(source, col1, col2, alpha, chunksize, k):
+    from scipy.stats import kstwo
+
+    sketches = sketch_columns(source, [col1, col2], chunksize=chunksize, k=k)
+    s1, s2 = sketches[col1], sketches[col2]
+    grid = np.union1d(s1._weighted()[0], s2._weighted()[0])
+    d = float(np.max(np.abs(s1.cdf(grid) - s2.cdf(grid))))
+    error = s1.rank_error + s2.rank_error
+    bounds = (max(d - error, 0.0), min(d + error, 1.0))
+    en = round(s1.n * s2.n / (s1.n + s2.n))
+    return ApproxResult(
+        test="Kolmogorov-Smirnov Test",
+        statistic=d,
+        p_value=float(kstwo.sf(d, en)),
+        statistic_bounds=bounds,
+        p_bounds=(float(kstwo.sf(bounds[1], en)), float(kstwo.sf(bounds[0], en))),
+        n=s1.n + s2.n,
+        rank_error=error,
+        alpha=alpha,
+        details={"medians": _medians(sketches), "sketch_items": s1.size + s2.size},
+    )
+
+
+def _stream_spearman(source, col1, col2, alpha, chunksize, k):
+    from scipy.stats import t as t_dist
+
+    # Pass 1 sketches both columns over complete pairs; pass 2 correlates the
+    # mid-rank CDF values the sketches assign to each row
+    sketches = sketch_columns(source, [col1, col2], paired=True, chunksize=chunksize, k=k)
+    s1, s2 = sketches[col1], sketches[col2]
+    n = 0
+    sums = np.zeros(5)  # u, v, u^2, v^2, uv
+    for chunk in iter_chunks(source, [col1, col2], chunksize):
+        x, y = _values(chunk, [col1, col2], paired=True)
+        u, v = s1.cdf(x, mid=True), s2.cdf(y, mid=True)
+        n += len(u)
+        sums += [u.sum(), v.sum(), u @ u, v @ v, u @ v]
+    su, sv, suu, svv, suv = sums / n
+    rho = float((suv - su * sv) / np.sqrt((suu - su ** 2) * (svv - sv ** 2)))
+
+    # Each normalized rank is off by at most e1 or e2, so 12 E[(u - 1/2)(v - 1/2)]
+    # moves by at most 6 (e1 + e2) + 12 e1 e2 (exact for untied data)
+    e1, e2 = s1.rank_error, s2.rank_error
+    error = 6 * (e1 + e2) + 12 * e1 * e2
+    bounds = (max(rho - error, -1.0), min(rho + error, 1.0))
+
+    def p_of(r):
+        # As ranks.spearman: a perfect correlation leaves no t statistic
+        if abs(r) >= 1.0:
+            return 0.0
+        t_stat = r * np.sqrt((n - 2) / ((1.0 - r) * (1.0 + r)))
+        return float(2 * t_dist.sf(np.abs(t_stat), n - 2))
+
+    strongest = max(abs(bounds[0]), abs(bounds[1]))
+    weakest = 0.0 if bounds[0] <= 0 <= bounds[1] else min(abs(bounds[0]), abs(bounds[1]))
+    return ApproxResult(
+        test="Spearman's Rank Correlation",
+        statistic=rho,
+        p_value=p_of(rho),
+        statistic_bounds=bounds,
+        p_bounds=(p_of(strongest), p_of(weakest)),
+        n=n,
+        rank_error=e1 + e2,
+        alpha=alpha,
+        details={"medians": _medians(sketches), "sketch_items": s1.size + s2.size},
+    )
+
+
+def _stream_sign(source, col, mu0, alpha, chunksize, k):
+    from statsmodels.stats.proportion import binom_test
+
+    details = {}
+    rank_error = 0.0
+    if mu0 is None:
+        sketches = sketch_columns(source, [col], chunksize=chunksize, k=k)
+        details["medians"] = _medians(sketches)
+        mu0, low, high = details["medians"][col]
+        rank_error = sketches[col].rank_error
+        details["mu0_rank_error"] = rank_error
+    else:
+        low = high = mu0
+    # Counts around mu0 and around both ends of the band the true median lies in
+    cutoffs = np.array([mu0, low, high], dtype=float)
+    above = np.zeros(3, dtype=np.int64)
+    below = np.zeros(3, dtype=np.int64)
+    in_band = 0
+    for chunk in iter_chunks(source, [col], chunksize):
+        values = chunk[col].to_numpy(dtype=float, na_value=np.nan)
+        values = np.sort(values[~np.isnan(values)])
+        above += len(values) - np.searchsorted(values, cutoffs, side="right")
+        below += np.searchsorted(values, cutoffs, side="left")
+        in_band += int(np.count_nonzero((values >= low) & (values <= high)))
+
+    def p_of(positive, negative):
+        return float(binom_test(int(positive), int(positive + negative), prop=0.5, alternative="two-sided"))
+
+    positive, negative = int(above[0]), int(below[0])
+    p_value = p_of(positive, negative)
+    # More values above than below the median shrinks as the cutoff rises
+    # through the band: the p-value is smallest at one end, and can reach 1
+    # wherever the balance tips inside the band
+    ends = [p_of(above[1], below[1]), p_of(above[2], below[2])]
+    tips = (above[1] - below[1]) * (above[2] - below[2]) <= 0
+    details["mu0"] = float(mu0)
+    details["mu0_bounds"] = (float(low), float(high))
+    details["values_in_band"] = in_band
+    return ApproxResult(
+        test="Sign Test",
+        statistic=positive,
+        p_value=p_value,
+        statistic_bounds=(int(above[2]), int(above[1])),
+        p_bounds=(min(ends + [p_value]), 1.0 if tips else max(ends + [p_value])),
+        n=positive + negative,
+        rank_error=rank_error,
+        alpha=alpha,
+        details=details,
+    )
+
+
+def _stream_runs(source, col, alpha, chunksize, k):
+    from scipy.stats import norm
+
+    # Pass 1: the mean cutoff; pass 2: runs above/below it, carrying the last
+    # indicator across chunk boundaries
+    count = 0
+    total = 0.0
+    for chunk in iter_chunks(source, [col], chunksize):
+        values = chunk[col].to_numpy(dtype=float, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        count += len(values)
+        total += float(values.sum())
+    cutoff = total / count
+
+    above = runs = 0
+    last = None
+    for chunk in iter_chunks(source, [col], chunksize):
+        values = chunk[col].to_numpy(dtype=float, na_value=np.nan)
+        indicator = values[~np.isnan(values)] >= cutoff
+        if not len(indicator):
+            continue
+        above += int(np.count_nonzero(indicator))
+        runs += int(np.count_nonzero(indicator[1:] != indicator[:-1])) + (last is None or indicator[0] != last)
+        last = indicator[-1]
+
+    # Same statistic as statsmodels' runstest_1samp (continuity correction below 50)
+    below = count - above
+    if runs == 1:
+        p_value = 1 / 2.0 ** (min(count, 1024) - 1)
+        z = -norm.isf(p_value)
+        p_value *= 2
+    else:
+        product = above * below
+        mean = 2.0 * product / count + 1
+        std = np.sqrt(2.0 * product * (2.0 * product - count) / count ** 2 / (count - 1.0))
+        deviation = runs - mean
+        if count < 50:
+            if deviation > 0.5:
+                deviation -= 0.5
+            elif deviation < 0.5:
+                deviation += 0.5
+            else:
+                deviation = 0.0
+        z = deviation / std
+        p_value = float(2 * norm.sf(abs(z)))
+    return ApproxResult(
+        test="Runs Test (Wald-Wolfowitz)",
+        statistic=float(z),
+        p_value=p_value,
+        statistic_bounds=(float(z), float(z)),
+        p_bounds=(p_value, p_value),
+        n=count,
+        rank_error=0.0,
+        alpha=alpha,
+        details={"cutoff": cutoff, "runs": runs},
+    )
@@ -1,44 +1,31 @@
 import pandas as pd
 import streamlit as st
-from scipy.stats import wilcoxon
-import matplotlib.pyplot as plt
-import seaborn as sns
-from fpdf import FPDF
-from tempfile import NamedTemporaryFile
-
-# Function for visualization
-def generate_visualizations(data, col1, col2, selected_plots):
-    visualizations = []
-    
-    if "Boxplot" in selected_plots:
-        fig, ax = plt.subplots()
-        sns.boxplot(data=data, x=col2, y=col1, ax=ax)
-        visualizations.append(fig)
-    
-    if "Violin Plot" in selected_plots:
-        fig, ax = plt.subplots()
-        sns.violinplot(data=data, x=col2, y=col1, ax=ax)
-        visualizations.append(fig)
-    
-    if "Distribution Plot" in selected_plots:
-        fig, ax = plt.subplots()
-        sns.histplot(data[col1], kde=True, ax=ax)
-        if col2:
-            sns.histplot(data[col2], kde=True, ax=ax, color="orange")
-        visualizations.append(fig)
-    
-    return visualizations
+from nptests import run_test
+from nptests.instrument import Trace
+from nptests.plots import generate_visualizations
+from nptests.store import default_store
+from utils.load_data import load_data
 
 # Streamlit app setup
 st.title("Wilcoxon Signed-Rank Test with Visualization")
 
 # File upload and data handling
+lean_mode = st.sidebar.checkbox(
+    "Memory-lean loading",
+    help="Stream CSVs in chunks with narrowed numeric dtypes and categorical text columns.",
+)
 uploaded_file = st.file_uploader("Upload Dataset", type=["csv", "xlsx"])
+profile_run = st.sidebar.checkbox("Profile test runs (cProfile)")
 if uploaded_file:
-    if uploaded_file.name.endswith(".csv"):
-        data = pd.read_csv(uploaded_file)
-    else:
-        data = pd.read_excel(uploaded_file)
+    trace = Trace("wilcoxon", profile=profile_run)
+    with trace.stage("load"):
+        data, digest = load_data(uploaded_file, with_digest=True, lean=lean_mode)
+    report = data.attrs.get("memory_report")
+    if report:
+        st.caption(
+            f"Memory-lean loading: {report['before'] / 1024 ** 2:.1f} MB -> "
+            f"{report['after'] / 1024 ** 2:.1f} MB ({report['saved'] / 1024 ** 2:.1f} MB saved)"
+        )
     
     numeric_cols = data.select_dtypes(include=["number"]).columns.tolist()
     
@@ -58,16 +45,31 @@ if uploaded_file:
     # Run test
     if st.button("Run Wilcoxon Test"):
         try:
-            stat, p_value = wilcoxon(data[col1], data[col2])
+            with trace.profiling(), trace.stage("test"):
+                result = run_test(data, "Wilcoxon Signed-Rank Test", col1, col2, digest=digest)
+            store = default_store()
+            st.sidebar.caption(
+                f"Result cache: {store.hits} of {store.hits + store.misses} lookups hit ({store.hit_rate:.0%})"
+            )
             
             st.subheader("Test Results")
-            st.write(f"**Test Statistic:** {stat}")
-            st.write(f"**p-value:** {p_value}")
-            st.write(f"**Conclusion:** {'Reject H0' if p_value < 0.05 else 'Fail to reject H0'}")
+            st.write(f"**Test Statistic:** {result.statistic}")
+            st.write(f"**p-value:** {result.p_value}")
+            st.write(f"**Conclusion:** {result.conclusion}")
             
             # Generate visualizations
-            figs = generate_visualizations(data, col1, col2, selected_plots)
-            for fig in figs:
-                st.pyplot(fig)
+            with trace.stage("plots"):
+                figs = generate_visualizations(data, col1, col2, selected_plots)
+                for fig in figs:
+                    st.pyplot(fig)
+            trace.finish()
         except Exception as e:
+            trace.finish("failed")
             st.error(f"Error performing test: {str(e)}")
+            st.stop()
+
+        with st.expander("Performance"):
+            st.caption(f"Run {trace.id}: {trace.wall:.3f}s over {len(trace.stages)} stages")
+            st.dataframe(trace.table())
+            if trace.profile_text:
+                st.code(trace.profile_text)
@@ -0,0 +1,32 @@
+import pandas as pd
+
+DATA_TYPES = ["String", "Integer", "Float", "Datetime"]
+
+
+def change_data_type(df, col, new_type, date_format=None):
+    """Convert ``col`` to one of ``DATA_TYPES``; values that do not convert become missing.
+
+    Integer columns with missing values use the nullable ``Int64`` dtype.
+    Datetimes are parsed with ``date_format`` when given, otherwise with the
+    format pandas infers from the first value and applies to the whole column.
+    """
+    series = df[col]
+    if new_type == "String":
+        converted = series.astype("str").where(series.notna())
+    elif new_type == "Integer":
+        numbers = pd.to_numeric(series, errors="coerce")
+        whole = numbers.round()
+        if whole.isna().any():
+            converted = whole.astype("Int64")
+        else:
+            converted = whole.astype("int64")
+    elif new_type == "Float":
+        converted = pd.to_numeric(series, errors="coerce").astype("float64")
+    elif new_type == "Datetime":
+        converted = pd.to_datetime(series, format=date_format, errors="coerce")
+    else:
+        raise ValueError(f"Unknown data type: {new_type}")
+
+    out = df.copy(deep=False)
+    out[col] = converted
+    return out
@@ -0,0 +1,135 @@
+import argparse
+import hashlib
+import json
+import os
+
+from utils.change_datatype import change_data_type
+from utils.correct_inconsistent import correct_inconsistent_data
+from utils.enforce_integrity import enforce_data_integrity
+from utils.handle_format import handle_data_format
+from utils.handle_missing import handle_missing_values
+from utils.handle_numeric import handle_numeric_data
+from utils.load_data import _TableCache
+from utils.remove_duplicates import remove_duplicates
+from utils.standardize_text import standardize_text
+
+# Budget (bytes) for memoized intermediate stages across all sessions
+STAGE_CACHE_BYTES = int(os.environ.get("NPT_STAGE_CACHE_BYTES", 1024 ** 3))
+
+
+def _rename_column(df, old_name, new_name):
+    return df.rename(columns={old_name: new_name})
+
+
+def _filter_rows(df, column, value):
+    series = df[column]
+    # Text filter values compare against numbers in numeric columns
+    if series.dtype.kind in "iuf":
+        value = float(value)
+    return df[(series == value).to_numpy()]
+
+
+# Operation name -> function(df, **params); plans refer to operations by name only
+OPERATIONS = {
+    "handle_missing": handle_missing_values,
+    "remove_duplicates": remove_duplicates,
+    "standardize_text": standardize_text,
+    "correct_inconsistent": correct_inconsistent_data,
+    "change_datatype": change_data_type,
+    "handle_format": handle_data_format,
+    "enforce_integrity": enforce_data_integrity,
+    "handle_numeric": handle_numeric_data,
+    "rename_column": _rename_column,
+    "filter_rows": _filter_rows,
+}
+
+
+def step(op, **params):
+    """One plan step; parameters must be JSON-serializable."""
+    if op not in OPERATIONS:
+        raise ValueError(f"Unknown cleaning operation: {op}")
+    return {"op": op, "params": params}
+
+
+def describe(entry):
+    params = ", ".join(f"{key}={value!r}" for key, value in entry["params"].items())
+    return f"{entry['op']}({params})"
+
+
+def stage_keys(plan, base_key):
+    """Cache key of every plan prefix: a hash chain starting from the dataset's key."""
+    keys = []
+    key = str(base_key)
+    for entry in plan:
+        payload = key + json.dumps(entry, sort_keys=True, default=str)
+        key = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+        keys.append(key)
+    return keys
+
+
+_stages = _TableCache(STAGE_CACHE_BYTES)
+
+
+def run_plan(df, plan, base_key=None):
+    """Apply ``plan`` to ``df`` and return the final frame.
+
+    With ``base_key`` (the upload's content hash plus load options) every
+    intermediate stage is memoized under the hash of its plan prefix, so
+    only the steps after the longest cached prefix run: appending a step
+    computes one stage and undoing a step is a cache hit. Returned frames
+    are shared with the cache and must not be modified in place.
+    """
+    if base_key is None:
+        for entry in plan:
+            df = OPERATIONS[entry["op"]](df, **entry["params"])
+        return df
+
+    keys = stage_keys(plan, base_key)
+    start = 0
+    for index in range(len(plan), 0, -1):
+        cached = _stages.get(keys[index - 1])
+        if cached is not None:
+            df, start = cached, index
+            break
+    for index in range(start, len(plan)):
+        entry = plan[index]
+        df = OPERATIONS[entry["op"]](df, **entry["params"])
+        _stages.put(keys[index], df, int(df.memory_usage(deep=True).sum()))
+    return df
+
+
+def dumps(plan):
+    return json.dumps({"version": 1, "steps": plan}, indent=2, default=str)
+
+
+def loads(text):
+    """Parse a saved plan, checking every step names a known operation."""
+    steps = json.loads(text)["steps"]
+    for entry in steps:
+        if entry.get("op") not in OPERATIONS:
+            raise ValueError(f"Unknown cleaning operation: {entry.get('op')}")
+    return steps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.cleaning_plan",
+        description="Replay a saved cleaning plan on a CSV/Excel file.",
+    )
+    parser.add_argument("plan", help="plan JSON saved from the cleaning app")
+    parser.add_argument("path", help="CSV or Excel file to clean")
+    parser.add_argument("-o", "--output", required=True, help="where to write the cleaned CSV")
+    args = parser.parse_args(argv)
+
+    from utils.load_data import load_path
+
+    with open(args.plan) as handle:
+        plan = loads(handle.read())
+    cleaned = run_plan(load_path(args.path), plan)
+    cleaned.to_csv(args.output, index=False)
+    print(f"{len(plan)} steps applied; {len(cleaned)} rows written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
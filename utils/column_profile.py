@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Quantiles kept per numeric column (0%, 1%, ..., 100%)
+QUANTILES = np.linspace(0.0, 1.0, 101)
+MAX_CACHED_PROFILES = 64
+
+PROFILE_COLUMNS = [
+    "dtype", "numeric", "rows", "nulls", "cardinality", "tie_ratio", "min", "max", "median",
+]
+
+
+def _profile_numeric(values):
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {"cardinality": 0, "tie_ratio": 0.0, "min": np.nan, "max": np.nan,
+                "median": np.nan, "quantiles": np.full(len(QUANTILES), np.nan)}
+    ordered = np.sort(values)
+    cardinality = 1 + int(np.count_nonzero(ordered[1:] != ordered[:-1]))
+    # Quantiles read straight off the sorted array (linear interpolation)
+    quantiles = np.interp(QUANTILES * (len(ordered) - 1), np.arange(len(ordered)), ordered)
+    return {
+        "cardinality": cardinality,
+        "tie_ratio": 1.0 - cardinality / len(ordered),
+        "min": float(ordered[0]),
+        "max": float(ordered[-1]),
+        "median": float(quantiles[50]),
+        "quantiles": quantiles,
+    }
+
+
+def _profile_other(series):
+    counts = series.value_counts(dropna=True, sort=False)
+    non_null = int(counts.sum())
+    cardinality = len(counts)
+    return {
+        "cardinality": cardinality,
+        "tie_ratio": 1.0 - cardinality / non_null if non_null else 0.0,
+        "min": np.nan,
+        "max": np.nan,
+        "median": np.nan,
+        "quantiles": None,
+    }
+
+
+def profile_columns(df):
+    """Profile every column of ``df``: dtype, nulls, cardinality, ties, range and quantiles.
+
+    Returns a DataFrame indexed by column name with the fields in
+    ``PROFILE_COLUMNS``; numeric quantile sketches are kept in
+    ``profile.attrs["quantiles"]``.
+    """
+    rows = []
+    quantiles = {}
+    for col in df.columns:
+        series = df[col]
+        numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        nulls = int(series.isna().sum())
+        if numeric:
+            stats = _profile_numeric(series.to_numpy(dtype=float, na_value=np.nan))
+        else:
+            stats = _profile_other(series)
+        sketch = stats.pop("quantiles")
+        if sketch is not None:
+            quantiles[col] = sketch.tolist()
+        rows.append({"dtype": str(series.dtype), "numeric": numeric, "rows": len(series), "nulls": nulls, **stats})
+    profile = pd.DataFrame(rows, index=pd.Index(df.columns, name="column"), columns=PROFILE_COLUMNS)
+    profile.attrs["quantiles"] = quantiles
+    return profile
+
+
+class _ProfileCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        profile = compute()
+        with self._lock:
+            self._entries[key] = profile
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return profile
+
+
+_cache = _ProfileCache(MAX_CACHED_PROFILES)
+
+
+def get_profile(df, key):
+    """Profile of ``df`` cached under ``key`` (the dataset's content hash, plus load options)."""
+    return _cache.get_or_compute(key, lambda: profile_columns(df))
+
+
+def quantile(profile, col, q):
+    """Approximate ``q``-quantile of a numeric column from its profiled sketch."""
+    return float(np.interp(q, QUANTILES, profile.attrs["quantiles"][col]))
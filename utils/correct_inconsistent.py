@@ -0,0 +1,36 @@
+import pandas as pd
+
+
+def _coerce(series, value):
+    # Text inputs arrive as strings; numeric columns compare against numbers
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{value}' is not a number; column '{series.name}' is numeric") from None
+    return value
+
+
+def correct_inconsistent_data(df, col, old_value, new_value):
+    """Replace every exact occurrence of ``old_value`` in ``col`` with ``new_value``.
+
+    Categorical columns are corrected by renaming (or merging) a category
+    rather than touching every row.
+    """
+    series = df[col]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        if old_value not in categories:
+            return df.copy(deep=False)
+        if new_value in categories:
+            corrected = series.where(series != old_value, new_value).cat.remove_unused_categories()
+        else:
+            corrected = series.cat.rename_categories({old_value: new_value})
+    else:
+        old = _coerce(series, old_value)
+        new = _coerce(series, new_value)
+        corrected = series.mask(series == old, new)
+
+    out = df.copy(deep=False)
+    out[col] = corrected
+    return out
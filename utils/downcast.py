@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Text columns whose distinct-value ratio is at or below this become categoricals
+CATEGORY_RATIO = 0.5
+CHUNK_ROWS = 200_000
+
+
+def _downcast_numeric(series):
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        # Signed only: unsigned columns would wrap around in paired differences
+        return pd.to_numeric(series, downcast="integer")
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy()
+        narrow = values.astype(np.float32)
+        # Only narrow when every value survives the round trip exactly
+        if np.array_equal(narrow.astype(values.dtype), values, equal_nan=True):
+            return pd.Series(narrow, index=series.index, name=series.name)
+    return series
+
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def optimize_dtypes(df, category_ratio=CATEGORY_RATIO, category_columns=None):
+    """Return a copy of ``df`` with the narrowest numeric dtypes and categorical labels."""
+    out = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series):
+            out[col] = _downcast_numeric(series)
+        elif _is_text(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+            if category_columns is not None:
+                to_category = col in category_columns
+            else:
+                to_category = len(series) > 0 and series.nunique() <= category_ratio * len(series)
+            out[col] = series.astype("category") if to_category else series
+        else:
+            out[col] = series
+    return pd.DataFrame(out, index=df.index)
+
+
+def _concat_chunks(chunks):
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            columns[col] = pd.Series(union_categoricals(parts, ignore_order=True), name=col)
+        else:
+            # Chunks may have been narrowed differently; concat settles on the
+            # widest dtype, so narrow once more over the combined column
+            combined = pd.concat(parts, ignore_index=True)
+            if pd.api.types.is_numeric_dtype(combined):
+                combined = _downcast_numeric(combined)
+            columns[col] = combined
+    return pd.DataFrame(columns)
+
+
+def read_csv_lean(buffer, chunksize=CHUNK_ROWS, category_ratio=CATEGORY_RATIO):
+    """Stream a CSV in chunks, narrowing dtypes as it goes.
+
+    Returns the optimized frame and a report with the memory the default
+    dtypes would have used (``before``) against the optimized footprint
+    (``after``), both in bytes.
+    """
+    chunks = []
+    before = 0
+    category_columns = None
+    for chunk in pd.read_csv(buffer, chunksize=chunksize):
+        before += int(chunk.memory_usage(deep=True, index=False).sum())
+        if category_columns is None:
+            # Decide categorical columns from the first chunk so that every
+            # chunk encodes the same columns the same way
+            category_columns = {
+                col for col in chunk.columns
+                if _is_text(chunk[col]) and chunk[col].nunique() <= category_ratio * len(chunk)
+            }
+        chunks.append(optimize_dtypes(chunk, category_columns=category_columns))
+
+    frame = _concat_chunks(chunks) if chunks else pd.DataFrame()
+    return frame, memory_report(before, frame)
+
+
+def memory_report(before, frame):
+    after = int(frame.memory_usage(deep=True, index=False).sum())
+    return {
+        "before": before,
+        "after": after,
+        "saved": before - after,
+        "ratio": after / before if before else 1.0,
+    }
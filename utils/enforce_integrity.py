@@ -0,0 +1,33 @@
+import pandas as pd
+
+INTEGRITY_RULES = ["Email Validation", "Numeric Range"]
+
+# Pragmatic address check: local part, "@", dotted domain with a 2+ letter TLD
+# (kept as text so pandas compiles it once per column, see utils.standardize_text)
+_EMAIL = r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}"
+
+
+def valid_emails(series):
+    """Boolean mask of values that are well-formed email addresses (missing values are invalid)."""
+    return series.astype("str").str.fullmatch(_EMAIL).fillna(False).astype(bool) & series.notna()
+
+
+def enforce_data_integrity(df, col, rule, min_value=None, max_value=None):
+    """Keep only the rows whose ``col`` satisfies ``rule``.
+
+    Email validation is one regex match over the column through pandas string
+    methods; the numeric range is inclusive and either bound may be ``None``.
+    """
+    series = df[col]
+    if rule == "Email Validation":
+        keep = valid_emails(series)
+    elif rule == "Numeric Range":
+        values = pd.to_numeric(series, errors="coerce")
+        keep = values.notna()
+        if min_value is not None:
+            keep &= values >= min_value
+        if max_value is not None:
+            keep &= values <= max_value
+    else:
+        raise ValueError(f"Unknown integrity rule: {rule}")
+    return df[keep.to_numpy()]
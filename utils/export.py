@@ -0,0 +1,71 @@
+import gzip
+import io
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional; Parquet and zstd exports need it
+    pa = None
+
+# Rows serialized per CSV chunk; bounds the text held in memory besides the output
+EXPORT_CHUNK_ROWS = 100_000
+EXCEL_MAX_ROWS = 1_048_575  # one row is taken by the header
+
+# Format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "CSV (zstd)": (".csv.zst", "application/zstd"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def available_formats():
+    """Export formats usable with the installed libraries."""
+    if pa is not None:
+        return list(EXPORT_FORMATS)
+    return [fmt for fmt in EXPORT_FORMATS if fmt not in ("CSV (zstd)", "Parquet")]
+
+
+def _write_csv(df, stream, chunk_rows):
+    # Each chunk is serialized and encoded on its own, so the full CSV text
+    # never exists alongside the (possibly compressed) output
+    for start in range(0, max(len(df), 1), chunk_rows):
+        text = df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0)
+        stream.write(text.encode("utf-8"))
+
+
+def export_bytes(df, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Serialize ``df`` to ``fmt`` (a key of ``EXPORT_FORMATS``) entirely in memory.
+
+    CSVs are written chunk by chunk through the compressor; nothing touches
+    the filesystem, so concurrent sessions cannot see each other's exports.
+    """
+    buffer = io.BytesIO()
+    if fmt == "CSV":
+        _write_csv(df, buffer, chunk_rows)
+    elif fmt == "CSV (gzip)":
+        with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6, mtime=0) as stream:
+            _write_csv(df, stream, chunk_rows)
+    elif fmt in ("CSV (zstd)", "Parquet"):
+        if pa is None:
+            raise ValueError(f"{fmt} export needs pyarrow")
+        if fmt == "Parquet":
+            df.to_parquet(buffer, index=False, compression="zstd")
+        else:
+            sink = pa.BufferOutputStream()
+            with pa.CompressedOutputStream(sink, "zstd") as stream:
+                _write_csv(df, stream, chunk_rows)
+            return sink.getvalue().to_pybytes()
+    elif fmt == "Excel":
+        if len(df) > EXCEL_MAX_ROWS:
+            raise ValueError(f"Excel sheets hold at most {EXCEL_MAX_ROWS} rows; choose CSV or Parquet")
+        df.to_excel(buffer, index=False)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return buffer.getvalue()
+
+
+def export_name(stem, fmt):
+    extension, mime = EXPORT_FORMATS[fmt]
+    return f"{stem}{extension}", mime
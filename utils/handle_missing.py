@@ -0,0 +1,52 @@
+import pandas as pd
+
+MISSING_OPTIONS = ["Remove rows with missing values", "Fill missing values"]
+FILL_STATISTICS = ["mean", "median", "mode"]
+
+
+def _fill_values(df, fill_value):
+    numeric = df.select_dtypes(include=["number"]).columns
+    if fill_value == "mean":
+        return df[numeric].mean()
+    if fill_value == "median":
+        return df[numeric].median()
+    if fill_value == "mode":
+        # First mode of every column, text columns included
+        modes = df.mode(dropna=True)
+        return modes.iloc[0] if len(modes) else pd.Series(dtype=object)
+
+    # A custom value fills text columns as typed and numeric columns only
+    # when it parses as a number, so numeric columns keep their dtype
+    values = {col: fill_value for col in df.columns if col not in numeric}
+    try:
+        number = float(fill_value)
+    except (TypeError, ValueError):
+        return pd.Series(values, dtype=object)
+    if number.is_integer():
+        number = int(number)
+    values.update({col: number for col in numeric})
+    return pd.Series(values, dtype=object)
+
+
+def handle_missing_values(df, option, fill_value=None):
+    """Drop rows with missing values or fill them with a statistic or a custom value.
+
+    ``fill_value`` is ``"mean"``, ``"median"``, ``"mode"`` or a custom value;
+    statistics are computed per column in one vectorized pass. Columns
+    without missing values are not copied.
+    """
+    if option == "Remove rows with missing values":
+        return df.dropna()
+    if option != "Fill missing values":
+        raise ValueError(f"Unknown missing-value option: {option}")
+    if fill_value is None or fill_value == "":
+        raise ValueError("Enter a value (or choose a statistic) to fill missing data")
+
+    missing = df.columns[df.isna().any().to_numpy()]
+    values = _fill_values(df[missing], fill_value).dropna()
+    if values.empty:
+        return df.copy(deep=False)
+    out = df.copy(deep=False)
+    for col, value in values.items():
+        out[col] = out[col].fillna(value)
+    return out
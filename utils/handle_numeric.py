@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+NUMERIC_OPERATIONS = ["Scale", "Normalize", "Round"]
+
+
+def handle_numeric_data(df, col, operation, scale_factor=None, decimals=None):
+    """Scale, min-max normalize or round a numeric column.
+
+    The column is copied once into a float buffer and every step writes
+    into that buffer (``out=``), so no intermediate arrays are allocated
+    and the caller's frame, which may be a cached upload, is never mutated.
+    """
+    series = df[col]
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        raise ValueError(f"Column '{col}' is not numeric")
+    values = series.to_numpy(dtype=float, na_value=np.nan, copy=True)
+
+    if operation == "Scale":
+        if scale_factor is None:
+            raise ValueError("Enter a scale factor")
+        np.multiply(values, scale_factor, out=values)
+    elif operation == "Normalize":
+        low, high = np.nanmin(values), np.nanmax(values)
+        np.subtract(values, low, out=values)
+        if high > low:
+            np.divide(values, high - low, out=values)
+    elif operation == "Round":
+        if pd.api.types.is_integer_dtype(series):
+            return df.copy(deep=False)
+        np.round(values, int(decimals or 0), out=values)
+    else:
+        raise ValueError(f"Unknown numeric operation: {operation}")
+
+    out = df.copy(deep=False)
+    out[col] = pd.Series(values, index=series.index, name=col)
+    return out
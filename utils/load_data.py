@@ -0,0 +1,198 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils.downcast import optimize_dtypes, read_csv_lean, memory_report
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; fall back to caching DataFrames
+    pa = None
+    pq = None
+
+# Cache budgets (bytes); the app server can override them through the environment
+MEMORY_CACHE_BYTES = int(os.environ.get("NPT_MEMORY_CACHE_BYTES", 512 * 1024 ** 2))
+DISK_CACHE_BYTES = int(os.environ.get("NPT_DISK_CACHE_BYTES", 2 * 1024 ** 3))
+CACHE_DIR = os.environ.get("NPT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "nptests-cache"))
+
+
+def file_digest(raw):
+    """Content hash used as the cache key for an uploaded file."""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class _TableCache:
+    """Process-wide LRU of parsed datasets, bounded by total size in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self._size += nbytes
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_memory_cache = _TableCache(MEMORY_CACHE_BYTES)
+
+
+def _parse(raw, name, lean=False):
+    buffer = io.BytesIO(raw)
+    if not lean:
+        if name.endswith(".csv"):
+            return pd.read_csv(buffer)
+        return pd.read_excel(buffer)
+
+    if name.endswith(".csv"):
+        frame, report = read_csv_lean(buffer)
+    else:
+        frame = pd.read_excel(buffer)
+        before = int(frame.memory_usage(deep=True, index=False).sum())
+        frame = optimize_dtypes(frame)
+        report = memory_report(before, frame)
+    # attrs survive the Arrow round trip, so cached loads keep the report
+    frame.attrs["memory_report"] = report
+    return frame
+
+
+def _sidecar_path(digest):
+    return os.path.join(CACHE_DIR, f"{digest}.parquet")
+
+
+def _read_sidecar(digest):
+    path = _sidecar_path(digest)
+    try:
+        table = pq.read_table(path, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    try:
+        os.utime(path)  # mark as recently used for eviction
+    except OSError:
+        pass
+    return table
+
+
+def _write_sidecar(digest, table):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        os.close(fd)
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, _sidecar_path(digest))
+    except OSError:
+        return
+    _evict_sidecars()
+
+
+def _evict_sidecars():
+    try:
+        entries = []
+        for entry in os.scandir(CACHE_DIR):
+            if entry.name.endswith(".parquet"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= DISK_CACHE_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+
+def _to_frame(cached):
+    # Every caller gets its own writable frame. Zero-copy conversion would hand
+    # out the immutable Arrow buffers as read-only columns, so Arrow tables
+    # are converted with a copy (faster than converting without one and
+    # copying the frame); plain DataFrames are copied so callers cannot
+    # mutate the cached entry.
+    if pa is not None and isinstance(cached, pa.Table):
+        return cached.to_pandas()
+    return cached.copy()
+
+
+def load_bytes(raw, name, with_digest=False, lean=False):
+    """Parse raw CSV/Excel bytes once per distinct content and reuse the result.
+
+    With ``lean=True`` CSVs are streamed in chunks with narrowed numeric
+    dtypes and categorical labels; ``frame.attrs["memory_report"]`` records
+    the bytes saved against the default dtypes.
+    """
+    digest = file_digest(raw)
+    key = f"{digest}-lean" if lean else digest
+    cached = _memory_cache.get(key)
+
+    if cached is None and pq is not None:
+        cached = _read_sidecar(key)
+        if cached is not None:
+            _memory_cache.put(key, cached, cached.nbytes)
+
+    if cached is None:
+        frame = _parse(raw, name, lean=lean)
+        cached = frame
+        nbytes = int(frame.memory_usage(deep=True).sum())
+        if pa is not None:
+            try:
+                cached = pa.Table.from_pandas(frame, preserve_index=False)
+                nbytes = cached.nbytes
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                cached = frame  # mixed-type columns: keep the DataFrame only
+            else:
+                _write_sidecar(key, cached)
+        _memory_cache.put(key, cached, nbytes)
+
+    frame = _to_frame(cached)
+    return (frame, digest) if with_digest else frame
+
+
+def load_data(uploaded_file, with_digest=False, lean=False):
+    """Load a Streamlit upload (or any object with ``name`` and ``getvalue``/``read``)."""
+    if hasattr(uploaded_file, "getvalue"):
+        raw = uploaded_file.getvalue()
+    else:
+        raw = uploaded_file.read()
+    return load_bytes(raw, uploaded_file.name, with_digest=with_digest, lean=lean)
+
+
+def load_path(path, with_digest=False, lean=False):
+    """Load a CSV/Excel file from disk through the same cache."""
+    with open(path, "rb") as handle:
+        raw = handle.read()
+    return load_bytes(raw, os.path.basename(path), with_digest=with_digest, lean=lean)
+
+
+def clear_cache():
+    _memory_cache.clear()
@@ -0,0 +1,3 @@
+def remove_duplicates(df, subset=None, keep="first"):
+    """Drop duplicate rows (optionally judged on ``subset`` columns), keeping the ``keep`` occurrence."""
+    return df.drop_duplicates(subset=subset, keep=keep)
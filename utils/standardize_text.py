@@ -0,0 +1,38 @@
+import pandas as pd
+
+# Patterns are passed as text so Arrow-backed strings compile them once (RE2)
+# per column; a compiled ``re.Pattern`` would force a per-element Python fallback
+_WHITESPACE = r"\s+"
+
+
+def _standardize(values):
+    return values.str.strip().str.lower().str.replace(_WHITESPACE, " ", regex=True)
+
+
+def standardize_text(df, col):
+    """Trim, lower-case and collapse internal whitespace in a text column.
+
+    Categorical columns are standardized on their categories only (one
+    operation per distinct label) and labels that become equal are merged.
+    """
+    series = df[col]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        if not pd.api.types.is_string_dtype(categories) and not pd.api.types.is_object_dtype(categories):
+            raise ValueError(f"Column '{col}' is not a text column")
+        mapping, labels = pd.factorize(_standardize(categories.to_series()))
+        codes = series.cat.codes.to_numpy()
+        new_codes = mapping[codes]
+        new_codes[codes < 0] = -1
+        standardized = pd.Series(
+            pd.Categorical.from_codes(new_codes, categories=pd.Index(labels)), index=series.index, name=col,
+        )
+    elif pd.api.types.is_string_dtype(series) or pd.api.types.is_object_dtype(series):
+        standardized = _standardize(series.astype("str"))
+        standardized = standardized.where(series.notna())
+    else:
+        raise ValueError(f"Column '{col}' is not a text column")
+
+    out = df.copy(deep=False)
+    out[col] = standardized
+    return out